@@ -3,25 +3,29 @@ import io
 import os
 import re
 import sys
+import time
 import logging
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 import joblib
 from flask import Flask, render_template, request, jsonify
 from scipy.io import wavfile
-from scipy.signal import resample, find_peaks, spectrogram
-from scipy.stats import kurtosis, skew
-from python_speech_features import delta, mfcc
 
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
-from config import FLASK_DEBUG, FLASK_PORT, MODELS_DIR, N_TFIDF, AUDIO_RELIABLE
+from config import (FLASK_DEBUG, FLASK_PORT, MODELS_DIR, N_TFIDF, AUDIO_RELIABLE,
+                    VISUAL_SESSION_LIMIT,
+                    VISUAL_SESSION_TTL_SEC, VISUAL_BATCH_MAX_FRAMES)
 from src.text_features import (DEPRESSION_WORDS, FIRST_PERSON_SINGULAR, FIRST_PERSON_PLURAL,
                                 THIRD_PERSON, ABSOLUTIST_WORDS, NEGATION_WORDS, HEDGING_WORDS,
                                 extract_clinical_nlp_features)
+from src.audio_lld import SAMPLE_RATE, build_feature_vector, get_dsp_plan, to_mono_float
+from src.visual_browser_model import EXPRESSIONS, ExpressionSession, fit_feature_width
 
 # ── Logging ────────────────────────────────────────────────────
 logging.basicConfig(
@@ -92,6 +96,21 @@ try:
 except FileNotFoundError:
     logger.info("ℹ️  Browser visual model not found — visual server-side prediction disabled")
 
+# Column order the browser visual model was trained on (constant columns dropped).
+# Streamed sessions are scored by column name, so without this file (or if it
+# disagrees with the scaler) they fall back to the per-request summary below.
+browser_visual_columns = None
+try:
+    browser_visual_columns = joblib.load(os.path.join(MODELS_DIR, 'visual_browser_columns.pkl'))
+    if HAS_BROWSER_VISUAL and len(browser_visual_columns) != browser_visual_scaler.n_features_in_:
+        logger.warning(f"visual_browser_columns.pkl lists {len(browser_visual_columns)} columns but "
+                       f"the browser visual scaler expects {browser_visual_scaler.n_features_in_}; "
+                       "streamed visual sessions disabled")
+        browser_visual_columns = None
+except FileNotFoundError:
+    if HAS_BROWSER_VISUAL:
+        logger.info("ℹ️  visual_browser_columns.pkl not found — streamed visual sessions disabled")
+
 # Sentence-transformers (optional, for enhanced text features)
 sbert_model_app = None
 sbert_pca_app = None
@@ -274,7 +293,11 @@ def _load_audio_model_and_columns():
     try:
         AUDIO_MODEL = joblib.load(os.path.join(MODELS_DIR, 'final_audio_model.pkl'))
         feature_csv = os.path.join(BASE_DIR, 'data', 'features', 'audio_features_enhanced.csv')
-        if os.path.exists(feature_csv):
+        if hasattr(AUDIO_MODEL, 'feature_names_in_'):
+            AUDIO_FEATURE_COLUMNS = list(AUDIO_MODEL.feature_names_in_)
+            AUDIO_FEATURE_EXPECTED = len(AUDIO_FEATURE_COLUMNS)
+            logger.info(f"✅ Audio model loaded: final_audio_model.pkl uses {AUDIO_FEATURE_EXPECTED} features")
+        elif os.path.exists(feature_csv):
             cols = pd.read_csv(feature_csv, nrows=0).columns.tolist()
             if cols and cols[0] == 'pid':
                 cols = cols[1:]
@@ -290,14 +313,7 @@ def _load_audio_model_and_columns():
 
 
 def _normalize_audio(signal):
-    signal = np.asarray(signal)
-    if signal.dtype.kind in ('i', 'u'):
-        signal = signal.astype(np.float32) / np.iinfo(signal.dtype).max
-    elif signal.dtype.kind == 'f':
-        signal = signal.astype(np.float32)
-    if signal.ndim > 1:
-        signal = np.mean(signal, axis=1)
-    return signal
+    return to_mono_float(signal)
 
 
 def _load_wav_stream(file_storage):
@@ -306,154 +322,13 @@ def _load_wav_stream(file_storage):
     wav_io = io.BytesIO(raw_bytes)
     samplerate, audio = wavfile.read(wav_io)
     audio = _normalize_audio(audio)
-    if samplerate != 16000:
-        target_len = int(len(audio) * 16000 / samplerate)
-        if target_len > 0:
-            audio = resample(audio, target_len)
-        samplerate = 16000
-    return samplerate, audio
-
-
-def _estimate_pitch(signal, samplerate):
-    if len(signal) < samplerate // 10:
-        return 0.0
-    frame = signal[:min(len(signal), samplerate)] * np.hamming(min(len(signal), samplerate))
-    corr = np.correlate(frame, frame, mode='full')[len(frame)-1:]
-    min_lag = max(1, samplerate // 500)
-    corr[:min_lag] = 0
-    peak = np.argmax(corr)
-    if peak < 1:
-        return 0.0
-    return float(samplerate / peak)
-
-
-def _estimate_formants(signal, samplerate):
-    n = min(len(signal), 4096)
-    if n < 512:
-        return 0.0, 0.0, 0.0
-    windowed = signal[:n] * np.hamming(n)
-    spectrum = np.abs(np.fft.rfft(windowed, n=4096))
-    freqs = np.fft.rfftfreq(4096, d=1.0 / samplerate)
-    valid = np.where((freqs >= 200) & (freqs <= 4000))[0]
-    if len(valid) == 0:
-        return 0.0, 0.0, 0.0
-    magnitudes = spectrum[valid]
-    peaks, _ = find_peaks(magnitudes, distance=20)
-    if len(peaks) == 0:
-        return 0.0, 0.0, 0.0
-    ordered = peaks[np.argsort(magnitudes[peaks])[::-1]]
-    peak_freqs = freqs[valid][ordered][:3]
-    if len(peak_freqs) < 3:
-        peak_freqs = np.pad(peak_freqs, (0, 3 - len(peak_freqs)), constant_values=0.0)
-    return float(peak_freqs[0]), float(peak_freqs[1]), float(peak_freqs[2])
-
-
-def _spectral_flux(signal, samplerate):
-    if len(signal) < 512:
-        return 0.0, 0.0, np.array([0.0])
-    f, t, S = spectrogram(signal, fs=samplerate, window='hann', nperseg=512, noverlap=256, nfft=512, scaling='spectrum', mode='magnitude')
-    if S.shape[1] < 2:
-        return 0.0, 0.0, np.array([0.0])
-    flux = np.sqrt(np.sum(np.diff(S, axis=1) ** 2, axis=0))
-    return float(np.mean(flux)), float(np.min(flux)), flux
+    # Polyphase filter, windows and mel matrices are built once per rate
+    audio = get_dsp_plan(int(samplerate), SAMPLE_RATE).resample(audio)
+    return SAMPLE_RATE, audio
 
 
 def _extract_audio_feature_vector(samplerate, signal):
-    named_features = {}
-    pitch = _estimate_pitch(signal, samplerate)
-    f1, f2, f3 = _estimate_formants(signal, samplerate)
-    flux_mean, flux_min, flux_series = _spectral_flux(signal, samplerate)
-    flux_delta = np.diff(flux_series) if len(flux_series) > 1 else np.array([0.0])
-    flux_delta_std = float(np.std(flux_delta)) if flux_delta.size else 0.0
-    logf0 = np.log(np.maximum(1.0, pitch))
-    f0_log_std = float(np.std([logf0])) if not np.isnan(logf0) else 0.0
-    f0_log_delta_std = 0.0
-    if flux_delta.size > 1:
-        f0_log_delta_std = float(np.std(np.diff(np.array([logf0]))))
-
-    try:
-        mfcc_features = mfcc(signal, samplerate, winlen=0.025, winstep=0.01, numcep=13, nfilt=26, nfft=512, appendEnergy=True)
-        if mfcc_features.size == 0:
-            mfcc_features = np.zeros((1, 13), dtype=np.float32)
-    except Exception:
-        mfcc_features = np.zeros((1, 13), dtype=np.float32)
-
-    mfcc_delta = delta(mfcc_features, 2)
-    mfcc_ddelta = delta(mfcc_delta, 2)
-    mfcc_means = np.mean(mfcc_features, axis=0)
-    mfcc_stds = np.std(mfcc_features, axis=0)
-
-    egemaps_values = [pitch, flux_mean, flux_min, flux_delta_std, f1, f2, f3, f0_log_std, f0_log_delta_std]
-
-    def _approx_boaw_mfcc(bin_index, stat):
-        idx = int(bin_index) % mfcc_features.shape[1]
-        values = mfcc_features[:, idx]
-        if stat == 'mean':
-            return float(np.mean(values))
-        if stat == 'std':
-            return float(np.std(values))
-        return float(np.max(values))
-
-    def _approx_boaw_egemaps(bin_index, stat):
-        idx = int(bin_index) % len(egemaps_values)
-        val = float(np.abs(egemaps_values[idx]))
-        if stat == 'mean':
-            return val
-        if stat == 'std':
-            return val * 0.1
-        return val
-
-    slope_500_1500 = 0.0
-    try:
-        freqs = np.fft.rfftfreq(len(signal), d=1.0 / samplerate)
-        spectrum = np.abs(np.fft.rfft(signal * np.hamming(len(signal))))
-        mask = (freqs >= 500) & (freqs <= 1500)
-        if mask.any():
-            xp = freqs[mask]
-            yp = np.log(np.maximum(spectrum[mask], 1e-8))
-            if len(xp) > 1:
-                slope_500_1500 = float(np.polyfit(xp, yp, 1)[0])
-    except Exception:
-        slope_500_1500 = 0.0
-
-    named_features['prosody_voiced_pitch_mean'] = pitch
-    named_features['egemaps_spectralFlux_sma3_mean'] = flux_mean
-    named_features['egemaps_spectralFlux_sma3_min'] = flux_min
-    named_features['egemaps_spectralFlux_sma3_delta_std'] = flux_delta_std
-    named_features['egemaps_slope500-1500_sma3_max'] = slope_500_1500
-    named_features['egemaps_slope500-1500_sma3_delta_std'] = 0.0
-    named_features['egemaps_logRelF0-H1-H2_sma3nz_std'] = f0_log_std
-    named_features['egemaps_logRelF0-H1-A3_sma3nz_delta_std'] = f0_log_delta_std
-    named_features['egemaps_F1frequency_sma3nz_mean'] = f1
-    named_features['egemaps_F2frequency_sma3nz_skew'] = float(skew([f1, f2, f3])) if not np.isnan(f1 + f2 + f3) else 0.0
-    named_features['egemaps_F3frequency_sma3nz_mean'] = f3
-
-    # MFCC-derived features used by the saved audio model
-    named_features['mfcc_pcm_fftMag_mfcc[3]_min'] = float(np.min(mfcc_features[:, 3]))
-    named_features['mfcc_pcm_fftMag_mfcc[4]_mean'] = float(np.mean(mfcc_features[:, 4]))
-    named_features['mfcc_pcm_fftMag_mfcc[8]_max'] = float(np.max(mfcc_features[:, 8]))
-    named_features['mfcc_pcm_fftMag_mfcc[10]_p75'] = float(np.percentile(mfcc_features[:, 10], 75))
-    named_features['mfcc_pcm_fftMag_mfcc[10]_kurt'] = float(kurtosis(mfcc_features[:, 10], fisher=False, nan_policy='omit'))
-    named_features['mfcc_pcm_fftMag_mfcc[10]_ddelta_mean'] = float(np.mean(mfcc_ddelta[:, 10]))
-    named_features['mfcc_pcm_fftMag_mfcc_de[4]_mean'] = float(np.mean(mfcc_delta[:, 4]))
-    named_features['mfcc_pcm_fftMag_mfcc_de[5]_skew'] = float(skew(mfcc_delta[:, 5], nan_policy='omit'))
-    named_features['mfcc_pcm_fftMag_mfcc_de_de[8]_range'] = float(np.max(mfcc_ddelta[:, 8]) - np.min(mfcc_ddelta[:, 8]))
-    named_features['mfcc_pcm_fftMag_mfcc_de_de[11]_range'] = float(np.max(mfcc_ddelta[:, 11]) - np.min(mfcc_ddelta[:, 11]))
-
-    for col in AUDIO_FEATURE_COLUMNS:
-        if col.startswith('boaw_mfcc_bin'):
-            match = re.match(r'boaw_mfcc_bin(\d+)_(mean|std|max)', col)
-            if match:
-                named_features[col] = _approx_boaw_mfcc(match.group(1), match.group(2))
-        elif col.startswith('boaw_egemaps_bin'):
-            match = re.match(r'boaw_egemaps_bin(\d+)_(mean|std|max)', col)
-            if match:
-                named_features[col] = _approx_boaw_egemaps(match.group(1), match.group(2))
-
-    feature_vector = np.zeros(AUDIO_FEATURE_EXPECTED, dtype=np.float64)
-    for idx, col in enumerate(AUDIO_FEATURE_COLUMNS):
-        feature_vector[idx] = float(named_features.get(col, 0.0))
-    return feature_vector
+    return build_feature_vector(samplerate, signal, AUDIO_FEATURE_COLUMNS)
 
 
 def predict_audio_probability(feature_vector):
@@ -461,6 +336,8 @@ def predict_audio_probability(feature_vector):
         raise RuntimeError('Audio model is not available')
     if feature_vector.ndim == 1:
         feature_vector = feature_vector.reshape(1, -1)
+    if hasattr(AUDIO_MODEL, 'feature_names_in_'):
+        feature_vector = pd.DataFrame(feature_vector, columns=AUDIO_FEATURE_COLUMNS)
     return float(AUDIO_MODEL.predict_proba(feature_vector)[0][1])
 
 
@@ -490,6 +367,74 @@ def upload_audio():
 _load_audio_model_and_columns()
 
 
+# ---------------------------------------------------------------------------
+# Streaming visual sessions
+# ---------------------------------------------------------------------------
+_visual_sessions = OrderedDict()   # session id → (ExpressionSession, last access)
+_visual_sessions_lock = threading.Lock()
+
+
+def _get_visual_session(session_id, create=False):
+    """Look up (or create) a session; expires idle ones and caps the total count."""
+    now = time.monotonic()
+    with _visual_sessions_lock:
+        while _visual_sessions:
+            oldest_id, (_, last) = next(iter(_visual_sessions.items()))
+            if now - last <= VISUAL_SESSION_TTL_SEC:
+                break
+            del _visual_sessions[oldest_id]
+
+        entry = _visual_sessions.pop(session_id, None)
+        if entry is None:
+            if not create:
+                return None
+            entry = (ExpressionSession(), now)
+            while len(_visual_sessions) >= VISUAL_SESSION_LIMIT:
+                _visual_sessions.popitem(last=False)
+        _visual_sessions[session_id] = (entry[0], now)
+        return entry[0]
+
+
+def _valid_session_id(session_id):
+    return isinstance(session_id, str) and 0 < len(session_id) <= 64 \
+        and re.fullmatch(r'[A-Za-z0-9_-]+', session_id) is not None
+
+
+@app.route('/api/visual-frames', methods=['POST'])
+def visual_frames():
+    """Append a batch of per-frame face-api.js expression vectors to a session."""
+    data = request.json
+    if not data:
+        return jsonify({'error': 'Missing request body'}), 400
+    session_id = data.get('sessionId')
+    if not _valid_session_id(session_id):
+        return jsonify({'error': 'Invalid sessionId'}), 400
+    frames = data.get('frames')
+    if not isinstance(frames, list) or not frames:
+        return jsonify({'error': 'frames must be a non-empty list'}), 400
+    if len(frames) > VISUAL_BATCH_MAX_FRAMES:
+        return jsonify({'error': f'At most {VISUAL_BATCH_MAX_FRAMES} frames per batch'}), 400
+
+    try:
+        batch = np.array([[float(f.get(e, 0.0)) for e in EXPRESSIONS] for f in frames],
+                         dtype=np.float64)
+    except (AttributeError, TypeError, ValueError):
+        return jsonify({'error': 'Each frame must map expression names to numbers'}), 400
+    if not np.all(np.isfinite(batch)):
+        return jsonify({'error': 'Expression values must be finite'}), 400
+
+    session = _get_visual_session(session_id, create=True)
+    with _visual_sessions_lock:
+        session.update(np.clip(batch, 0.0, 1.0))
+        n_frames = session.n
+    return jsonify({'sessionId': session_id, 'framesSeen': n_frames})
+
+
+def _fit_browser_visual_width(feat_arr):
+    """Pad/trim to match the browser visual model's expected features."""
+    return fit_feature_width(feat_arr, browser_visual_scaler.n_features_in_)
+
+
 def phq8_severity(score):
     if score <= 4:
         return 'Minimal'
@@ -617,7 +562,27 @@ def predict():
         }
 
         # Server-side prediction using browser-compatible visual model
-        if HAS_BROWSER_VISUAL:
+        session_id = visual_data.get('sessionId')
+        session = _get_visual_session(session_id) if _valid_session_id(session_id) else None
+        if (HAS_BROWSER_VISUAL and browser_visual_columns is not None
+                and session is not None and session.n >= 5):
+            # Real temporal statistics from the streamed frames, by column name
+            try:
+                with _visual_sessions_lock:
+                    session_feats = session.features()
+                    n_frames = session.n
+                # A training column the session does not produce is a KeyError, not a 0
+                feat_arr = np.array(
+                    [[session_feats[c] for c in browser_visual_columns]], dtype=np.float64)
+                feat_scaled = browser_visual_scaler.transform(feat_arr)
+                server_visual_prob = float(browser_visual_model.predict_proba(feat_scaled)[0][1])
+                visual_prob = 0.6 * server_visual_prob + 0.4 * visual_prob
+                results['visual']['server_probability'] = round(server_visual_prob, 4)
+                results['visual']['probability'] = round(visual_prob, 4)
+                results['visual']['streamedFrames'] = n_frames
+            except Exception as e:
+                logger.warning(f"Browser visual session prediction failed: {e}")
+        elif HAS_BROWSER_VISUAL:
             try:
                 expressions = visual_data.get('expressions', {})
                 expr_features = []
@@ -635,13 +600,8 @@ def predict():
                 expr_features.append(1.0 if happy_mean > 0.3 else 0.0)  # smile_frequency
                 expr_features.append(0.5)  # expression_transition_rate placeholder
 
-                feat_arr = np.array(expr_features, dtype=np.float64).reshape(1, -1)
-                # Pad/trim to match model's expected features
-                expected = browser_visual_scaler.n_features_in_
-                if feat_arr.shape[1] < expected:
-                    feat_arr = np.pad(feat_arr, ((0, 0), (0, expected - feat_arr.shape[1])))
-                elif feat_arr.shape[1] > expected:
-                    feat_arr = feat_arr[:, :expected]
+                feat_arr = _fit_browser_visual_width(
+                    np.array(expr_features, dtype=np.float64).reshape(1, -1))
 
                 feat_scaled = browser_visual_scaler.transform(feat_arr)
                 server_visual_prob = float(browser_visual_model.predict_proba(feat_scaled)[0][1])
@@ -0,0 +1,67 @@
+# benchmarks/bench_cascade.py
+"""
+Early exits and single-request latency of CascadeVotingPredictor (main.py)
+on held-out CV folds of the feature tables in data/features.
+
+Each modality pipeline (build_modality_pipeline) is fitted on the training
+part of a 5-fold stratified split; every held-out row is then scored one
+at a time by the full ensemble and by the cascade, as app.py does.
+
+Usage:
+  python benchmarks/bench_cascade.py [--threshold 0.38]
+"""
+import os
+import sys
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import FEATURES_DIR
+
+TABLES = {'text': 'text_features.csv', 'audio': 'audio_features.csv',
+          'visual': 'visual_features.csv'}
+
+
+def _load(name):
+    labels = pd.read_csv(os.path.join(FEATURES_DIR, 'master_labels.csv'))[['pid', 'label']]
+    df = pd.read_csv(os.path.join(FEATURES_DIR, name)).merge(labels, on='pid')
+    X = df.drop(columns=['pid', 'label']).select_dtypes('number').fillna(0.0)
+    X = X.drop(columns=[c for c in X.columns if 'phq' in c.lower()])
+    return X.to_numpy(dtype=np.float64), df['label'].to_numpy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cascade early-exit benchmark')
+    parser.add_argument('--threshold', type=float, default=0.38)
+    args = parser.parse_args(argv)
+
+    import main as pipeline
+
+    rows = []
+    for modality, fname in TABLES.items():
+        X, y = _load(fname)
+        skf = StratifiedKFold(n_splits=5, shuffle=True, random_state=pipeline.RANDOM_STATE)
+        for fold, (tr, te) in enumerate(skf.split(X, y)):
+            smote_k = min(3, sum(y[tr] == 1) - 1)
+            pipe = pipeline.build_modality_pipeline(modality, X.shape[1], smote_k).fit(X[tr], y[tr])
+            rep = pipeline.cascade_report(pipe, X[te], args.threshold)
+            rows.append({'modality': modality, 'fold': fold, **rep})
+
+    report = pd.DataFrame(rows)
+    summary = report.groupby('modality', sort=False).agg(
+        rows=('rows', 'sum'), early_exit=('early_exit', 'mean'), full_ms=('full_ms', 'mean'),
+        cascade_ms=('cascade_ms', 'mean'), saved=('saved', 'mean'), agree=('agree', 'all'))
+    with pd.option_context('display.float_format', '{:.3f}'.format):
+        print(summary.to_string())
+    print("\nMember order (cheapest first):")
+    for modality, order in report.groupby('modality', sort=False)['order'].first().items():
+        print(f"  {modality:7s} {' → '.join(order)}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/bench_cnn_aggregation.py
+"""
+Runtime and peak memory of building the enhanced-visual CNN block for a
+cohort, on synthetic DenseNet201 / VGG16 / ResNet frame CSVs.
+
+before: per-column pandas Series statistics written into one ~10k-key dict
+        per participant, then pd.DataFrame(records)
+after:  extract_cnn_matrix: CSVs parsed straight to float32 and reduced column-wise into a
+        preallocated float32 (participants × features) matrix
+
+--pca-components K additionally fits the IncrementalPCA front-end
+(fit_cnn_projection, streamed in CNN_PCA_CHUNK_FRAMES chunks) and
+aggregates the projected frames.
+
+Runtime is measured untraced; peak memory is the tracemalloc peak (Python +
+NumPy allocations) above the level at the start of a second, traced run.
+
+Usage:
+  python benchmarks/bench_cnn_aggregation.py [--participants 6] [--frames 200]
+                                            [--pca-components 32]
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+NETWORKS = {'densenet201.csv': 1920, 'vgg16.csv': 4096, 'CNN_ResNet.mat.csv': 2048}
+
+
+def _write_tree(root, n_pids, n_frames, seed=0):
+    rng = np.random.RandomState(seed)
+    for i in range(n_pids):
+        feat_dir = os.path.join(root, f"{300 + i}_P", "features")
+        os.makedirs(feat_dir)
+        for name, dims in NETWORKS.items():
+            X = np.abs(rng.randn(n_frames, dims)).astype(np.float32)
+            with open(os.path.join(feat_dir, f"{300 + i}_{name}"), 'w') as f:
+                f.write('name,timeStamp,' + ','.join(f'f{j}' for j in range(dims)) + '\n')
+                for t in range(n_frames):
+                    f.write(f'frame{t},{t / 30:.3f},' + ','.join(f'{v:.4f}' for v in X[t]) + '\n')
+    return [300 + i for i in range(n_pids)]
+
+
+def _legacy_aggregate(df):
+    feature_cols = [c for c in df.columns if c not in ['name', 'timeStamp']]
+    features = df[feature_cols].select_dtypes(include=[np.number])
+    record = {}
+    for col in features.columns:
+        vals = features[col].dropna()
+        if len(vals) == 0:
+            continue
+        record[f'{col}_mean'] = vals.mean()
+        record[f'{col}_std'] = vals.std() if len(vals) > 1 else 0
+        record[f'{col}_min'] = vals.min()
+        record[f'{col}_max'] = vals.max()
+        record[f'{col}_median'] = vals.median()
+        if len(vals) > 1:
+            diffs = vals.diff().dropna()
+            record[f'{col}_diff_mean'] = diffs.mean()
+            record[f'{col}_diff_std'] = diffs.std() if len(diffs) > 1 else 0
+    return record
+
+
+def _legacy_cohort(pids, data_root):
+    from src.visual_features_enhanced import cnn_feature_files
+    records = []
+    for pid in pids:
+        record = {'pid': pid}
+        for cnn_name, path in cnn_feature_files(pid, data_root).items():
+            if os.path.exists(path):
+                for k, v in _legacy_aggregate(pd.read_csv(path)).items():
+                    record[f'{cnn_name}_{k}'] = v
+        records.append(record)
+    return pd.DataFrame(records)
+
+
+def _matrix_cohort(pids, data_root):
+    from src.visual_features_enhanced import extract_cnn_matrix
+    matrix, names, _ = extract_cnn_matrix(pids, data_root)
+    return pd.DataFrame(matrix, columns=names, copy=False)
+
+
+def _projected_cohort(pids, data_root, k):
+    from src.visual_features_enhanced import extract_cnn_matrix, fit_cnn_projection
+    projection = fit_cnn_projection(pids, data_root, n_components=k)
+    matrix, names, _ = extract_cnn_matrix(pids, data_root, projection=projection)
+    return pd.DataFrame(matrix, columns=names, copy=False)
+
+
+def _measure(fn, *args):
+    """(result, seconds, peak MiB); timed untraced, since tracing slows pandas loops."""
+    t0 = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return out, elapsed, peak / 2**20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='CNN temporal aggregation benchmark')
+    parser.add_argument('--participants', type=int, default=6)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--pca-components', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pids = _write_tree(tmp, args.participants, args.frames)
+
+        legacy, before, before_mb = _measure(_legacy_cohort, pids, tmp)
+        matrix, after, after_mb = _measure(_matrix_cohort, pids, tmp)
+
+        legacy = legacy.drop(columns='pid')[matrix.columns].to_numpy(dtype=np.float64)
+        err = np.nanmax(np.abs(legacy - matrix.to_numpy()) / (np.abs(legacy) + 1e-6))
+
+        if args.pca_components:
+            projected, pca_sec, pca_mb = _measure(_projected_cohort, pids, tmp,
+                                                  args.pca_components)
+
+    print(f"{args.participants} participants x {args.frames} frames, "
+          f"{matrix.shape[1]} CNN features")
+    print(f"  before: {before:6.2f}s  peak {before_mb:7.1f} MiB  (pandas dicts → DataFrame)")
+    print(f"  after:  {after:6.2f}s  peak {after_mb:7.1f} MiB  (preallocated float32 matrix)")
+    print(f"  speedup {before / after:.1f}x, max relative difference {err:.1e}")
+    if args.pca_components:
+        print(f"  pca:    {pca_sec:6.2f}s  peak {pca_mb:7.1f} MiB  (fit + project, "
+              f"{projected.shape[1]} features, {matrix.shape[1] / projected.shape[1]:.0f}x fewer)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
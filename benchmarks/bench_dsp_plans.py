@@ -0,0 +1,90 @@
+# benchmarks/bench_dsp_plans.py
+"""
+Per-request latency of the server audio path with and without cached DSP plans.
+
+before: full-length FFT resample (scipy.signal.resample) and every plan
+        (resampling filter, windows, masks, mel/DCT matrices) rebuilt per request
+after:  polyphase resample + plans reused from get_dsp_plan()
+
+"front-end" is decode-to-float + resampling + plan lookup; "request" adds
+the LLD engine and functionals, i.e. the whole feature extraction.
+
+Usage:
+  python benchmarks/bench_dsp_plans.py [--seconds 10] [--repeats 15]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from scipy.signal import resample
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.audio_lld import SAMPLE_RATE, compute_llds, get_dsp_plan, summarize_llds
+
+
+def _recording(rate, seconds, seed=0):
+    """Browser-like int16 speech proxy: harmonic tone with pauses and noise."""
+    rng = np.random.RandomState(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    f0 = 140 + 25 * np.sin(2 * np.pi * 0.4 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / rate
+    x = sum(np.sin(k * phase) / k for k in range(1, 20))
+    x *= (np.sin(2 * np.pi * 0.25 * t) > -0.3)
+    x += 0.02 * rng.randn(len(t))
+    return (x / np.abs(x).max() * 0.5 * 32767).astype(np.int16)
+
+
+def _front_before(pcm, rate):
+    get_dsp_plan.cache_clear()
+    audio = pcm.astype(np.float32) / np.iinfo(np.int16).max
+    audio = resample(audio, int(len(audio) * SAMPLE_RATE / rate))
+    get_dsp_plan(SAMPLE_RATE, SAMPLE_RATE)  # windows / mel / DCT rebuilt per request
+    return audio
+
+
+def _front_after(pcm, rate):
+    audio = pcm.astype(np.float32) / np.iinfo(np.int16).max
+    audio = get_dsp_plan(rate, SAMPLE_RATE).resample(audio)
+    get_dsp_plan(SAMPLE_RATE, SAMPLE_RATE)
+    return audio
+
+
+def _full(front):
+    def run(pcm, rate):
+        return summarize_llds(*compute_llds(front(pcm, rate), SAMPLE_RATE))
+    return run
+
+
+def _time(fn, pcm, rate, repeats):
+    fn(pcm, rate)  # warm-up (imports, first plan for "after")
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(pcm, rate)
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--repeats', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    print(f"~{args.seconds:.0f} s recordings, {args.repeats} requests each, median ms")
+    print(f"  {'rate':>8} {'length':>8}  {'front-end before/after':>24}  {'request before/after':>22}")
+    for rate in (44100, 48000):
+        # Browser blobs are rarely a round number of samples
+        for extra, label in ((0, 'round'), (7, 'odd')):
+            pcm = _recording(rate, args.seconds + extra / rate)
+            fb = _time(_front_before, pcm, rate, args.repeats)
+            fa = _time(_front_after, pcm, rate, args.repeats)
+            rb = _time(_full(_front_before), pcm, rate, args.repeats)
+            ra = _time(_full(_front_after), pcm, rate, args.repeats)
+            print(f"  {rate / 1000:6.1f}k {label:>8}  {fb:9.1f} / {fa:6.1f} ({fb / fa:4.1f}x)"
+                  f"  {rb:8.1f} / {ra:6.1f} ({rb / ra:4.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_fit_cache.py
+"""
+Preprocessing time of the 60 main.py CV pipelines with a cold and a warm
+FitCache (src/fit_cache.py), on synthetic E-DAIC-shaped data.
+
+Only the cached prefix (VarianceThreshold → SelectKBest(mutual_info) / PCA
+→ StandardScaler) is timed; SMOTE and the ensembles are fitted either way.
+A warm run is what a re-run of main.py sees after only the classifiers
+changed.
+
+Usage:
+  python benchmarks/bench_fit_cache.py [--samples 219]
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+import tempfile
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from bench_cv_scheduler import _synthetic
+
+
+def _prefixes(pipeline, X, y, tasks, cache):
+    """Fit (or fetch) every task's preprocessing prefix; returns outputs."""
+    from src.fit_cache import _prefix_length
+    out = []
+    for t in tasks:
+        y_fit = y[t.fit_idx]
+        pipe = pipeline.build_modality_pipeline(t.modality, X[t.modality].shape[1],
+                                                min(3, sum(y_fit == 1) - 1),
+                                                pipeline.task_seed(t.fold, t.inner, t.modality))
+        steps = pipe.steps[:_prefix_length(pipe.steps)]
+        if cache is None:
+            Xt = X[t.modality][t.fit_idx]
+            for _, step in steps:
+                Xt = step.fit_transform(Xt, y_fit)
+        else:
+            _, Xt = cache.fit_transform(steps, X[t.modality][t.fit_idx], y_fit)
+        out.append(Xt)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Preprocessing fit cache benchmark')
+    parser.add_argument('--samples', type=int, default=219)
+    args = parser.parse_args(argv)
+
+    import main as pipeline
+    from src.fit_cache import FitCache
+
+    X, y = _synthetic(args.samples)
+    skf = StratifiedKFold(n_splits=pipeline.N_OUTER_SPLITS, shuffle=True,
+                          random_state=pipeline.RANDOM_STATE)
+    tasks = pipeline.expand_cv_tasks(y, list(skf.split(X['text'], y)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FitCache(tmp)
+        timings = {}
+        for label, c in [('uncached', None), ('cold cache', cache), ('warm cache', cache)]:
+            t0 = time.perf_counter()
+            outputs = _prefixes(pipeline, X, y, tasks, c)
+            timings[label] = time.perf_counter() - t0
+            if label == 'uncached':
+                reference = outputs
+        identical = all(np.array_equal(a, b) for a, b in zip(reference, outputs))
+
+        print(f"{len(tasks)} preprocessing prefixes, {args.samples} samples")
+        for label, sec in timings.items():
+            print(f"  {label:11s} {sec:6.2f}s")
+        print(f"  warm speedup {timings['uncached'] / timings['warm cache']:.0f}x, "
+              f"identical={identical}; {cache.summary()}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
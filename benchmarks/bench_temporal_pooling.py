@@ -0,0 +1,178 @@
+# benchmarks/bench_temporal_pooling.py
+"""
+Feature drift vs. extraction time for temporal pooling settings
+(src/temporal_pooling.py), to pick a cost/accuracy point for
+VISUAL_FRAME_STRIDE / VISUAL_POOL_WINDOW / VISUAL_POOL_MODE / VISUAL_MAX_FRAMES.
+
+For every setting the basic, enhanced (OpenFace + CNN) and browser
+feature sets are extracted cold (empty OpenFace cache). Drift is measured
+per feature as |pooled - full| in units of the cohort standard deviation
+of the full-frame feature (floored at 1% of its mean magnitude, so
+near-constant features such as post-ReLU CNN minima do not dominate).
+Level features (mean, max, presence, ...) are
+summarised as the median and 95th percentile across features; dynamics
+features (std, diff_*, trend, variability) are reported separately (median),
+since striding rescales frame-to-frame change and pooling smooths it.
+
+Runs on a real E-DAIC tree (--data-root, participants from
+data/features/master_labels.csv) or on a synthetic one with smooth
+AR(1) frame series (default).
+
+Usage:
+  python benchmarks/bench_temporal_pooling.py [--participants 8] [--frames 20000]
+         [--cnn-dims 128] [--data-root PATH] [--output results/temporal_pooling_report.csv]
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# (label, overrides) — the first entry is the full-frame reference
+SETTINGS = [
+    ('full', {}),
+    ('stride 2', {'stride': 2}),
+    ('stride 5', {'stride': 5}),
+    ('stride 10', {'stride': 10}),
+    ('window 15 mean', {'window': 15}),
+    ('window 30 mean', {'window': 30}),
+    ('window 30 max', {'window': 30, 'mode': 'max'}),
+    ('stride 3 + window 10', {'stride': 3, 'window': 10}),
+    ('cap 3000', {'max_frames': 3000}),
+]
+
+AU_R = ['AU01', 'AU02', 'AU04', 'AU05', 'AU06', 'AU07', 'AU09', 'AU10', 'AU12',
+        'AU14', 'AU15', 'AU17', 'AU20', 'AU23', 'AU25', 'AU26', 'AU45']
+
+
+def _ar1(rng, n, k, phi=0.98):
+    """Smooth per-column AR(1) series with a participant-level offset."""
+    noise = rng.randn(n, k) * np.sqrt(1 - phi ** 2)
+    X = np.empty((n, k))
+    X[0] = rng.randn(k)
+    for t in range(1, n):
+        X[t] = phi * X[t - 1] + noise[t]
+    return X + rng.randn(k)
+
+
+def _write_tree(root, n_pids, n_frames, cnn_dims, seed=0):
+    rng = np.random.RandomState(seed)
+    for i in range(n_pids):
+        pid = 300 + i
+        feat_dir = os.path.join(root, f"{pid}_P", "features")
+        os.makedirs(feat_dir)
+        data = {'frame': np.arange(n_frames), 'timestamp': np.arange(n_frames) / 30.0,
+                'confidence': np.round(rng.uniform(0.75, 1.0, n_frames), 2),
+                'success': (rng.rand(n_frames) > 0.03).astype(int)}
+        au = np.clip(_ar1(rng, n_frames, len(AU_R)) + 1.0, 0, 5)
+        for j, name in enumerate(AU_R):
+            data[f'{name}_r'] = np.round(au[:, j], 2)
+            data[f'{name}_c'] = (au[:, j] > 1.0).astype(int)
+        motion = _ar1(rng, n_frames, 8)
+        for j, name in enumerate(['pose_Tx', 'pose_Ty', 'pose_Rx', 'pose_Ry', 'pose_Rz',
+                                  'gaze_angle_x', 'gaze_angle_y', 'gaze_0_x']):
+            data[name] = np.round(motion[:, j] * 0.3, 4)
+        pd.DataFrame(data).to_csv(
+            os.path.join(feat_dir, f"{pid}_OpenFace2.1.0_Pose_gaze_AUs.csv"), index=False)
+
+        cnn = pd.DataFrame(np.abs(_ar1(rng, n_frames, cnn_dims)).round(4),
+                           columns=[f'd{j}' for j in range(cnn_dims)])
+        cnn.insert(0, 'name', [f'frame{t}' for t in range(n_frames)])
+        cnn.to_csv(os.path.join(feat_dir, f"{pid}_densenet201.csv"), index=False)
+    return [300 + i for i in range(n_pids)]
+
+
+def _extract_all(pids, data_root):
+    """{feature set: DataFrame indexed by pid} and seconds, from a cold cache."""
+    from src.openface_loader import clear_openface_cache
+    from src.visual_features import extract_openface_basic
+    from src.visual_features_enhanced import build_visual_enhanced_table
+    from src.visual_browser_model import extract_browser_visual_features
+
+    clear_openface_cache()
+    t0 = time.perf_counter()
+    basic, browser = [], []
+    for pid in pids:
+        basic.append(extract_openface_basic(pid, data_root) or {'pid': pid})
+        browser.append(dict(extract_browser_visual_features(pid, data_root) or {}, pid=pid))
+    enhanced = build_visual_enhanced_table(pids, data_root, [])
+    elapsed = time.perf_counter() - t0
+    sets = {'basic': pd.DataFrame(basic), 'enhanced': enhanced, 'browser': pd.DataFrame(browser)}
+    return {k: v.set_index('pid').astype(float) for k, v in sets.items()}, elapsed
+
+
+DYNAMICS_MARKERS = ('_std', 'diff_', 'trend', '_var', 'variability', 'transition')
+
+
+def _drift(ref, other):
+    """|other - ref| / cohort SD of ref, for (level, dynamics) feature columns."""
+    other = other.reindex(index=ref.index, columns=ref.columns)
+    scale = np.maximum(ref.std(), 0.01 * ref.abs().mean()).replace(0, np.nan)
+    z = (other - ref).abs() / scale
+    dynamic = [c for c in z.columns if any(m in c for m in DYNAMICS_MARKERS)]
+    out = []
+    for part in (z.drop(columns=dynamic), z[dynamic]):
+        vals = part.to_numpy().ravel()
+        out.append(vals[np.isfinite(vals)])
+    return out
+
+
+def _summary(vals, q):
+    return round(float(np.percentile(vals, q)), 4) if vals.size else np.nan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Temporal pooling drift / time report')
+    parser.add_argument('--participants', type=int, default=8)
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--cnn-dims', type=int, default=128)
+    parser.add_argument('--data-root', default=None,
+                        help='Real E-DAIC data root (default: synthetic tree)')
+    parser.add_argument('--output', default=os.path.join('results', 'temporal_pooling_report.csv'))
+    args = parser.parse_args(argv)
+
+    from src.temporal_pooling import pooling_settings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.data_root:
+            from config import FEATURES_DIR
+            labels = pd.read_csv(os.path.join(FEATURES_DIR, 'master_labels.csv'))
+            data_root, pids = args.data_root, labels['pid'].tolist()[:args.participants]
+        else:
+            data_root = tmp
+            pids = _write_tree(tmp, args.participants, args.frames, args.cnn_dims)
+
+        rows, reference, ref_sec = [], None, None
+        for label, overrides in SETTINGS:
+            with pooling_settings(**overrides):
+                feats, elapsed = _extract_all(pids, data_root)
+            if reference is None:
+                reference, ref_sec = feats, elapsed
+            row = {'setting': label, 'seconds': round(elapsed, 2),
+                   'time_saved_pct': round(100 * (1 - elapsed / ref_sec), 1)}
+            for name, ref in reference.items():
+                level, dynamics = _drift(ref, feats[name])
+                row[f'{name}_drift_median'] = _summary(level, 50)
+                row[f'{name}_drift_p95'] = _summary(level, 95)
+                row[f'{name}_dyn_drift_median'] = _summary(dynamics, 50)
+            rows.append(row)
+
+    report = pd.DataFrame(rows)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    report.to_csv(args.output, index=False)
+    source = args.data_root or f"synthetic, {args.frames} frames, {args.cnn_dims} CNN dims"
+    print(f"{len(pids)} participants ({source}); drift in cohort SD units")
+    with pd.option_context('display.width', 250, 'display.max_columns', 20):
+        print(report.to_string(index=False))
+    print(f"  Report → {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -22,7 +22,7 @@ N_TFIDF = 50
 PCA_COMPONENTS = 20
 SMOTE_K_NEIGHBORS = 3
 CV_SPLITS = 5
-CV_REPEATS = 1           # Fast 5-Fold Evaluation
+CV_REPEATS = 1           # Fast 5-Fold Evaluation (main.py --repeats; >1 adds mean / SD / intervals)
 RANDOM_STATE = 42
 
 # ── Sentence-Transformers (optional) ───────────────────────────
@@ -35,10 +35,39 @@ AUGMENT_NOISE = True          # Add Gaussian noise to features
 MIXUP_ALPHA = 0.2             # Beta distribution parameter for Mixup
 NOISE_STD = 0.05              # Gaussian noise standard deviation
 AUGMENT_FACTOR = 2            # Multiply minority class by this factor
+AUGMENT_LEGACY_RNG = False    # True: per-sample draws, reproducing pre-batching per-seed output
+
+# ── Mutual-information feature scoring (src/feature_scoring.py) ─
+MI_SCORER = 'sklearn'         # 'sklearn', 'knn' (same estimate, vectorized) or 'binned'
+MI_N_BINS = 8                 # Quantile bins per feature for 'binned'
+MI_N_NEIGHBORS = 3            # k for 'knn' (sklearn's default)
+
+# ── Fitted preprocessing cache (src/fit_cache.py) ─────────────
+FIT_CACHE_DIR = os.path.join('.cache', 'fit_cache')
+FIT_CACHE_MAX_MB = 512        # LRU entries are evicted above this size
+
+# ── Resumable training runs (src/checkpoints.py) ──────────────
+CHECKPOINT_DIR = os.path.join('.cache', 'runs')
+CHECKPOINT_PIPELINES = False  # Also store each fold's fitted pipelines
 
 # ── Regularization search grid ─────────────────────────────────
 C_GRID = [0.1, 1.0]
 
+# ── Successive-halving search (main.py --search) ───────────────
+# Pipeline params of the modality ensembles (clf = VotingClassifier)
+SEARCH_SPACE = {
+    'clf__lr__C': C_GRID,
+    'clf__svc__C': C_GRID,
+    'clf__rf__max_depth': [4, 6],
+    'clf__rf__min_samples_leaf': [2, 3],
+    'clf__gb__learning_rate': [0.05, 0.1],
+    'clf__gb__n_estimators': [100, 150],
+}
+SEARCH_ETA = 3                # Keep the best 1/ETA per rung, ETA× more folds
+SEARCH_MIN_FOLDS = 1          # Folds every candidate is scored on first
+SEARCH_MAX_FOLDS = 9          # Folds of the last rung (5-fold, repeated)
+SEARCH_MAX_FITS = 200         # Fit budget per modality (candidates are subsampled to fit)
+
 # ── Threshold tuning ───────────────────────────────────────────
 THRESHOLD_MIN = 0.25
 THRESHOLD_MAX = 0.65
@@ -58,6 +87,27 @@ MIN_CLINICAL_F1 = 0.60
 N_BOOTSTRAP = 1000            # Number of bootstrap iterations for CIs
 CI_LEVEL = 0.95               # 95% confidence intervals
 
+# ── Visual feature extraction ─────────────────────────────────
+OPENFACE_CACHE_SIZE = 8      # Participants' OpenFace frames kept in memory
+# CNN_PCA_COMPONENTS > 0 is TRANSDUCTIVE in the standard pipeline: features are
+# built once before cross-validation, so the PCA is fit on every participant's
+# frames, test folds included. Only build_*_visual_features(pca_fit_ids=...)
+# restricts the fit to training participants.
+CNN_PCA_COMPONENTS = 0       # >0: IncrementalPCA per CNN before aggregation
+CNN_PCA_CHUNK_FRAMES = 2048  # Frames per partial_fit / transform chunk
+
+# ── Temporal pooling of visual frames (src/temporal_pooling.py) ─
+# Defaults keep every frame; see benchmarks/bench_temporal_pooling.py
+VISUAL_FRAME_STRIDE = 1      # Keep every Nth frame
+VISUAL_POOL_WINDOW = 1       # Pool N consecutive (kept) frames into one
+VISUAL_POOL_MODE = 'mean'    # 'mean' or 'max' per window
+VISUAL_MAX_FRAMES = 0        # Evenly subsample to at most N frames (0 = no cap)
+
+# ── Streaming visual sessions (/api/visual-frames) ─────────────
+VISUAL_SESSION_LIMIT = 256           # Concurrent sessions before LRU eviction
+VISUAL_SESSION_TTL_SEC = 1800        # Idle sessions are dropped after this
+VISUAL_BATCH_MAX_FRAMES = 500        # Max frames accepted per request
+
 # ── Flask settings ─────────────────────────────────────────────
 FLASK_DEBUG = os.environ.get('FLASK_DEBUG', 'false').lower() == 'true'
 FLASK_PORT = int(os.environ.get('FLASK_PORT', 5000))
@@ -14,21 +14,22 @@ Features:
 import os
 import sys
 import time
+import argparse
 import logging
 import warnings
+from collections import namedtuple
+from functools import partial
+from contextlib import ExitStack
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import RepeatedStratifiedKFold, StratifiedKFold
+from sklearn.model_selection import StratifiedKFold
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
-from sklearn.feature_selection import SelectKBest, mutual_info_classif, VarianceThreshold
+from sklearn.feature_selection import SelectKBest, VarianceThreshold
 from sklearn.metrics import (roc_auc_score, f1_score, accuracy_score, confusion_matrix, 
-                             roc_curve, precision_recall_curve, average_precision_score, 
+                             average_precision_score, 
                              classification_report, recall_score, precision_score,
                              balanced_accuracy_score)
-from sklearn.calibration import calibration_curve
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
 from sklearn.ensemble import (RandomForestClassifier, GradientBoostingClassifier, 
@@ -37,6 +38,20 @@ from sklearn.calibration import CalibratedClassifierCV
 from imblearn.over_sampling import SMOTE
 from imblearn.pipeline import Pipeline as ImbPipeline
 import joblib
+from joblib import Parallel, delayed
+
+from config import (FIT_CACHE_DIR, FIT_CACHE_MAX_MB, CHECKPOINT_DIR, CHECKPOINT_PIPELINES,
+                    CV_REPEATS, CI_LEVEL)
+from src.fit_cache import FitCache, fit_pipeline_cached
+from src.checkpoints import RunCheckpoint, run_key
+from src.reporting import render_report, save_cv_outputs
+from src.evaluate import evaluate_repeats
+from src.feature_scoring import mi_score_func
+from src.thresholds import best_threshold
+from src.hyperparam_search import (BEST_PATH as SEARCH_BEST_PATH, TUNED_WARNING, load_search_best,
+                                   successive_halving, write_search_results)
+from src.profiling import (PROFILE_PATH, PipelineProfiler, pipeline_estimator_types,
+                           format_summary, slowest_step, write_profile)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
@@ -96,62 +111,450 @@ def get_visual_ensemble():
         ('lr', LogisticRegression(C=1.0, class_weight='balanced', max_iter=5000, random_state=RANDOM_STATE))
     ], voting='soft')
 
-def plot_curves(y_true, y_probs, names, title_suffix, filename):
-    plt.figure(figsize=(10, 8))
-    colors = ['#4F8EF7', '#9B6FFF', '#10B981', '#EF4444']
-    for name, y_prob, color in zip(names, y_probs, colors):
-        fpr, tpr, _ = roc_curve(y_true, y_prob)
-        auc = roc_auc_score(y_true, y_prob)
-        plt.plot(fpr, tpr, label=f'{name} (AUC = {auc:.3f})', linewidth=2.5, color=color)
-    
-    plt.plot([0, 1], [0, 1], 'k--', alpha=0.5)
-    plt.xlabel('False Positive Rate', fontsize=13)
-    plt.ylabel('True Positive Rate', fontsize=13)
-    plt.title(f'ROC Curves — {title_suffix}', fontsize=15, fontweight='bold')
-    plt.legend(loc='lower right', fontsize=12)
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, filename), dpi=150)
-    plt.close()
-
-
-def plot_calibration_curve(y_true, y_probs, filename):
-    prob_true, prob_pred = calibration_curve(y_true, y_probs, n_bins=10, strategy='quantile')
-    plt.figure(figsize=(8, 8))
-    plt.plot(prob_pred, prob_true, marker='o', linewidth=2, color='#4F8EF7')
-    plt.plot([0, 1], [0, 1], 'k--', alpha=0.6)
-    plt.xlabel('Predicted Probability', fontsize=13)
-    plt.ylabel('Observed Fraction Positive', fontsize=13)
-    plt.title('Calibration Curve — Fusion Model', fontsize=15, fontweight='bold')
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, filename), dpi=150)
-    plt.close()
-
-
-def plot_probability_distribution(y_true, y_probs, filename):
-    y_true = np.asarray(y_true)
-    y_probs = np.asarray(y_probs)
-    plt.figure(figsize=(10, 6))
-    sns.histplot(y_probs[y_true == 0], color='#10B981', label='Non-Depressed', kde=True, stat='density', alpha=0.45, bins=20)
-    sns.histplot(y_probs[y_true == 1], color='#EF4444', label='Depressed', kde=True, stat='density', alpha=0.45, bins=20)
-    plt.xlabel('Fusion Probability', fontsize=13)
-    plt.ylabel('Density', fontsize=13)
-    plt.title('Fusion Probability Distribution by Class', fontsize=15, fontweight='bold')
-    plt.legend(fontsize=12)
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, filename), dpi=150)
-    plt.close()
+# ── CV TASK SCHEDULER ───────────────────────────────────────────────
+# Every pipeline fit in the CV loop (outer fold × {outer fit, 3 inner fits}
+# × modality = 60 fits) is independent, so they are expanded into tasks,
+# run on a process pool and reassembled in their original order. Each task
+# carries its own seed for the one stochastic step that used the global
+# RNG (mutual_info_classif), so results do not depend on execution order
+# or the number of workers. Fitted preprocessing prefixes (everything
+# before SMOTE) are shared across runs through an on-disk FitCache.
+
+MODALITIES = ('text', 'audio', 'visual')
+N_OUTER_SPLITS = 5
+N_INNER_SPLITS = 3
+
+ENSEMBLES = {'text': get_text_ensemble, 'audio': get_audio_ensemble,
+             'visual': get_visual_ensemble}
+
+# One pipeline fit; inner is None for the outer-fold fit
+CVTask = namedtuple('CVTask', ['fold', 'inner', 'modality', 'fit_idx', 'eval_idx'])
+
+
+def task_seed(fold, inner, modality):
+    """Deterministic seed for one (fold, inner, modality) task."""
+    entropy = [RANDOM_STATE, fold, -1 if inner is None else inner, MODALITIES.index(modality)]
+    return int(np.random.SeedSequence([e + 1 for e in entropy]).generate_state(1)[0])
+
+
+def build_modality_pipeline(modality, n_features, smote_k, mi_seed=RANDOM_STATE, params=None):
+    """
+    VarianceThreshold → [SelectKBest(MI) | PCA] → scaler → SMOTE → ensemble.
+    ``params`` (e.g. the --search result for this modality) are set on top.
+    """
+    steps = [('vt', VarianceThreshold())]
+    if modality == 'audio':
+        # SelectKBest(50) reduces 1218 → 50 most informative features
+        steps.append(('sk', SelectKBest(mi_score_func(mi_seed), k=min(50, n_features))))
+    elif modality == 'visual':
+        # PCA(30) reduces correlated AU features to orthogonal components
+        steps.append(('pca', PCA(n_components=min(30, n_features))))
+    steps += [('sc', StandardScaler()),
+              ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=smote_k)),
+              ('clf', ENSEMBLES[modality]())]
+    pipe = ImbPipeline(steps)
+    return pipe.set_params(**params) if params else pipe
+
+
+def outer_cv_splits(y, repeats=1):
+    """
+    Outer folds of ``repeats`` stratified 5-fold splits, numbered globally
+    (repeat r holds folds 5r … 5r+4). Repeat 0 is the single-run split, so
+    a repeated run extends a single one fold for fold, checkpoints included.
+    """
+    splits = []
+    for r in range(repeats):
+        skf = StratifiedKFold(n_splits=N_OUTER_SPLITS, shuffle=True, random_state=RANDOM_STATE + r)
+        splits.extend(skf.split(np.zeros(len(y)), y))
+    return splits
+
+
+def fold_batches(folds, jobs, tasks_per_fold):
+    """
+    Consecutive groups of ``folds`` run as one task pool: one fold when
+    serial, otherwise enough folds to give every worker a task, so repeats
+    fill a large machine instead of running one after another.
+    """
+    size = max(1, -(-joblib.effective_n_jobs(jobs) // tasks_per_fold))
+    return [folds[i:i + size] for i in range(0, len(folds), size)]
+
+
+def expand_cv_tasks(y, outer_splits):
+    """Outer fits and 3-fold inner fits for every fold and modality, in serial order."""
+    tasks = []
+    for fold, (train_idx, test_idx) in enumerate(outer_splits):
+        tasks.extend(CVTask(fold, None, mod, train_idx, test_idx) for mod in MODALITIES)
+        inner_cv = StratifiedKFold(n_splits=N_INNER_SPLITS, shuffle=True,
+                                   random_state=RANDOM_STATE + fold)
+        y_train = y[train_idx]
+        for inner, (i_train, i_val) in enumerate(inner_cv.split(np.zeros(len(y_train)), y_train)):
+            tasks.extend(CVTask(fold, inner, mod, train_idx[i_train], train_idx[i_val])
+                         for mod in MODALITIES)
+    return tasks
+
+
+# What one task sends back from its worker; profile is the list of profile
+# records (the PipelineProfiler itself when a pstats target is given)
+TaskResult = namedtuple('TaskResult', ['probs', 'cache_stats', 'profile', 'pipeline'])
+
+
+def run_cv_task(X, y, task, cache=None, profile=False, pstats_target=None, keep_pipeline=False,
+                params=None):
+    """
+    Fit one modality pipeline (with ``params``, if given) and score its
+    evaluation rows. Fit-cache counters, profile records and the fitted
+    pipeline are returned only when a cache, ``profile`` or
+    ``keep_pipeline`` is given.
+    """
+    # A fresh handle per task, so counters travel back from worker processes
+    local = FitCache(cache.directory, cache.max_bytes) if cache is not None else None
+    y_fit = y[task.fit_idx]
+    smote_k = min(3, sum(y_fit == 1) - 1)
+    pipe = build_modality_pipeline(task.modality, X.shape[1], smote_k,
+                                   task_seed(task.fold, task.inner, task.modality), params)
+    profiler = PipelineProfiler(pstats_target) if profile else None
+    with ExitStack() as stack:
+        if profiler is not None:
+            stack.enter_context(profiler.instrument(pipeline_estimator_types(pipe)))
+            stack.enter_context(profiler.labelled(fold=task.fold, inner=task.inner,
+                                                  modality=task.modality))
+        fit_pipeline_cached(pipe, X[task.fit_idx], y_fit, local)
+        probs = pipe.predict_proba(X[task.eval_idx])[:, 1]
+    if profiler is not None and not pstats_target:
+        profiler = profiler.records
+    return TaskResult(probs, local.stats if local else None, profiler,
+                      pipe if keep_pipeline else None)
+
+
+def run_cv_tasks(X_by_modality, y, tasks, jobs=1, cache=None, profile_records=None,
+                 pipelines=None, params=None):
+    """
+    Run tasks on ``jobs`` processes (1 = in-process); probabilities keyed by
+    task. Pass a list as ``profile_records`` to profile every task into it,
+    a dict as ``pipelines`` to collect the fitted outer-fold pipelines, and
+    {modality: params} as ``params`` to override ensemble parameters.
+    """
+    profile = profile_records is not None
+    params = params or {}
+    results = Parallel(n_jobs=jobs)(
+        delayed(run_cv_task)(X_by_modality[t.modality], y, t, cache, profile,
+                             keep_pipeline=pipelines is not None and t.inner is None,
+                             params=params.get(t.modality))
+        for t in tasks)
+    for t, res in zip(tasks, results):
+        if cache is not None:
+            cache.merge_stats(res.cache_stats)
+        if profile:
+            profile_records.extend(res.profile)
+        if res.pipeline is not None:
+            pipelines[(t.fold, t.modality)] = res.pipeline
+    return {(t.fold, t.inner, t.modality): res.probs for t, res in zip(tasks, results)}
+
+
+def safe_auc(y_true, probs):
+    """ROC AUC, or 0.5 when ``y_true`` has a single class."""
+    try:
+        return roc_auc_score(y_true, probs)
+    except ValueError:
+        return 0.5
+
+
+def auc_weights(inner_aucs):
+    """Fusion weights from mean validation AUCs (weight = AUC - 0.5, clipped at 0.01), normalized."""
+    w = {mod: max(0.01, np.mean(inner_aucs[mod]) - 0.5) for mod in MODALITIES}
+    total_w = sum(w.values())
+    return {mod: w[mod] / total_w for mod in w}
+
+
+def fuse_fold(fold, test_idx, y, probs, inner_aucs, fit_idx=None, fit_probs=None):
+    """
+    Fuse one outer fold's held-out modality ``probs`` with AUC weights from
+    ``inner_aucs``. When given, ``fit_probs`` (out-of-fold probabilities,
+    rows × modality, of the training rows ``fit_idx``, from the inner fits)
+    also fit a stacking meta-learner and pick the fusion threshold
+    (Youden's J), as used by --fusion oof / compare.
+    """
+    y_test = y[test_idx]
+    w = auc_weights(inner_aucs)
+    probs['fusion'] = w['text'] * probs['text'] + w['audio'] * probs['audio'] + w['visual'] * probs['visual']
+    result = {'fold': fold, 'test_idx': test_idx, 'y_test': y_test, 'probs': probs,
+              'inner_aucs': inner_aucs, 'weights': w}
+    if fit_probs is not None:
+        stacker = LogisticRegression(class_weight='balanced', random_state=RANDOM_STATE)
+        stacker.fit(fit_probs, y[fit_idx])
+        probs['stacking'] = stacker.predict_proba(np.column_stack([probs[m] for m in MODALITIES]))[:, 1]
+        result['threshold'] = find_optimal_threshold(
+            y[fit_idx], fit_probs @ np.array([w[m] for m in MODALITIES]))
+
+    # Track per-fold AUCs
+    result['aucs'] = {name: safe_auc(y_test, p) for name, p in probs.items()}
+    return result
+
+
+def fold_outputs(fold, test_idx, y, tasks, task_probs, fusion='inner'):
+    """
+    Everything the summary needs from one outer fold: held-out probabilities
+    per modality and fused, inner-CV AUCs, fusion weights and fold AUCs.
+    ``fusion`` (FUSION_MODES): 'inner' weights by the mean per-inner-fold
+    AUC; 'oof' by the AUC of the pooled inner out-of-fold predictions, which
+    also fit the stacker and threshold; 'compare' is 'inner' weighting with
+    that stacker and threshold.
+    """
+    probs = {mod: task_probs[(fold, None, mod)] for mod in MODALITIES}
+
+    # ── FUSION (Dynamic AUC-Based Weighting) ─────────────────────
+    # Validation AUC for each modality from internal CV on the training fold
+    # gives data-driven weights instead of arbitrary ones
+    inner_tasks = [t for t in tasks if t.fold == fold and t.inner is not None]
+    inner_aucs = {mod: [] for mod in MODALITIES}
+    for task in inner_tasks:
+        inner_aucs[task.modality].append(safe_auc(
+            y[task.eval_idx], task_probs[(fold, task.inner, task.modality)]))
+    if fusion == 'inner':
+        return fuse_fold(fold, test_idx, y, probs, inner_aucs)
+
+    # The inner validation folds partition the training fold, so together
+    # they are out-of-fold predictions for every training row
+    fit_idx = np.concatenate([t.eval_idx for t in inner_tasks if t.modality == MODALITIES[0]])
+    fit_probs = np.column_stack([
+        np.concatenate([task_probs[(fold, t.inner, mod)] for t in inner_tasks if t.modality == mod])
+        for mod in MODALITIES])
+    if fusion == 'oof':
+        inner_aucs = {mod: [safe_auc(y[fit_idx], fit_probs[:, m])]
+                      for m, mod in enumerate(MODALITIES)}
+    return fuse_fold(fold, test_idx, y, probs, inner_aucs, fit_idx, fit_probs)
+
+
+# ── OUT-OF-FOLD FUSION (--fusion oof) ───────────────────────────────
+# The 3 inner fits of an outer fold are a 3-fold cross_val_predict over its
+# training rows (run by the shared task pool, through the fit cache). In oof
+# mode those pooled predictions set the AUC weights and fit the stacker and
+# the Youden threshold, so nothing is estimated from the fold's own test
+# rows; --fusion compare reports both weightings from the same fits.
+
+FUSION_MODES = ('inner', 'oof', 'compare')
+FUSION_COMPARISON_PATH = os.path.join(RESULTS_DIR, 'fusion_comparison.csv')
+
+
+def fusion_comparison(results_by_method):
+    """
+    One row per (method, fusion strategy): fits, pooled and per-fold AUC,
+    mean weights, and sensitivity / specificity of the AUC-weighted fusion
+    at each fold's own threshold. ``results_by_method``: name → (fold
+    results, fits).
+    """
+    rows = []
+    for method, (results, fits) in results_by_method.items():
+        y_true = np.concatenate([r['y_test'] for r in results])
+        for name in ('fusion', 'stacking'):
+            fold_aucs = [r['aucs'][name] for r in results]
+            row = {'Method': method, 'Fusion': name, 'Fits': fits,
+                   'AUC': round(safe_auc(y_true, np.concatenate([r['probs'][name] for r in results])), 4),
+                   'AUC_Mean': round(np.mean(fold_aucs), 4), 'AUC_SD': round(np.std(fold_aucs), 4)}
+            row.update({f'W_{mod}': round(np.mean([r['weights'][mod] for r in results]), 3)
+                        for mod in MODALITIES})
+            if name == 'fusion':
+                preds = np.concatenate([r['probs']['fusion'] >= r['threshold'] for r in results])
+                tn, fp, fn, tp = confusion_matrix(y_true, preds, labels=[0, 1]).ravel()
+                row['Sensitivity'] = round(tp / (tp + fn), 4) if (tp + fn) else 0.0
+                row['Specificity'] = round(tn / (tn + fp), 4) if (tn + fp) else 0.0
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def repeat_metrics(fold_results):
+    """
+    Pooled out-of-fold metrics of each modality and the fusion, one row per
+    repeat (fold_results in global fold order, N_OUTER_SPLITS per repeat).
+    Thresholded metrics use each repeat's Youden's J threshold.
+    """
+    rows = []
+    for r in range(len(fold_results) // N_OUTER_SPLITS):
+        results = fold_results[r * N_OUTER_SPLITS:(r + 1) * N_OUTER_SPLITS]
+        y_true = np.concatenate([res['y_test'] for res in results])
+        for name in ('text', 'audio', 'visual', 'fusion'):
+            probs = np.concatenate([res['probs'][name] for res in results])
+            preds = (probs >= find_optimal_threshold(y_true, probs)).astype(int)
+            tn, fp, fn, tp = confusion_matrix(y_true, preds, labels=[0, 1]).ravel()
+            rows.append({'Repeat': r, 'Model': name.title(), 'AUC': roc_auc_score(y_true, probs),
+                         'AP': average_precision_score(y_true, probs),
+                         'Balanced_Accuracy': balanced_accuracy_score(y_true, preds),
+                         'Sensitivity': tp / (tp + fn) if (tp + fn) else 0.0,
+                         'Specificity': tn / (tn + fp) if (tn + fp) else 0.0})
+    return pd.DataFrame(rows)
+
+
+def search_pipeline(modality, n_features, fold, n_positive):
+    """Pipeline for one search fold; the MI seed depends only on the fold."""
+    return build_modality_pipeline(modality, n_features, min(3, n_positive - 1),
+                                   RANDOM_STATE + fold)
+
+
+def run_search(X_by_modality, y, jobs=1, cache=None):
+    """Successive-halving search per modality; writes results/search_*."""
+    best, traces, budgets = {}, [], {}
+    for mod in MODALITIES:
+        build = partial(search_pipeline, mod, X_by_modality[mod].shape[1])
+        best[mod], trace, budgets[mod] = successive_halving(
+            build, X_by_modality[mod], y, jobs=jobs, cache=cache, label=mod)
+        traces.append(trace)
+    return write_search_results(best, traces, budgets)
+
+
+def training_run_key(X_by_modality, y, text_cols, audio_cols, visual_cols, fusion='inner',
+                     params=None):
+    """
+    Checkpoint key: the data, column names, CV layout, every pipeline's
+    parameters and the fusion mode (oof and compare fold checkpoints also
+    hold the stacker outputs).
+    """
+    params = params or {}
+    pipelines = {mod: build_modality_pipeline(mod, X_by_modality[mod].shape[1], 3,
+                                              params=params.get(mod)).get_params()
+                 for mod in MODALITIES}
+    return run_key(X_by_modality, y, [text_cols, audio_cols, visual_cols], pipelines,
+                   RANDOM_STATE, N_OUTER_SPLITS, N_INNER_SPLITS, CHECKPOINT_PIPELINES,
+                   fusion)
+
+
+def dump_slowest_step(X_by_modality, y, tasks, records, params=None):
+    """
+    Re-run the first task of the slowest step's modality with that
+    (estimator, method) under cProfile; returns the .pstats path.
+    """
+    modality, estimator, method = slowest_step(records)
+    task = next(t for t in tasks if t.modality == modality)
+    profiler = run_cv_task(X_by_modality[modality], y, task, profile=True,
+                           pstats_target=(estimator, method),
+                           params=(params or {}).get(modality)).profile
+    path = os.path.join(RESULTS_DIR, f'training_profile_{modality}_{estimator}_{method}.pstats')
+    return profiler.dump_stats(path)
+
+
+# ── CASCADE INFERENCE ───────────────────────────────────────────────
+# A soft-voting ensemble's probability is a weighted mean of member
+# probabilities, each bounded in [0, 1]. After evaluating some members the
+# final mean is known to lie in [partial, partial + remaining weight], so
+# once that interval is entirely on one side of the decision threshold the
+# remaining (more expensive) members cannot change the decision. With four
+# equally weighted members and the 0.38 threshold, a positive decision can
+# be reached after two members (both confident) and a negative one only
+# after three (the last member alone moves the mean by up to 0.25); the
+# saving is the one or two costliest members on rows far from the threshold.
+
+DECISION_THRESHOLD = 0.38   # app.py: prediction = prob >= 0.38
+_EXIT_MARGIN = 1e-12        # never exit on a bound that touches the threshold
+
+
+class CascadeVotingPredictor:
+    """
+    Early-exit decisions from a fitted ``build_modality_pipeline`` pipeline.
+
+    Members run in ascending cost (measured by ``fit_order`` or given as
+    ``order``); predict() equals ``pipe.predict_proba(X)[:, 1] >= threshold``
+    row for row. ``stats`` counts the stage (members evaluated) each row
+    was decided at.
+    """
+
+    def __init__(self, pipeline, threshold=DECISION_THRESHOLD, order=None):
+        self.pipeline = pipeline
+        self.threshold = threshold
+        self.voter = pipeline.steps[-1][1]
+        members = [est for _, est in self.voter.estimators if est != 'drop']
+        weights = (np.ones(len(members)) if self.voter.weights is None else
+                   np.array([w for (_, est), w in zip(self.voter.estimators, self.voter.weights)
+                             if est != 'drop'], dtype=float))
+        self.weights = weights / weights.sum()
+        self._vote_weights = None if self.voter.weights is None else weights
+        self.order = list(order) if order is not None else list(range(len(self.weights)))
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = np.zeros(len(self.weights) + 1, dtype=np.int64)
+
+    def _transform(self, X):
+        """Preprocessing steps as at predict time (resamplers are skipped)."""
+        for _, step in self.pipeline.steps[:-1]:
+            if not hasattr(step, 'fit_resample'):
+                X = step.transform(X)
+        return X
+
+    def fit_order(self, X, repeats=20):
+        """Order members by measured single-row predict_proba latency."""
+        Xt = self._transform(X[:1])
+        cost = []
+        for est in self.voter.estimators_:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                est.predict_proba(Xt)
+            cost.append(time.perf_counter() - start)
+        self.order = list(np.argsort(cost, kind='stable'))
+        return self
+
+    def predict(self, X):
+        Xt = self._transform(X)
+        n = Xt.shape[0]
+        probas = np.full((len(self.weights), n), np.nan)
+        decided = np.zeros(n, dtype=bool)
+        decision = np.zeros(n, dtype=int)
+        partial, remaining = np.zeros(n), 1.0
+        for stage, m in enumerate(self.order, start=1):
+            rows = ~decided
+            Xm = Xt[rows] if not rows.all() else Xt
+            probas[m, rows] = self.voter.estimators_[m].predict_proba(Xm)[:, 1]
+            partial[rows] += self.weights[m] * probas[m, rows]
+            remaining -= self.weights[m]
+            if stage == len(self.order):
+                break
+            pos = rows & (partial >= self.threshold + _EXIT_MARGIN)
+            neg = rows & (partial + remaining < self.threshold - _EXIT_MARGIN)
+            decision[pos] = 1
+            decided |= pos | neg
+            self.stats[stage] += np.count_nonzero(pos | neg)
+            if decided.all():
+                return decision
+        # Undecided rows: the full soft vote, averaged as VotingClassifier does
+        rows = ~decided
+        full = np.average(probas[:, rows], axis=0, weights=self._vote_weights)
+        decision[rows] = full >= self.threshold
+        self.stats[len(self.order)] += np.count_nonzero(rows)
+        return decision
+
+
+def cascade_report(pipeline, X, threshold=DECISION_THRESHOLD):
+    """
+    Single-row latency of the full ensemble vs. the cascade over the rows
+    of X (as app.py scores one request at a time), the share of rows
+    decided early, and whether every decision matched.
+    """
+    X = np.asarray(X)
+    cascade = CascadeVotingPredictor(pipeline, threshold).fit_order(X)
+    full_sec = casc_sec = 0.0
+    agree = True
+    for i in range(len(X)):
+        row = X[i:i + 1]
+        start = time.perf_counter()
+        full = pipeline.predict_proba(row)[0, 1] >= threshold
+        full_sec += time.perf_counter() - start
+        start = time.perf_counter()
+        fast = cascade.predict(row)[0]
+        casc_sec += time.perf_counter() - start
+        agree &= bool(full) == bool(fast)
+    n = max(len(X), 1)
+    return {'rows': len(X), 'early_exit': 1 - cascade.stats[-1] / n,
+            'full_ms': 1e3 * full_sec / n, 'cascade_ms': 1e3 * casc_sec / n,
+            'saved': 1 - casc_sec / full_sec if full_sec else 0.0,
+            'agree': agree, 'order': [type(cascade.voter.estimators_[m]).__name__
+                                      for m in cascade.order]}
+
 
 def find_optimal_threshold(y_true, y_probs):
     """Find threshold maximizing Youden's J statistic (Sensitivity + Specificity - 1)."""
-    fpr, tpr, thresholds = roc_curve(y_true, y_probs)
-    j_scores = tpr - fpr
-    best_idx = np.argmax(j_scores)
-    return thresholds[best_idx]
+    return best_threshold(y_true, y_probs, 'youden')[0]
 
-def main():
+def main(jobs=1, use_fit_cache=True, profile=False, profile_dump=False,
+         use_checkpoints=True, restart=False, plots=True, search=False, fusion='inner',
+         repeats=CV_REPEATS, tuned=False):
     logger.info("=" * 60)
     logger.info("  SENTIRA — Final Production Pipeline")
     logger.info("=" * 60)
@@ -185,10 +588,7 @@ def main():
     logger.info(f"Features: Text={len(text_cols)}, Audio={len(audio_cols)}, Visual={len(visual_cols)}")
     
     # ── 2. CROSS-VALIDATION ──────────────────────────────────────────
-    # Use RepeatedStratifiedKFold for stability
-    rskf = RepeatedStratifiedKFold(n_splits=5, n_repeats=3, random_state=RANDOM_STATE)
-    skf = StratifiedKFold(n_splits=5, shuffle=True, random_state=RANDOM_STATE)
-    
+    # Stratified 5-fold, optionally repeated with reshuffled folds for stability
     all_y_true = []
     all_probs_text = []
     all_probs_audio = []
@@ -196,129 +596,111 @@ def main():
     all_probs_fusion = []
     
     fold_aucs = {'text': [], 'audio': [], 'visual': [], 'fusion': []}
-    fusion_weights_log = []
     
-    for fold, (train_idx, test_idx) in enumerate(skf.split(merged, y)):
-        logger.info(f"\n── Fold {fold+1}/5 ────────────────────────────────────")
-        
-        X_train_text = merged.iloc[train_idx][text_cols]
-        X_test_text = merged.iloc[test_idx][text_cols]
-        X_train_audio = merged.iloc[train_idx][audio_cols]
-        X_test_audio = merged.iloc[test_idx][audio_cols]
-        X_train_visual = merged.iloc[train_idx][visual_cols]
-        X_test_visual = merged.iloc[test_idx][visual_cols]
-        y_train, y_test = y[train_idx], y[test_idx]
-        
-        smote_k = min(3, sum(y_train == 1) - 1)
-        
-        # ── TEXT ─────────────────────────────────────────────────────
-        # No PCA — 96 features is manageable and each NLP feature is meaningful
-        text_pipe = ImbPipeline([
-            ('vt', VarianceThreshold()),
-            ('sc', StandardScaler()),
-            ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=smote_k)),
-            ('clf', get_text_ensemble())
-        ])
-        text_pipe.fit(X_train_text, y_train)
-        p_text = text_pipe.predict_proba(X_test_text)[:, 1]
-        
-        # ── AUDIO ────────────────────────────────────────────────────
-        # SelectKBest(50) reduces 1218 → 50 most informative features
-        audio_pipe = ImbPipeline([
-            ('vt', VarianceThreshold()),
-            ('sk', SelectKBest(mutual_info_classif, k=min(50, len(audio_cols)))),
-            ('sc', StandardScaler()),
-            ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=smote_k)),
-            ('clf', get_audio_ensemble())
-        ])
-        audio_pipe.fit(X_train_audio, y_train)
-        p_audio = audio_pipe.predict_proba(X_test_audio)[:, 1]
-        
-        # ── VISUAL ───────────────────────────────────────────────────
-        # PCA(30) reduces correlated AU features to orthogonal components
-        visual_pipe = ImbPipeline([
-            ('vt', VarianceThreshold()),
-            ('pca', PCA(n_components=min(30, len(visual_cols)))),
-            ('sc', StandardScaler()),
-            ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=smote_k)),
-            ('clf', get_visual_ensemble())
-        ])
-        visual_pipe.fit(X_train_visual, y_train)
-        p_visual = visual_pipe.predict_proba(X_test_visual)[:, 1]
-        
-        # ── FUSION (Dynamic AUC-Based Weighting) ─────────────────────
-        # Compute validation AUC for each modality using internal CV on training fold
-        # This gives us data-driven weights instead of arbitrary ones
-        inner_cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=RANDOM_STATE + fold)
-        inner_aucs = {'text': [], 'audio': [], 'visual': []}
-        
-        for i_train, i_val in inner_cv.split(X_train_text, y_train):
-            yt, yv = y_train[i_train], y_train[i_val]
-            sk = min(3, sum(yt == 1) - 1)
-            
-            # Text inner
-            tp = ImbPipeline([('vt', VarianceThreshold()), ('sc', StandardScaler()),
-                              ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=sk)),
-                              ('clf', get_text_ensemble())])
-            tp.fit(X_train_text.values[i_train], yt)
-            try:
-                inner_aucs['text'].append(roc_auc_score(yv, tp.predict_proba(X_train_text.values[i_val])[:, 1]))
-            except:
-                inner_aucs['text'].append(0.5)
-            
-            # Audio inner
-            ap = ImbPipeline([('vt', VarianceThreshold()), ('sk', SelectKBest(mutual_info_classif, k=min(50, len(audio_cols)))),
-                              ('sc', StandardScaler()), ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=sk)),
-                              ('clf', get_audio_ensemble())])
-            ap.fit(X_train_audio.values[i_train], yt)
-            try:
-                inner_aucs['audio'].append(roc_auc_score(yv, ap.predict_proba(X_train_audio.values[i_val])[:, 1]))
-            except:
-                inner_aucs['audio'].append(0.5)
-            
-            # Visual inner
-            vp = ImbPipeline([('vt', VarianceThreshold()), ('pca', PCA(n_components=min(30, len(visual_cols)))),
-                              ('sc', StandardScaler()), ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=sk)),
-                              ('clf', get_visual_ensemble())])
-            vp.fit(X_train_visual.values[i_train], yt)
-            try:
-                inner_aucs['visual'].append(roc_auc_score(yv, vp.predict_proba(X_train_visual.values[i_val])[:, 1]))
-            except:
-                inner_aucs['visual'].append(0.5)
-        
-        # Compute weights from mean inner AUCs (weight = AUC - 0.5, clipped at 0.01)
-        w = {}
-        for mod in ['text', 'audio', 'visual']:
-            mean_auc = np.mean(inner_aucs[mod])
-            w[mod] = max(0.01, mean_auc - 0.5)
-        
-        # Normalize weights
-        total_w = sum(w.values())
-        for mod in w:
-            w[mod] /= total_w
-        
-        logger.info(f"    Dynamic fusion weights: Text={w['text']:.3f}, Audio={w['audio']:.3f}, Visual={w['visual']:.3f}")
-        fusion_weights_log.append(w)
-        
-        p_fusion = w['text'] * p_text + w['audio'] * p_audio + w['visual'] * p_visual
-        
-        # Track per-fold AUCs
-        for name, probs in [('text', p_text), ('audio', p_audio), ('visual', p_visual), ('fusion', p_fusion)]:
-            try:
-                fold_aucs[name].append(roc_auc_score(y_test, probs))
-            except:
-                fold_aucs[name].append(0.5)
-        
-        logger.info(f"    Fold AUCs — Text: {fold_aucs['text'][-1]:.3f}, "
-                    f"Audio: {fold_aucs['audio'][-1]:.3f}, "
-                    f"Visual: {fold_aucs['visual'][-1]:.3f}, "
-                    f"Fusion: {fold_aucs['fusion'][-1]:.3f}")
-        
-        all_y_true.extend(y_test)
-        all_probs_text.extend(p_text)
-        all_probs_audio.extend(p_audio)
-        all_probs_visual.extend(p_visual)
-        all_probs_fusion.extend(p_fusion)
+    # All outer and inner (fold × modality) fits run as independent tasks,
+    # a batch of outer folds at a time so each fold is checkpointed when done
+    outer_splits = outer_cv_splits(y, repeats)
+    X_by_modality = {'text': merged[text_cols].values, 'audio': merged[audio_cols].values,
+                     'visual': merged[visual_cols].values}
+    tasks = expand_cv_tasks(y, outer_splits)
+    if search:
+        # Search mode: pick ensemble hyperparameters, then stop (no training)
+        search_cache = FitCache(FIT_CACHE_DIR, FIT_CACHE_MAX_MB * 2**20) if use_fit_cache else None
+        trace_path, best_path = run_search(X_by_modality, y, jobs, search_cache)
+        logger.info(f"Search trace → {trace_path}, best configurations → {best_path}")
+        logger.warning(f"Train with them via --tuned. {TUNED_WARNING}")
+        return
+    ensemble_params = None
+    if tuned:
+        ensemble_params = load_search_best(SEARCH_BEST_PATH)
+        logger.warning(f"Ensembles use the search result {SEARCH_BEST_PATH}. {TUNED_WARNING}")
+    checkpoint = None
+    if use_checkpoints:
+        checkpoint = RunCheckpoint(CHECKPOINT_DIR,
+                                   training_run_key(X_by_modality, y, text_cols, audio_cols, visual_cols,
+                                                    fusion=fusion, params=ensemble_params),
+                                   meta={'n_samples': len(y)})
+        if restart:
+            checkpoint.clear()
+        logger.info(f"Checkpoints: {checkpoint.directory} "
+                    f"(completed folds: {checkpoint.completed_folds() or 'none'})")
+    if profile and use_fit_cache:
+        logger.info("Profiling: fit cache disabled so every preprocessing step is fitted")
+        use_fit_cache = False
+    fit_cache = FitCache(FIT_CACHE_DIR, FIT_CACHE_MAX_MB * 2**20) if use_fit_cache else None
+    profile_records = [] if profile else None
+    cv_start = time.perf_counter()
+    logger.info(f"Running {len(tasks)} CV pipeline fits ({repeats} × {N_OUTER_SPLITS}-fold) "
+                f"on {jobs} worker(s) (fusion weights: {fusion})...")
+
+    n_folds = len(outer_splits)
+    fold_results, pending = [None] * n_folds, []
+    for fold in range(n_folds):
+        # Profiling measures every fold, so it never resumes from a checkpoint
+        fold_results[fold] = checkpoint.load_fold(fold) if checkpoint and not profile else None
+        if fold_results[fold] is not None:
+            logger.info(f"    Fold {fold+1}/{n_folds}: restored from checkpoint")
+        else:
+            pending.append(fold)
+    for batch in fold_batches(pending, jobs, len(tasks) // n_folds):
+        logger.info(f"\n── Fold {', '.join(str(f + 1) for f in batch)}/{n_folds} "
+                    f"────────────────────────────────────")
+        batch_tasks = [t for t in tasks if t.fold in batch]
+        pipelines = {} if CHECKPOINT_PIPELINES else None
+        task_probs = run_cv_tasks(X_by_modality, y, batch_tasks, jobs, fit_cache,
+                                  profile_records, pipelines, ensemble_params)
+        for fold in batch:
+            test_idx = outer_splits[fold][1]
+            fold_tasks = [t for t in batch_tasks if t.fold == fold]
+            result = fold_outputs(fold, test_idx, y, fold_tasks, task_probs, fusion)
+            if fusion == 'compare':
+                result['oof'] = fold_outputs(fold, test_idx, y, fold_tasks, task_probs, 'oof')
+            if pipelines is not None:
+                result['pipelines'] = {mod: pipelines[(fold, mod)] for mod in MODALITIES}
+            if checkpoint is not None:
+                checkpoint.save_fold(fold, result)
+            fold_results[fold] = result
+
+    cv_seconds = time.perf_counter() - cv_start
+    logger.info(f"CV fits done in {cv_seconds:.1f}s")
+    if fusion == 'compare':
+        comparison = fusion_comparison({'inner': (fold_results, len(tasks)),
+                                        'oof': ([r['oof'] for r in fold_results], len(tasks))})
+        comparison.to_csv(FUSION_COMPARISON_PATH, index=False)
+        logger.info("\nFusion weights, inner CV vs. out-of-fold:\n"
+                    + comparison.to_string(index=False))
+        logger.info(f"Fusion comparison → {FUSION_COMPARISON_PATH}")
+
+    for result in fold_results:
+        w = result['weights']
+        logger.info(f"Fold {result['fold']+1} dynamic fusion weights: Text={w['text']:.3f}, "
+                    f"Audio={w['audio']:.3f}, Visual={w['visual']:.3f}")
+        logger.info(f"    Fold AUCs — Text: {result['aucs']['text']:.3f}, "
+                    f"Audio: {result['aucs']['audio']:.3f}, "
+                    f"Visual: {result['aucs']['visual']:.3f}, "
+                    f"Fusion: {result['aucs']['fusion']:.3f}"
+                    + (f", Stacking: {result['aucs']['stacking']:.3f}"
+                       if 'stacking' in result['aucs'] else ""))
+    if fit_cache is not None:
+        logger.info(f"Preprocessing fit cache: {fit_cache.summary()}")
+    if profile:
+        path = write_profile(profile_records, PROFILE_PATH, jobs=jobs, cv_seconds=cv_seconds)
+        logger.info(f"Training profile ({len(profile_records)} calls) → {path}")
+        if profile_dump:
+            logger.info(f"cProfile of the slowest step → "
+                        f"{dump_slowest_step(X_by_modality, y, tasks, profile_records, ensemble_params)}")
+
+    # Fusion weights average every fold; the pooled summary, threshold and
+    # report use the first repeat (each row predicted exactly once)
+    fusion_weights_log = [result['weights'] for result in fold_results]
+    for result in fold_results[:N_OUTER_SPLITS]:
+        for name in fold_aucs:
+            fold_aucs[name].append(result['aucs'][name])
+        all_y_true.extend(result['y_test'])
+        all_probs_text.extend(result['probs']['text'])
+        all_probs_audio.extend(result['probs']['audio'])
+        all_probs_visual.extend(result['probs']['visual'])
+        all_probs_fusion.extend(result['probs']['fusion'])
 
     # ── 3. PERFORMANCE SUMMARY ───────────────────────────────────────
     all_y_true = np.array(all_y_true)
@@ -372,141 +754,52 @@ def main():
     metrics_df = pd.DataFrame(metrics)
     logger.info("\n" + metrics_df.to_string(index=False))
     metrics_df.to_csv(os.path.join(RESULTS_DIR, 'final_metrics.csv'), index=False)
+
+    if repeats > 1:
+        per_repeat = repeat_metrics(fold_results)
+        per_repeat.to_csv(os.path.join(RESULTS_DIR, 'repeated_cv_metrics.csv'), index=False)
+        repeat_summary = evaluate_repeats(per_repeat, CI_LEVEL)
+        repeat_summary.to_csv(os.path.join(RESULTS_DIR, 'repeated_cv_summary.csv'), index=False)
+        logger.info(f"\nRepeated CV ({repeats} × {N_OUTER_SPLITS}-fold), mean ± SD "
+                    f"[{CI_LEVEL:.0%} percentile interval]:")
+        for _, row in repeat_summary.iterrows():
+            logger.info(f"    {row['Model']:8s}: " + ", ".join(
+                f"{m} {row[f'{m}_mean']:.3f} ± {row[f'{m}_std']:.3f} "
+                f"[{row[f'{m}_lo']:.3f}, {row[f'{m}_hi']:.3f}]" for m in ('AUC', 'AP')))
     
-    # ── 4. VISUALIZATIONS ────────────────────────────────────────────
-    logger.info("\nGenerating visualizations...")
-    
-    plot_curves(all_y_true, [all_probs_text, all_probs_audio, all_probs_visual, all_probs_fusion], 
-                ['Text', 'Audio', 'Visual', 'Fusion'], 'SENTIRA Multimodal', 'roc_curves_final.png')
-    
-    # PR Curves
-    plt.figure(figsize=(10, 8))
-    colors = ['#4F8EF7', '#9B6FFF', '#10B981', '#EF4444']
-    for (name, probs), color in zip([('Text', all_probs_text), ('Audio', all_probs_audio), 
-                                      ('Visual', all_probs_visual), ('Fusion', all_probs_fusion)], colors):
-        precision, recall, _ = precision_recall_curve(all_y_true, probs)
-        plt.plot(recall, precision, label=f'{name} (AP = {average_precision_score(all_y_true, probs):.3f})', 
-                linewidth=2.5, color=color)
-    baseline = sum(all_y_true) / len(all_y_true)
-    plt.axhline(y=baseline, color='gray', linestyle='--', alpha=0.5, label=f'Baseline ({baseline:.2f})')
-    plt.xlabel('Recall', fontsize=13)
-    plt.ylabel('Precision', fontsize=13)
-    plt.title('Precision-Recall Curves — SENTIRA', fontsize=15, fontweight='bold')
-    plt.legend(fontsize=12)
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, 'pr_curves_final.png'), dpi=150)
-    plt.close()
-
-    plot_calibration_curve(all_y_true, all_probs_fusion, 'calibration_curve_fusion.png')
-    plot_probability_distribution(all_y_true, all_probs_fusion, 'fusion_probability_distribution.png')
-    
-    # Confusion Matrix (Fusion, optimal threshold)
+    # ── 4. REPORT ────────────────────────────────────────────────────
+    # OOF predictions are saved for the report stage (src/reporting.py),
+    # which renders the figures in a process pool and skips unchanged ones
     fusion_t = find_optimal_threshold(all_y_true, all_probs_fusion)
-    cm = confusion_matrix(all_y_true, (np.array(all_probs_fusion) >= fusion_t).astype(int))
-    
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
-                xticklabels=['Non-Depressed', 'Depressed'],
-                yticklabels=['Non-Depressed', 'Depressed'],
-                annot_kws={"size": 18}, ax=axes[0])
-    axes[0].set_xlabel('Predicted', fontsize=12)
-    axes[0].set_ylabel('Actual', fontsize=12)
-    axes[0].set_title(f'Confusion Matrix — Raw (t={fusion_t:.2f})', fontsize=14)
-    
-    cm_norm = cm.astype('float') / cm.sum(axis=1)[:, np.newaxis]
-    sns.heatmap(cm_norm, annot=True, fmt='.2f', cmap='Greens',
-                xticklabels=['Non-Depressed', 'Depressed'],
-                yticklabels=['Non-Depressed', 'Depressed'],
-                annot_kws={"size": 18}, ax=axes[1])
-    axes[1].set_xlabel('Predicted', fontsize=12)
-    axes[1].set_ylabel('Actual', fontsize=12)
-    axes[1].set_title('Confusion Matrix — Normalized', fontsize=14)
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, 'confusion_matrix_raw.png'), dpi=150)
-    plt.close()
-    
-    # Also save normalized separately
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(cm_norm, annot=True, fmt='.2f', cmap='Greens',
-                xticklabels=['Non-Depressed', 'Depressed'],
-                yticklabels=['Non-Depressed', 'Depressed'],
-                annot_kws={"size": 18})
-    plt.xlabel('Predicted', fontsize=12)
-    plt.ylabel('Actual', fontsize=12)
-    plt.title('Confusion Matrix — Normalized', fontsize=14)
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, 'confusion_matrix_normalized.png'), dpi=150)
-    plt.close()
-    
-    # Modality Importance
-    plt.figure(figsize=(10, 6))
-    colors_bar = ['#4F8EF7', '#9B6FFF', '#10B981']
-    names_bar = ['Text', 'Audio', 'Visual']
-    aucs_bar = [np.mean(fold_aucs[n.lower()]) for n in names_bar]
-    bars = plt.bar(names_bar, aucs_bar, color=colors_bar, edgecolor='white', linewidth=2, width=0.5)
-    for bar, val, w_val in zip(bars, aucs_bar, [avg_w['text'], avg_w['audio'], avg_w['visual']]):
-        plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.008,
-                f'AUC={val:.3f}\nWeight={w_val:.1%}', ha='center', fontweight='bold', fontsize=11)
-    plt.ylabel('Mean AUC-ROC (5-Fold CV)', fontsize=13)
-    plt.title('Modality Contribution & Fusion Weights', fontsize=15, fontweight='bold')
-    plt.ylim(0.45, 0.85)
-    plt.grid(axis='y', alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, 'modality_weights.png'), dpi=150)
-    plt.close()
-
-    # Accuracy Matrix (Heatmap)
-    df_metrics = metrics_df
-    plt.figure(figsize=(10, 6))
-    sns.heatmap(df_metrics.set_index('Model')[['Accuracy', 'Balanced_Accuracy', 'F1', 'Precision', 'Recall']], 
-                annot=True, cmap='Blues', fmt='.3f', annot_kws={"size": 14})
-    plt.title('Performance Matrix by Modality', fontsize=16, fontweight='bold')
-    plt.ylabel('')
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, 'accuracy_matrix.png'), dpi=150)
-    plt.close()
-
-    # Performance Metrics Bar Chart
-    plt.figure(figsize=(10, 6))
-    df_melted = df_metrics.melt(id_vars='Model', value_vars=['Accuracy', 'F1', 'AUC'], 
-                        var_name='Metric', value_name='Score')
-    sns.barplot(data=df_melted, x='Model', y='Score', hue='Metric', palette='viridis')
-    plt.title('Key Performance Metrics Comparison', fontsize=16, fontweight='bold')
-    plt.ylim(0, 1.0)
-    plt.legend(loc='lower right', fontsize=12)
-    plt.tight_layout()
-    plt.savefig(os.path.join(RESULTS_DIR, 'performance_metrics_barchart.png'), dpi=150)
-    plt.close()
+    save_cv_outputs(RESULTS_DIR, np.concatenate([np.full(len(r['y_test']), r['fold'])
+                                                 for r in fold_results[:N_OUTER_SPLITS]]),
+                    all_y_true, {'Text': all_probs_text, 'Audio': all_probs_audio,
+                                 'Visual': all_probs_visual, 'Fusion': all_probs_fusion},
+                    fold_aucs, avg_w, fusion_t)
+    if plots:
+        logger.info("\nGenerating visualizations...")
+        render_report(RESULTS_DIR)
+    else:
+        logger.info("\nSkipping plots (--no-plots); run `python src/reporting.py` to render them")
 
     # ── 5. SAVE PRODUCTION MODELS ────────────────────────────────────
     logger.info("\nSaving final production models (retrained on full data)...")
     
     full_smote_k = min(3, sum(y == 1) - 1)
     
-    final_text_pipe = ImbPipeline([
-        ('vt', VarianceThreshold()), ('sc', StandardScaler()),
-        ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=full_smote_k)),
-        ('clf', get_text_ensemble())
-    ])
-    final_text_pipe.fit(merged[text_cols], y)
-    joblib.dump(final_text_pipe, os.path.join(MODELS_DIR, 'final_text_model.pkl'))
-    
-    final_audio_pipe = ImbPipeline([
-        ('vt', VarianceThreshold()), ('sk', SelectKBest(mutual_info_classif, k=min(50, len(audio_cols)))),
-        ('sc', StandardScaler()), ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=full_smote_k)),
-        ('clf', get_audio_ensemble())
-    ])
-    final_audio_pipe.fit(merged[audio_cols], y)
-    joblib.dump(final_audio_pipe, os.path.join(MODELS_DIR, 'final_audio_model.pkl'))
-    
-    final_visual_pipe = ImbPipeline([
-        ('vt', VarianceThreshold()), ('pca', PCA(n_components=min(30, len(visual_cols)))),
-        ('sc', StandardScaler()), ('smote', SMOTE(random_state=RANDOM_STATE, k_neighbors=full_smote_k)),
-        ('clf', get_visual_ensemble())
-    ])
-    final_visual_pipe.fit(merged[visual_cols], y)
-    joblib.dump(final_visual_pipe, os.path.join(MODELS_DIR, 'final_visual_model.pkl'))
+    # Each refit is checkpointed, so a crash here resumes with the next modality
+    final_cols = {'text': text_cols, 'audio': audio_cols, 'visual': visual_cols}
+    for mod in MODALITIES:
+        final_pipe = checkpoint.load(f'final_{mod}') if checkpoint else None
+        if final_pipe is not None:
+            logger.info(f"    {mod}: restored from checkpoint")
+        else:
+            final_pipe = build_modality_pipeline(mod, len(final_cols[mod]), full_smote_k,
+                                                 params=(ensemble_params or {}).get(mod))
+            fit_pipeline_cached(final_pipe, merged[final_cols[mod]], y, fit_cache)
+            if checkpoint is not None:
+                checkpoint.save(f'final_{mod}', final_pipe)
+        joblib.dump(final_pipe, os.path.join(MODELS_DIR, f'final_{mod}_model.pkl'))
     
     # Save fusion weights for inference
     joblib.dump(avg_w, os.path.join(MODELS_DIR, 'fusion_weights.pkl'))
@@ -519,13 +812,63 @@ def main():
     print("  [OK] PHQ_Score leakage: DROPPED from audio/visual features.")
     print("  [OK] Data scaling: Fitted strictly on training folds.")
     print("  [OK] Dim. reduction (PCA/SelectKBest): Inside CV folds.")
-    print("  [OK] Cross-validation: Stratified 5-Fold (leakage-free).")
-    print("  [OK] Fusion weights: Learned from inner-CV AUCs (not static).")
+    print(f"  [OK] Cross-validation: Stratified 5-Fold × {repeats} (leakage-free).")
+    if fusion == 'oof':
+        print("  [OK] Fusion weights: From out-of-fold predictions within each training fold.")
+    else:
+        print("  [OK] Fusion weights: Learned from inner-CV AUCs (not static).")
     print("  [OK] Threshold: Optimized via Youden's J statistic.")
     print("  [OK] SMOTE: Applied strictly on training folds only.")
+    if tuned:
+        print("  [WARN] Hyperparameters: Tuned by --search on the same rows this CV evaluates;")
+        print("         the estimates above are optimistic. Evaluate on held-out data.")
     print("=" * 60)
-    print("  SYSTEM STATUS: RELIABLE & CLINICALLY INFORMED")
+    if tuned:
+        print("  SYSTEM STATUS: OPTIMISTIC (tuned on the evaluation rows)")
+    else:
+        print("  SYSTEM STATUS: RELIABLE & CLINICALLY INFORMED")
     print("=" * 60)
 
+    if profile:
+        print("\n" + "=" * 60)
+        print("  TRAINING PROFILE (CV fits, slowest first)")
+        print("=" * 60)
+        print(format_summary(profile_records))
+        print(f"\n  Full per-call records: {PROFILE_PATH}")
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='SENTIRA training + evaluation pipeline')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Worker processes for the CV fits (-1 = all cores)')
+    parser.add_argument('--no-fit-cache', action='store_true',
+                        help=f'Refit preprocessing instead of using {FIT_CACHE_DIR}')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'Record per-estimator time / memory of the CV fits to {PROFILE_PATH}')
+    parser.add_argument('--profile-dump', action='store_true',
+                        help='With --profile: also write a cProfile .pstats of the slowest step')
+    parser.add_argument('--no-checkpoint', action='store_true',
+                        help=f'Do not read or write fold checkpoints in {CHECKPOINT_DIR}')
+    parser.add_argument('--restart', action='store_true',
+                        help='Discard this run\'s checkpoints and recompute every fold')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='Train and save metrics / OOF predictions only; render figures later '
+                             'with src/reporting.py')
+    parser.add_argument('--search', action='store_true',
+                        help='Successive-halving search of the ensemble hyperparameters '
+                             '(writes results/search_*; no training)')
+    parser.add_argument('--tuned', action='store_true',
+                        help=f'Build the ensembles with {SEARCH_BEST_PATH} from --search (tuned '
+                             'on the whole cohort, so CV estimates are optimistic)')
+    parser.add_argument('--fusion', choices=FUSION_MODES, default='inner',
+                        help='Fusion weights from the mean inner-CV fold AUCs (inner), or from '
+                             'the pooled inner out-of-fold predictions, which also fit a '
+                             'stacker and the threshold (oof); compare writes both to '
+                             f'{FUSION_COMPARISON_PATH}')
+    parser.add_argument('--repeats', type=int, default=CV_REPEATS,
+                        help='Repeats of the stratified 5-fold CV, run as one task pool '
+                             '(mean / SD / percentile intervals → results/repeated_cv_*.csv)')
+    args = parser.parse_args()
+    main(jobs=args.jobs, use_fit_cache=not args.no_fit_cache,
+         profile=args.profile or args.profile_dump, profile_dump=args.profile_dump,
+         use_checkpoints=not args.no_checkpoint, restart=args.restart, plots=not args.no_plots,
+         search=args.search, fusion=args.fusion, repeats=args.repeats, tuned=args.tuned)
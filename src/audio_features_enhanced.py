@@ -10,6 +10,9 @@ Architecture:
   Tier 1 — Prosodic biomarkers (F0, jitter, shimmer, HNR, loudness, pauses)
   Tier 2 — Compact MFCC statistics (mean + std + range + skew for 13 coefficients)
   Tier 3 — Compact eGeMAPS statistics (mean + std only, deduplicated)
+  Tier 4 — LLDs recomputed from the raw WAV when every participant has one
+           (src/audio_lld.py, same engine and column names as server-side
+           inference)
 
 Previous version produced 1219 features → AUC 0.5478 (overfitting).
 This version targets ~150-250 features → better generalization.
@@ -23,6 +26,7 @@ from scipy import stats as sp_stats
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from config import DATA_ROOT, FEATURES_DIR
+from src.audio_lld import load_wav, compute_llds, summarize_llds
 
 logger = logging.getLogger(__name__)
 
@@ -320,6 +324,35 @@ def extract_egemaps_compact(pid, data_root):
     return features
 
 
+# ── TIER 4: LLDs from raw WAV (when available) ─────────────────────
+
+WAV_LLD_STATS = ('mean', 'std', 'range', 'median', 'skew', 'iqr')
+
+
+def extract_wav_lld_features(pid, data_root):
+    """
+    Recompute eGeMAPS-style LLDs and MFCCs directly from {pid}_AUDIO.wav.
+    Uses the compact stat set so the tier stays ~200 features. Columns are
+    named exactly as src/audio_lld.build_feature_vector produces them at
+    inference (a subset of its output). Returns {} when the WAV is not part
+    of the local dataset.
+    """
+    path = os.path.join(data_root, f"{pid}_P", f"{pid}_AUDIO.wav")
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        samplerate, audio = load_wav(path, mmap=True)
+        egemaps, mfcc_llds, extras = compute_llds(audio, samplerate)
+    except Exception as e:
+        data_quality_log['load_errors'].append(f"{pid}:wav:{str(e)[:60]}")
+        return {}
+
+    # The raw-WAV pass only adds the base MFCCs; deltas are left to Tier 2
+    mfcc_llds = {'pcm_fftMag_mfcc': mfcc_llds['pcm_fftMag_mfcc']}
+    return summarize_llds(egemaps, mfcc_llds, extras, stats=WAV_LLD_STATS)
+
+
 # ── MAIN BUILDER ──────────────────────────────────────────────────
 
 def build_audio_features_enhanced(participant_ids):
@@ -331,15 +364,19 @@ def build_audio_features_enhanced(participant_ids):
       - Tier 1: Prosodic biomarkers (~30 features)
       - Tier 2: Compact MFCC (~65 features)
       - Tier 3: Compact eGeMAPS (~80-120 features)
+      - Tier 4: Raw-WAV LLDs (only when every participant has a local WAV;
+        a partial tier would leave the other rows zero-filled)
     """
     logger.info("Extracting ENHANCED audio features (v2 — compact)...")
     logger.info("  Tier 1: Prosodic biomarkers (F0, jitter, shimmer, HNR)")
     logger.info("  Tier 2: Compact MFCC statistics (13 coefficients)")
     logger.info("  Tier 3: Compact eGeMAPS statistics (depression-relevant)")
+    logger.info("  Tier 4: Raw-WAV LLDs (when every {pid}_AUDIO.wav is present)")
     logger.info("  BoAW: SKIPPED (too noisy for N=%d)", len(participant_ids))
 
     records = []
     missing = []
+    wav_records = {}
 
     for pid in participant_ids:
         record = {'pid': pid}
@@ -357,7 +394,10 @@ def build_audio_features_enhanced(participant_ids):
         egemaps = extract_egemaps_compact(pid, DATA_ROOT)
         record.update(egemaps)
 
-        if len(record) > 1:  # has features beyond 'pid'
+        # Tier 4: LLDs recomputed from the raw WAV (merged below)
+        wav_records[pid] = extract_wav_lld_features(pid, DATA_ROOT)
+
+        if len(record) > 1 or wav_records[pid]:  # has features beyond 'pid'
             records.append(record)
             data_quality_log['good_participants'] += 1
         else:
@@ -367,6 +407,16 @@ def build_audio_features_enhanced(participant_ids):
     if missing:
         logger.info(f"  Missing audio data: {len(missing)} participants")
 
+    # Tier 4 overrides same-named CSV columns (e.g. mfcc_cv_mean) so the WAV
+    # engine alone defines them, as at inference
+    no_wav = [r['pid'] for r in records if not wav_records[r['pid']]]
+    if not no_wav:
+        for record in records:
+            record.update(wav_records[record['pid']])
+    elif len(no_wav) < len(records):
+        logger.warning(f"  Tier 4 skipped: {len(no_wav)} participants have no "
+                       f"{{pid}}_AUDIO.wav")
+
     df = pd.DataFrame(records).fillna(0)
 
     # ── Post-processing: remove useless features ──
@@ -0,0 +1,542 @@
+# src/audio_lld.py
+"""
+Vectorized eGeMAPS-style low-level descriptor (LLD) engine.
+
+Computes frame-wise acoustic descriptors for a whole signal with batched
+NumPy operations (no per-frame Python loops), then summarises them with
+the same functionals and column names as the E-DAIC OpenSMILE-derived
+training features:
+
+  egemaps_<LLD>_<stat>           e.g. egemaps_F1frequency_sma3nz_p75
+  mfcc_pcm_fftMag_mfcc[i]_<stat> (plus _de[i] / _de_de[i] deltas)
+
+LLDs (10 ms hop, 16 kHz):
+  F0 (semitones from 27.5 Hz), voicing, HNR   — normalised autocorrelation
+  jitter / shimmer                            — adjacent voiced-frame periods
+                                                and peak amplitudes
+  F1–F3 frequency / bandwidth / amplitude     — LPC roots (batched eigvals)
+  H1-H2, H1-A3                                — harmonic magnitudes
+  loudness, alpha ratio, Hammarberg index,
+  spectral slopes 0-500 / 500-1500 Hz, flux   — 512-point magnitude spectra
+  13 MFCCs (+ regression deltas)              — 26-band mel filterbank + DCT
+
+These are approximations of the openSMILE algorithms, designed so that a
+raw WAV processed here lands in the same feature space as the CSVs used
+for training. ``*_sma3`` descriptors are smoothed with a 3-frame moving
+average; ``*_sma3nz`` descriptors are computed over voiced frames only.
+"""
+from functools import lru_cache
+
+import numpy as np
+from scipy.fft import rfft, irfft, dct
+from scipy.io import wavfile
+from scipy.ndimage import uniform_filter1d
+from scipy.signal import firwin, resample_poly
+
+SAMPLE_RATE = 16000
+FRAME_LEN = 400          # 25 ms spectral frames
+HOP = 160                # 10 ms hop
+NFFT = 512
+PITCH_FRAME_LEN = 640    # 40 ms frames for F0 / HNR
+PITCH_NFFT = 1024        # >= PITCH_FRAME_LEN + max lag, so searched lags never wrap
+F0_MIN, F0_MAX = 60.0, 500.0
+VOICING_THRESHOLD = 0.45
+LPC_ORDER = 14
+N_MFCC = 13
+N_MEL = 26
+
+# Functionals computed for every LLD series
+LLD_STATS = ('mean', 'std', 'min', 'max', 'range', 'median', 'p10', 'p25', 'p75',
+             'p90', 'iqr', 'skew', 'kurt', 'delta_mean', 'delta_std',
+             'delta_abs_mean', 'ddelta_mean', 'ddelta_std')
+
+
+# ── DSP plans ─────────────────────────────────────────────────────
+
+class DSPPlan:
+    """
+    Precomputed, read-only DSP constants for one (input rate, target rate,
+    frame length, nfft) combination: polyphase resampling filter, analysis
+    windows, frequency masks, mel/DCT matrices and slope projections.
+    Obtain through get_dsp_plan() so each combination is built once per
+    process and shared by every request.
+    """
+
+    def __init__(self, in_rate, target_rate, frame_len, nfft):
+        self.in_rate, self.target_rate = int(in_rate), int(target_rate)
+        self.frame_len, self.nfft = int(frame_len), int(nfft)
+
+        # Polyphase resampling (same filter resample_poly designs by default)
+        g = np.gcd(self.in_rate, self.target_rate)
+        self.up, self.down = self.target_rate // g, self.in_rate // g
+        if self.up == self.down:
+            self.resample_taps = None
+        else:
+            max_rate = max(self.up, self.down)
+            self.resample_taps = firwin(20 * max_rate + 1, 1.0 / max_rate,
+                                        window=('kaiser', 5.0))
+
+        sr, n_bins = self.target_rate, self.nfft // 2 + 1
+        self.window = np.hamming(self.frame_len)
+        self.freqs = np.fft.rfftfreq(self.nfft, d=1.0 / sr)
+        f = self.freqs
+        self.alpha_low = (f >= 50) & (f < 1000)
+        self.alpha_high = (f >= 1000) & (f <= 5000)
+        self.hammarberg_low = f < 2000
+        self.hammarberg_high = (f >= 2000) & (f <= 5000)
+        self.slope_0_500 = _slope_projection(f, 0, 500)
+        self.slope_500_1500 = _slope_projection(f, 500, 1500)
+
+        self.mel_fb_t = np.ascontiguousarray(mel_filterbank(N_MEL, self.nfft, sr).T)
+        # Truncated orthonormal DCT-II as a matrix, liftering folded in
+        lifter = 1.0 + 11.0 * np.sin(np.pi * np.arange(N_MFCC) / 22.0)
+        self.dct_lifter = dct(np.eye(N_MEL), type=2, axis=1, norm='ortho')[:, :N_MFCC] * lifter
+        self.emphasis = 1.0 - 0.97 * np.exp(-2j * np.pi * np.arange(n_bins) / self.nfft)
+
+        # Pitch / HNR
+        self.pitch_window = np.hanning(PITCH_FRAME_LEN)
+        win_acf = irfft(np.abs(rfft(self.pitch_window, PITCH_NFFT)) ** 2,
+                        PITCH_NFFT)[:PITCH_FRAME_LEN]
+        self.pitch_window_acf = win_acf / win_acf[0]
+        self.lag_min = int(sr / F0_MAX)
+        self.lag_max = min(int(sr / F0_MIN), PITCH_FRAME_LEN - 2)
+
+        for value in vars(self).values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+
+    def resample(self, audio):
+        """Polyphase resample from in_rate to target_rate (float32)."""
+        if self.resample_taps is None or len(audio) == 0:
+            return audio
+        return resample_poly(audio, self.up, self.down,
+                             window=self.resample_taps).astype(np.float32)
+
+
+@lru_cache(maxsize=32)
+def get_dsp_plan(in_rate, target_rate=SAMPLE_RATE, frame_len=FRAME_LEN, nfft=NFFT):
+    """Process-wide cached DSPPlan for the given rates and frame geometry."""
+    return DSPPlan(in_rate, target_rate, frame_len, nfft)
+
+
+# ── WAV input ─────────────────────────────────────────────────────
+
+def to_mono_float(audio):
+    """int PCM / float samples, mono or (n, channels) -> float32 mono."""
+    audio = np.asarray(audio)
+    if audio.dtype.kind in ('i', 'u'):
+        audio = audio.astype(np.float32) / np.iinfo(audio.dtype).max
+    elif audio.dtype.kind == 'f':
+        audio = audio.astype(np.float32)
+    if audio.ndim > 1:
+        audio = np.mean(audio, axis=1, dtype=np.float32)
+    return audio
+
+
+def load_wav(path, target_rate=SAMPLE_RATE, mmap=False):
+    """
+    Read a WAV as float32 mono at ``target_rate``. With ``mmap=True`` the
+    PCM data is memory-mapped, so only the float copy is materialised;
+    formats that cannot be mapped fall back to a regular read.
+    """
+    try:
+        samplerate, audio = wavfile.read(path, mmap=mmap)
+    except ValueError:
+        samplerate, audio = wavfile.read(path)
+    audio = get_dsp_plan(int(samplerate), int(target_rate)).resample(to_mono_float(audio))
+    return int(target_rate), audio
+
+
+# ── Framing & spectra ─────────────────────────────────────────────
+
+def frame_signal(signal, frame_len, hop):
+    """Strided (n_frames, frame_len) view; short signals are zero-padded."""
+    signal = np.asarray(signal, dtype=np.float64)
+    if len(signal) < frame_len:
+        signal = np.pad(signal, (0, frame_len - len(signal)))
+    n_frames = 1 + (len(signal) - frame_len) // hop
+    view = np.lib.stride_tricks.sliding_window_view(signal, frame_len)
+    return view[:n_frames * hop:hop]
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+
+def mel_filterbank(n_filters=N_MEL, nfft=NFFT, samplerate=SAMPLE_RATE):
+    """Triangular mel filterbank (n_filters, nfft//2 + 1), HTK spacing."""
+    mel_points = np.linspace(0.0, _hz_to_mel(samplerate / 2.0), n_filters + 2)
+    bins = np.floor((nfft + 1) * _mel_to_hz(mel_points) / samplerate)
+    k = np.arange(nfft // 2 + 1)[None, :]
+    left, center, right = bins[:-2, None], bins[1:-1, None], bins[2:, None]
+    rising = (k - left) / np.maximum(center - left, 1)
+    falling = (right - k) / np.maximum(right - center, 1)
+    fb = np.where((k >= left) & (k < center), rising, 0.0)
+    fb = np.where((k >= center) & (k < right), falling, fb)
+    return fb
+
+
+def _slope_projection(freqs, lo, hi):
+    """
+    Vector p such that log_spec @ p is the least-squares slope of log_spec
+    vs frequency inside [lo, hi] Hz.
+    """
+    mask = (freqs >= lo) & (freqs <= hi)
+    proj = np.zeros(len(freqs))
+    if mask.sum() >= 2:
+        fc = freqs[mask] - freqs[mask].mean()
+        proj[mask] = fc / np.sum(fc * fc)
+    return proj
+
+
+def regression_delta(feat, width=2):
+    """HTK/openSMILE regression delta over time (axis 0), edge-padded."""
+    if len(feat) == 0:
+        return feat
+    padded = np.pad(feat, ((width, width),) + ((0, 0),) * (feat.ndim - 1), mode='edge')
+    n = len(feat)
+    num = sum(w * (padded[width + w:width + w + n] - padded[width - w:width - w + n])
+              for w in range(1, width + 1))
+    return num / (2.0 * sum(w * w for w in range(1, width + 1)))
+
+
+def _sma3(x):
+    return uniform_filter1d(x, size=3, mode='nearest') if len(x) else x
+
+
+# ── Pitch / voice quality ─────────────────────────────────────────
+
+def _pitch_track(signal, samplerate, plan):
+    """F0 (Hz, 0 = unvoiced), ACF peak strength and peak amplitude per 10 ms frame."""
+    frames = frame_signal(signal, PITCH_FRAME_LEN, HOP)
+    windowed = (frames - frames.mean(axis=1, keepdims=True)) * plan.pitch_window
+
+    acf = irfft(np.abs(rfft(windowed, PITCH_NFFT, axis=1)) ** 2, PITCH_NFFT, axis=1)
+    acf = acf[:, :PITCH_FRAME_LEN]
+    energy = acf[:, :1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        norm = np.where(energy > 0, acf / energy, 0.0) / plan.pitch_window_acf
+
+    lag_min, lag_max = plan.lag_min, plan.lag_max
+    search = norm[:, lag_min:lag_max + 1]
+    rows = np.arange(len(norm))
+    best = search.max(axis=1)
+    # First local maximum within 10% of the global one avoids octave drops
+    is_peak = np.zeros_like(search, dtype=bool)
+    is_peak[:, 1:-1] = (search[:, 1:-1] >= search[:, :-2]) & (search[:, 1:-1] >= search[:, 2:])
+    candidate = is_peak & (search >= 0.9 * best[:, None])
+    peak = np.where(candidate.any(axis=1), np.argmax(candidate, axis=1), np.argmax(search, axis=1))
+    lag = peak + lag_min
+    r = search[rows, peak]
+
+    # Parabolic interpolation around the peak for sub-sample lag
+    y0, y1, y2 = norm[rows, lag - 1], norm[rows, lag], norm[rows, lag + 1]
+    denom = y0 - 2.0 * y1 + y2
+    shift = np.where(np.abs(denom) > 1e-12, 0.5 * (y0 - y2) / denom, 0.0)
+    true_lag = lag + np.clip(shift, -0.5, 0.5)
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    loud_enough = rms > max(1e-4, 0.03 * (rms.max() if len(rms) else 0.0))
+    voiced = (r >= VOICING_THRESHOLD) & loud_enough
+    f0 = np.where(voiced, samplerate / true_lag, 0.0)
+    amp = np.max(np.abs(frames), axis=1)
+    return f0, np.clip(r, 1e-6, 1 - 1e-6), amp, voiced
+
+
+# ── Formants (batched LPC) ────────────────────────────────────────
+
+def _lpc(frames, order):
+    """Levinson–Durbin over all frames at once; returns (n, order+1) coefficients."""
+    n = len(frames)
+    nfft = 1 << int(np.ceil(np.log2(2 * frames.shape[1])))
+    r = irfft(np.abs(rfft(frames, nfft, axis=1)) ** 2, nfft, axis=1)[:, :order + 1]
+    r[:, 0] *= 1.0 + 1e-9  # white-noise correction keeps the recursion stable
+    a = np.zeros((n, order + 1))
+    a[:, 0] = 1.0
+    err = r[:, 0].copy()
+    for i in range(1, order + 1):
+        acc = r[:, i] + np.einsum('nj,nj->n', a[:, 1:i], r[:, i - 1:0:-1])
+        k = -acc / np.where(err > 0, err, 1.0)
+        a_prev = a[:, 1:i].copy()
+        a[:, 1:i] = a_prev + k[:, None] * a_prev[:, ::-1]
+        a[:, i] = k
+        err = err * (1.0 - k * k)
+    return a
+
+
+def _formants(frames, samplerate, window, n_formants=3):
+    """Frequencies and bandwidths (n, n_formants) from LPC roots; NaN if missing."""
+    n = len(frames)
+    freqs = np.full((n, n_formants), np.nan)
+    bws = np.full((n, n_formants), np.nan)
+    if n == 0:
+        return freqs, bws
+    emph = np.concatenate([frames[:, :1], frames[:, 1:] - 0.97 * frames[:, :-1]], axis=1)
+    a = _lpc(emph * window, LPC_ORDER)
+
+    # Roots of each LPC polynomial = eigenvalues of its companion matrix
+    comp = np.zeros((n, LPC_ORDER, LPC_ORDER))
+    comp[:, 0, :] = -a[:, 1:]
+    comp[:, np.arange(1, LPC_ORDER), np.arange(LPC_ORDER - 1)] = 1.0
+    roots = np.linalg.eigvals(comp)
+
+    ang = np.angle(roots)
+    f = ang * samplerate / (2.0 * np.pi)
+    bw = -np.log(np.maximum(np.abs(roots), 1e-12)) * samplerate / np.pi
+    valid = (roots.imag > 0) & (f > 90.0) & (f < samplerate / 2.0 - 50.0) & (bw < 400.0)
+    f = np.where(valid, f, np.inf)
+    order = np.argsort(f, axis=1)[:, :n_formants]
+    f_sorted = np.take_along_axis(f, order, axis=1)
+    bw_sorted = np.take_along_axis(bw, order, axis=1)
+    found = np.isfinite(f_sorted)
+    freqs[:, :order.shape[1]] = np.where(found, f_sorted, np.nan)
+    bws[:, :order.shape[1]] = np.where(found, bw_sorted, np.nan)
+    return freqs, bws
+
+
+# ── Main engine ───────────────────────────────────────────────────
+
+def compute_llds(signal, samplerate=SAMPLE_RATE):
+    """
+    Frame-wise LLDs for a mono signal (resample to 16 kHz beforehand).
+
+    Returns (egemaps, mfcc_llds, extras): ``egemaps`` maps eGeMAPS LLD names
+    to 1-D arrays (voiced frames only for *_sma3nz), ``mfcc_llds`` maps
+    pcm_fftMag_mfcc / _de / _de_de to (n_frames, 13) matrices and ``extras``
+    holds the voiced F0 track, voiced ratio and raw loudness.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    frames = frame_signal(signal, FRAME_LEN, HOP)
+    plan = get_dsp_plan(samplerate, samplerate)
+
+    # ── Spectral LLDs ──
+    spec = rfft(frames * plan.window, NFFT, axis=1)
+    mag = np.abs(spec)
+    power = mag ** 2 / NFFT
+    log_power = 10.0 * np.log10(power + 1e-12)
+
+    mel_power = np.maximum(power @ plan.mel_fb_t, np.finfo(float).eps)
+    loudness = np.sum(mel_power ** 0.3, axis=1)
+
+    low = power[:, plan.alpha_low].sum(axis=1)
+    high = power[:, plan.alpha_high].sum(axis=1)
+    alpha_ratio = 10.0 * np.log10((low + 1e-12) / (high + 1e-12))
+    peak_lo = power[:, plan.hammarberg_low].max(axis=1)
+    peak_hi = power[:, plan.hammarberg_high].max(axis=1)
+    hammarberg = 10.0 * np.log10((peak_lo + 1e-12) / (peak_hi + 1e-12))
+    slope_0_500 = log_power @ plan.slope_0_500
+    slope_500_1500 = log_power @ plan.slope_500_1500
+
+    norm_mag = mag / np.maximum(mag.sum(axis=1, keepdims=True), 1e-12)
+    flux = np.zeros(len(mag))
+    flux[1:] = np.sum(np.diff(norm_mag, axis=0) ** 2, axis=1)
+
+    # ── MFCCs (pre-emphasised, log mel, DCT-II, liftered) ──
+    # Pre-emphasis y[n] = x[n] - 0.97 x[n-1] applied as its frequency response
+    emph_power = np.abs(spec * plan.emphasis) ** 2 / NFFT
+    log_mel = np.log(np.maximum(emph_power @ plan.mel_fb_t, np.finfo(float).eps))
+    mfcc = log_mel @ plan.dct_lifter
+    mfcc[:, 0] = np.log(np.maximum(emph_power.sum(axis=1), np.finfo(float).eps))
+    mfcc_de = regression_delta(mfcc)
+    mfcc_de_de = regression_delta(mfcc_de)
+
+    # ── Voicing, F0, HNR, jitter, shimmer ──
+    f0, r, amp, voiced = _pitch_track(signal, samplerate, plan)
+    n = min(len(f0), len(frames))
+    f0, r, amp, voiced = f0[:n], r[:n], amp[:n], voiced[:n]
+
+    v_idx = np.flatnonzero(voiced)
+    f0_v = f0[v_idx]
+    semitone = 12.0 * np.log2(f0_v / 27.5) if len(f0_v) else f0_v
+    hnr = 10.0 * np.log10(r[v_idx] / (1.0 - r[v_idx]))
+
+    consecutive = np.diff(v_idx) == 1
+    periods = 1.0 / f0_v if len(f0_v) else f0_v
+    jitter = (np.abs(np.diff(periods)) / (0.5 * (periods[1:] + periods[:-1])))[consecutive] \
+        if len(periods) > 1 else np.array([])
+    amp_v = np.maximum(amp[v_idx], 1e-10)
+    shimmer = np.abs(20.0 * np.log10(amp_v[1:] / amp_v[:-1]))[consecutive] \
+        if len(amp_v) > 1 else np.array([])
+
+    # ── Harmonics and formants (voiced frames) ──
+    log_mag = 20.0 * np.log10(mag[v_idx] + 1e-12)
+    bin_hz = samplerate / NFFT
+    max_bin = mag.shape[1] - 1
+    rows = np.arange(len(v_idx))
+
+    def _amp_at(hz):
+        bins = np.clip(np.round(hz / bin_hz).astype(int), 0, max_bin)
+        return log_mag[rows, bins]
+
+    h1 = _amp_at(f0_v) if len(v_idx) else np.array([])
+    h2 = _amp_at(2.0 * f0_v) if len(v_idx) else np.array([])
+    form_f, form_bw = _formants(frames[v_idx], samplerate, plan.window)
+
+    egemaps = {
+        'Loudness_sma3': _sma3(loudness),
+        'alphaRatio_sma3': _sma3(alpha_ratio),
+        'hammarbergIndex_sma3': _sma3(hammarberg),
+        'slope0-500_sma3': _sma3(slope_0_500),
+        'slope500-1500_sma3': _sma3(slope_500_1500),
+        'spectralFlux_sma3': _sma3(flux),
+        'F0semitoneFrom27.5Hz_sma3nz': _sma3(semitone),
+        'jitterLocal_sma3nz': _sma3(jitter),
+        'shimmerLocaldB_sma3nz': _sma3(shimmer),
+        'HNRdBACF_sma3nz': _sma3(hnr),
+        'logRelF0-H1-H2_sma3nz': _sma3(h1 - h2),
+    }
+    for i in range(4):
+        egemaps[f'mfcc{i + 1}_sma3'] = _sma3(mfcc[:, i + 1])
+
+    for j in range(3):
+        name = f'F{j + 1}'
+        ok = ~np.isnan(form_f[:, j])
+        egemaps[f'{name}frequency_sma3nz'] = _sma3(form_f[ok, j])
+        egemaps[f'{name}bandwidth_sma3nz'] = _sma3(form_bw[ok, j])
+        a_formant = _amp_at(np.where(ok, form_f[:, j], 0.0))[ok] if len(v_idx) else np.array([])
+        egemaps[f'{name}amplitudeLogRelF0_sma3nz'] = _sma3(a_formant - h1[ok])
+        if j == 2:
+            egemaps['logRelF0-H1-A3_sma3nz'] = _sma3(h1[ok] - a_formant)
+
+    mfcc_llds = {
+        'pcm_fftMag_mfcc': mfcc,
+        'pcm_fftMag_mfcc_de': mfcc_de,
+        'pcm_fftMag_mfcc_de_de': mfcc_de_de,
+    }
+    extras = {
+        'voiced_f0_hz': f0_v,
+        'voiced_ratio': float(len(v_idx)) / max(n, 1),
+        'loudness': loudness,
+    }
+    return egemaps, mfcc_llds, extras
+
+
+# ── Functionals ───────────────────────────────────────────────────
+
+def summarize_matrix(X, stats=LLD_STATS):
+    """
+    Functionals over time (axis 0) for every column of ``X`` at once.
+    Returns {stat: (n_columns,) array}; empty input gives zeros.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    n_cols = X.shape[1]
+    if len(X) == 0:
+        return {s: np.zeros(n_cols) for s in stats}
+
+    out = {}
+    mean = X.mean(axis=0)
+    centered = X - mean
+    m2 = np.mean(centered ** 2, axis=0)
+    q = np.percentile(X, [10, 25, 50, 75, 90], axis=0)
+    d = np.diff(X, axis=0)
+    dd = np.diff(d, axis=0)
+    safe_m2 = np.where(m2 > 0, m2, 1.0)
+
+    table = {
+        'mean': lambda: mean,
+        'std': lambda: np.sqrt(m2),
+        'min': lambda: X.min(axis=0),
+        'max': lambda: X.max(axis=0),
+        'range': lambda: X.max(axis=0) - X.min(axis=0),
+        'median': lambda: q[2],
+        'p10': lambda: q[0],
+        'p25': lambda: q[1],
+        'p75': lambda: q[3],
+        'p90': lambda: q[4],
+        'iqr': lambda: q[3] - q[1],
+        'skew': lambda: np.where(m2 > 0, np.mean(centered ** 3, axis=0) / safe_m2 ** 1.5, 0.0),
+        'kurt': lambda: np.where(m2 > 0, np.mean(centered ** 4, axis=0) / safe_m2 ** 2, 3.0),
+        'delta_mean': lambda: d.mean(axis=0) if len(d) else np.zeros(n_cols),
+        'delta_std': lambda: d.std(axis=0) if len(d) else np.zeros(n_cols),
+        'delta_abs_mean': lambda: np.abs(d).mean(axis=0) if len(d) else np.zeros(n_cols),
+        'ddelta_mean': lambda: dd.mean(axis=0) if len(dd) else np.zeros(n_cols),
+        'ddelta_std': lambda: dd.std(axis=0) if len(dd) else np.zeros(n_cols),
+    }
+    for s in stats:
+        out[s] = table[s]()
+    return out
+
+
+def summarize_llds(egemaps, mfcc_llds, extras=None, stats=LLD_STATS):
+    """Named functionals in the training-CSV naming scheme."""
+    features = {}
+    for lld, series in egemaps.items():
+        for stat, val in summarize_matrix(series, stats).items():
+            features[f'egemaps_{lld}_{stat}'] = float(val[0])
+    for lld, mat in mfcc_llds.items():
+        summary = summarize_matrix(mat, stats)
+        for i in range(mat.shape[1]):
+            for stat, val in summary.items():
+                features[f'mfcc_{lld}[{i}]_{stat}'] = float(val[i])
+
+    if extras is not None:
+        mfcc = mfcc_llds['pcm_fftMag_mfcc']
+        means = np.abs(mfcc.mean(axis=0)) if len(mfcc) else np.zeros(N_MFCC)
+        stds = mfcc.std(axis=0) if len(mfcc) else np.zeros(N_MFCC)
+        ok = means > 1e-10
+        features['mfcc_cv_mean'] = float(np.mean(stds[ok] / means[ok])) if ok.any() else 0.0
+        eg_cv = []
+        for series in egemaps.values():
+            if len(series) > 1 and abs(np.mean(series)) > 1e-10:
+                eg_cv.append(np.std(series) / abs(np.mean(series)))
+        features['egemaps_cv_mean'] = float(np.mean(eg_cv)) if eg_cv else 0.0
+        features['mfcc_speech_ratio'] = extras['voiced_ratio']
+        f0_v = extras['voiced_f0_hz']
+        features['prosody_voiced_pitch_mean'] = float(np.mean(f0_v)) if len(f0_v) else 0.0
+        features['prosody_voiced_pitch_std'] = float(np.std(f0_v)) if len(f0_v) > 1 else 0.0
+        loud = extras['loudness']
+        features['prosody_energy_dynamics'] = float(np.std(np.diff(loud))) if len(loud) > 1 else 0.0
+    return features
+
+
+def _approx_boaw(features, egemaps, mfcc_llds, columns):
+    """
+    Bag-of-audio-words columns need the openXBOW codebook, which is not
+    shipped; approximate each bin from the LLD of the same index.
+    """
+    mfcc = mfcc_llds['pcm_fftMag_mfcc']
+    eg_names = list(egemaps)
+    for col in columns:
+        if not col.startswith('boaw_') or col in features:
+            continue
+        parts = col.split('_')
+        if len(parts) != 4 or not parts[2].startswith('bin'):
+            continue
+        try:
+            idx = int(parts[2][3:])
+        except ValueError:
+            continue
+        stat = parts[3]
+        if parts[1] == 'mfcc':
+            values = mfcc[:, idx % mfcc.shape[1]] if len(mfcc) else np.zeros(1)
+        else:
+            values = egemaps[eg_names[idx % len(eg_names)]]
+            values = values if len(values) else np.zeros(1)
+        if stat == 'mean':
+            features[col] = float(np.mean(values))
+        elif stat == 'std':
+            features[col] = float(np.std(values))
+        elif stat == 'max':
+            features[col] = float(np.max(values))
+
+
+def build_feature_vector(samplerate, signal, columns):
+    """
+    Feature vector aligned to ``columns`` (the audio model's training
+    columns). Columns the engine cannot produce are left at 0.0.
+    """
+    egemaps, mfcc_llds, extras = compute_llds(signal, samplerate)
+    features = summarize_llds(egemaps, mfcc_llds, extras)
+    _approx_boaw(features, egemaps, mfcc_llds, columns)
+
+    vector = np.zeros(len(columns), dtype=np.float64)
+    for idx, col in enumerate(columns):
+        val = features.get(col, 0.0)
+        vector[idx] = val if np.isfinite(val) else 0.0
+    return vector
@@ -0,0 +1,170 @@
+# src/batch_audio_scoring.py
+"""
+Offline batch scoring of archived WAV recordings with the server audio model.
+
+Scans a directory for *.wav files, extracts the same feature vector as
+/api/upload-audio (src/audio_lld.py) in a process pool, and scores each
+chunk with a single batched predict_proba call. Rows are appended to the
+output CSV as chunks finish, so an interrupted run can be resumed: files
+already present in the output are skipped. Files that fail to decode get a
+row with an empty audio_prob and the reason in ``error``, so they are not
+retried on every resume.
+
+Usage:
+  python src/batch_audio_scoring.py <wav_dir> [--output results/audio_scores.csv]
+                                    [--workers N] [--chunk-size 32] [--recursive]
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import joblib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import MODELS_DIR, RESULTS_DIR
+from src.audio_lld import load_wav, build_feature_vector
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_COLUMNS = ['file', 'duration_sec', 'audio_prob', 'error']
+
+# Set once per worker process by _init_worker
+_WORKER_COLUMNS = None
+
+
+def find_wavs(wav_dir, recursive=False):
+    """Sorted list of *.wav paths (relative to ``wav_dir``)."""
+    found = []
+    if recursive:
+        for root, _, files in os.walk(wav_dir):
+            found.extend(os.path.relpath(os.path.join(root, f), wav_dir)
+                         for f in files if f.lower().endswith('.wav'))
+    else:
+        found = [f for f in os.listdir(wav_dir)
+                 if f.lower().endswith('.wav') and os.path.isfile(os.path.join(wav_dir, f))]
+    return sorted(found)
+
+
+def load_done(output_path):
+    """Files already in an existing output CSV, scored or failed."""
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return set()
+    try:
+        return set(pd.read_csv(output_path, usecols=['file'])['file'].astype(str))
+    except (ValueError, pd.errors.EmptyDataError):
+        return set()
+
+
+def _init_worker(columns):
+    global _WORKER_COLUMNS
+    _WORKER_COLUMNS = columns
+
+
+def _extract(path):
+    """Worker: (vector, duration) for one WAV, or (None, error message)."""
+    try:
+        samplerate, signal = load_wav(path, mmap=True)
+        return build_feature_vector(samplerate, signal, _WORKER_COLUMNS), len(signal) / samplerate
+    except Exception as e:
+        return None, str(e)[:120]
+
+
+def load_audio_model(models_dir=MODELS_DIR):
+    """Audio model and its training column order."""
+    model = joblib.load(os.path.join(models_dir, 'final_audio_model.pkl'))
+    if not hasattr(model, 'feature_names_in_'):
+        raise RuntimeError('final_audio_model.pkl has no feature_names_in_; '
+                           'cannot align batch feature vectors')
+    return model, list(model.feature_names_in_)
+
+
+def score_directory(wav_dir, output_path, workers=None, chunk_size=32, recursive=False,
+                    model=None, columns=None):
+    """
+    Score every WAV under ``wav_dir`` not yet in ``output_path``.
+    Returns a dict with counts and throughput.
+    """
+    if model is None:
+        model, columns = load_audio_model()
+
+    files = find_wavs(wav_dir, recursive)
+    done = load_done(output_path)
+    todo = [f for f in files if f not in done]
+    logger.info(f"Found {len(files)} WAVs, {len(done)} already done, {len(todo)} to do")
+
+    stats = {'scored': 0, 'failed': 0, 'skipped': len(files) - len(todo),
+             'audio_sec': 0.0, 'elapsed_sec': 0.0}
+    if not todo:
+        return stats
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    write_header = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    with open(output_path, 'a', newline='') as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(columns,)) as pool:
+        writer = csv.writer(out)
+        if write_header:
+            writer.writerow(OUTPUT_COLUMNS)
+
+        for c0 in range(0, len(todo), chunk_size):
+            chunk = todo[c0:c0 + chunk_size]
+            paths = [os.path.join(wav_dir, f) for f in chunk]
+            results = list(pool.map(_extract, paths))
+
+            ok = [(f, vec, dur) for f, (vec, dur) in zip(chunk, results) if vec is not None]
+            failed = [(f, err) for f, (vec, err) in zip(chunk, results) if vec is None]
+            for f, err in failed:
+                logger.warning(f"  {f}: {err}")
+            writer.writerows([f, '', '', err] for f, err in failed)
+            stats['failed'] += len(failed)
+            if ok:
+                X = pd.DataFrame(np.vstack([vec for _, vec, _ in ok]), columns=columns)
+                probs = model.predict_proba(X)[:, 1]
+                writer.writerows([f, round(dur, 2), round(float(p), 4), '']
+                                 for (f, _, dur), p in zip(ok, probs))
+                stats['scored'] += len(ok)
+                stats['audio_sec'] += sum(dur for _, _, dur in ok)
+            out.flush()
+
+            elapsed = time.perf_counter() - start
+            logger.info(f"  {c0 + len(chunk)}/{len(todo)} files "
+                        f"({(c0 + len(chunk)) / elapsed:.2f} files/s)")
+
+    stats['elapsed_sec'] = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch-score a directory of WAV recordings.')
+    parser.add_argument('wav_dir')
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'audio_scores.csv'))
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=32,
+                        help='Files per batched predict_proba call')
+    parser.add_argument('--recursive', action='store_true')
+    args = parser.parse_args(argv)
+
+    stats = score_directory(args.wav_dir, args.output, args.workers,
+                            args.chunk_size, args.recursive)
+    elapsed = max(stats['elapsed_sec'], 1e-9)
+    print(f"Scored {stats['scored']} files ({stats['failed']} failed, "
+          f"{stats['skipped']} skipped) in {stats['elapsed_sec']:.1f}s")
+    if stats['scored']:
+        print(f"  {stats['scored'] / elapsed:.2f} files/s, "
+              f"{stats['audio_sec'] / elapsed:.1f}x real time")
+    print(f"  Output → {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
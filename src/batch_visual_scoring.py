@@ -0,0 +1,210 @@
+# src/batch_visual_scoring.py
+"""
+Bulk re-scoring of stored face-api.js session logs with the browser visual
+model (visual_browser_model.pkl), e.g. after it has been retrained.
+
+A session log holds per-frame expression probabilities, in the same shape
+the browser streams to /api/visual-frames:
+  *.json   {"sessionId": ..., "frames": [{"happy": 0.1, ...}, ...]}
+           or a bare list of frame objects
+  *.jsonl  one frame object per line
+  *.csv    one row per frame, one column per expression
+
+Each log goes through expression_features (the code the model is trained
+on), rows are aligned to the saved training columns, and the whole matrix
+is scaled and scored with one transform + predict_proba call. Results are
+written as Parquet when pyarrow/fastparquet is installed, otherwise CSV.
+
+Usage:
+  python src/batch_visual_scoring.py <log_dir> [--output results/visual_session_scores.parquet]
+                                     [--recursive]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+import joblib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import MODELS_DIR, RESULTS_DIR
+from src.visual_browser_model import EXPRESSIONS, expression_features
+
+logger = logging.getLogger(__name__)
+
+# Optional: Parquet engine for columnar output
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    try:
+        import fastparquet  # noqa: F401
+        HAS_PARQUET = True
+    except ImportError:
+        HAS_PARQUET = False
+
+LOG_EXTENSIONS = ('.json', '.jsonl', '.csv')
+
+# Same minimum as the streamed-session path in /api/predict
+MIN_FRAMES = 5
+
+
+def find_session_logs(log_dir, recursive=False):
+    """Sorted list of session log paths (relative to ``log_dir``)."""
+    found = []
+    if recursive:
+        for root, _, files in os.walk(log_dir):
+            found.extend(os.path.relpath(os.path.join(root, f), log_dir)
+                         for f in files if f.lower().endswith(LOG_EXTENSIONS))
+    else:
+        found = [f for f in os.listdir(log_dir)
+                 if f.lower().endswith(LOG_EXTENSIONS) and os.path.isfile(os.path.join(log_dir, f))]
+    return sorted(found)
+
+
+def load_session_log(path):
+    """(frames, 7) expression matrix in EXPRESSIONS order, clipped to [0, 1]."""
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path)
+        X = df.reindex(columns=list(EXPRESSIONS), fill_value=0.0).to_numpy(dtype=np.float64)
+    else:
+        with open(path) as f:
+            if path.lower().endswith('.jsonl'):
+                frames = [json.loads(line) for line in f if line.strip()]
+            else:
+                frames = json.load(f)
+        if isinstance(frames, dict):
+            frames = frames.get('frames', [])
+        X = np.array([[float(fr.get(e, 0.0)) for e in EXPRESSIONS] for fr in frames],
+                     dtype=np.float64).reshape(-1, len(EXPRESSIONS))
+    if not np.all(np.isfinite(X)):
+        raise ValueError('non-finite expression values')
+    return np.clip(X, 0.0, 1.0)
+
+
+def check_columns(columns, scaler):
+    """Raise unless ``columns`` name exactly the features ``scaler`` was fit on."""
+    if len(columns) != scaler.n_features_in_:
+        raise ValueError(f"{len(columns)} feature columns but the browser visual scaler expects "
+                         f"{scaler.n_features_in_}; retrain or re-save visual_browser_columns.pkl")
+
+
+def load_browser_visual_model(models_dir=MODELS_DIR):
+    """
+    Browser visual model, its scaler and the training column order. The
+    column file is required: features are matched by name, never by position.
+    """
+    model = joblib.load(os.path.join(models_dir, 'visual_browser_model.pkl'))
+    scaler = joblib.load(os.path.join(models_dir, 'visual_browser_scaler.pkl'))
+    columns = list(joblib.load(os.path.join(models_dir, 'visual_browser_columns.pkl')))
+    check_columns(columns, scaler)
+    return model, scaler, columns
+
+
+def session_feature_matrix(expr_list, columns):
+    """
+    (sessions, len(columns)) feature matrix from a list of expression
+    matrices. Raises if expression_features does not produce a column.
+    """
+    X = np.zeros((len(expr_list), len(columns)), dtype=np.float64)
+    for i, expr in enumerate(expr_list):
+        feats = expression_features(expr)
+        missing = [c for c in columns if c not in feats]
+        if missing:
+            raise ValueError(f"expression_features does not produce training columns {missing}; "
+                             f"retrain the browser visual model")
+        X[i] = [feats[c] for c in columns]
+    return X
+
+
+def score_sessions(log_dir, output_path=None, recursive=False, model=None, scaler=None,
+                   columns=None):
+    """
+    Score every session log under ``log_dir``. Returns a DataFrame with
+    session, n_frames, visual_prob (NaN with an ``error`` for logs that
+    could not be read or have fewer than MIN_FRAMES frames), and writes it
+    to ``output_path`` if given. A ``model`` passed in needs its ``scaler``
+    and training ``columns`` too.
+    """
+    if model is None:
+        model, scaler, columns = load_browser_visual_model()
+    elif scaler is None or columns is None:
+        raise ValueError('score_sessions(model=...) also needs scaler and columns '
+                         '(the training column order)')
+    check_columns(columns, scaler)
+
+    files = find_session_logs(log_dir, recursive)
+    logger.info(f"Found {len(files)} session logs")
+    start = time.perf_counter()
+
+    rows, exprs, ok = [], [], []
+    for f in files:
+        try:
+            expr = load_session_log(os.path.join(log_dir, f))
+        except Exception as e:
+            rows.append({'session': f, 'n_frames': 0, 'error': str(e)[:120]})
+            continue
+        error = f'fewer than {MIN_FRAMES} frames' if len(expr) < MIN_FRAMES else ''
+        rows.append({'session': f, 'n_frames': len(expr), 'error': error})
+        if not error:
+            exprs.append(expr)
+            ok.append(len(rows) - 1)
+    load_sec = time.perf_counter() - start
+
+    results = pd.DataFrame(rows, columns=['session', 'n_frames', 'error'])
+    results['visual_prob'] = np.nan
+    if exprs:
+        X = session_feature_matrix(exprs, columns)
+        probs = model.predict_proba(scaler.transform(X))[:, 1]
+        results.loc[ok, 'visual_prob'] = probs
+    elapsed = time.perf_counter() - start
+
+    results = results[['session', 'n_frames', 'visual_prob', 'error']]
+    results.attrs['stats'] = {'scored': len(exprs), 'failed': len(files) - len(exprs),
+                              'frames': int(sum(len(e) for e in exprs)),
+                              'load_sec': load_sec, 'elapsed_sec': elapsed}
+    if output_path:
+        output_path = write_scores(results, output_path)
+        results.attrs['output'] = output_path
+    return results
+
+
+def write_scores(results, output_path):
+    """Write Parquet if an engine is installed, otherwise CSV. Returns the path used."""
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    if output_path.endswith('.parquet'):
+        if HAS_PARQUET:
+            results.to_parquet(output_path, index=False)
+            return output_path
+        output_path = output_path[:-len('.parquet')] + '.csv'
+        logger.warning(f"No Parquet engine (pyarrow/fastparquet); writing CSV → {output_path}")
+    results.to_csv(output_path, index=False)
+    return output_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch-score stored face-api.js session logs.')
+    parser.add_argument('log_dir')
+    parser.add_argument('--output',
+                        default=os.path.join(RESULTS_DIR, 'visual_session_scores.parquet'))
+    parser.add_argument('--recursive', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = score_sessions(args.log_dir, args.output, args.recursive)
+    stats = results.attrs['stats']
+    elapsed = max(stats['elapsed_sec'], 1e-9)
+    print(f"Scored {stats['scored']} sessions ({stats['failed']} failed/too short) "
+          f"in {stats['elapsed_sec']:.2f}s (loading {stats['load_sec']:.2f}s)")
+    if stats['scored']:
+        print(f"  {stats['scored'] / elapsed:.1f} sessions/s, "
+              f"{stats['frames'] / elapsed:,.0f} frames/s")
+    print(f"  Output → {results.attrs['output']}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
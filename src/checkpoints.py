@@ -0,0 +1,100 @@
+# src/checkpoints.py
+"""
+Per-fold checkpoints that let an interrupted main.py run resume.
+
+A run directory is keyed by a hash of everything that determines the CV
+results: the feature matrices and labels, the column names, and the
+parameters of every modality pipeline plus the CV settings. Each outer
+fold's outputs (held-out probabilities, inner-CV AUCs, fusion weights,
+fold AUCs and optionally the fitted pipelines) are written there as one
+joblib file as soon as the fold finishes; the final refits are stored the
+same way. Files are written to a temp name and moved into place with
+os.replace, so a crash never leaves a truncated checkpoint behind.
+
+Re-running with identical config and data finds the same directory, loads
+the completed folds instead of refitting them, and rebuilds the summary
+and plots from them. Any change to the data or a hyperparameter gives a
+new key and therefore a fresh run.
+"""
+import os
+import json
+import uuid
+import shutil
+import logging
+from datetime import datetime
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+
+def run_key(*parts):
+    """Stable hash of the data / configuration ``parts`` (joblib.hash)."""
+    return joblib.hash(parts)
+
+
+class RunCheckpoint:
+    """Atomic per-fold and per-stage checkpoint files in one run directory."""
+
+    def __init__(self, root, key, meta=None):
+        self.key = key
+        self.meta = meta or {}
+        self.directory = os.path.join(root, key[:16])
+        os.makedirs(self.directory, exist_ok=True)
+        if not os.path.exists(os.path.join(self.directory, 'run.json')):
+            self._write_manifest()
+
+    def _write_manifest(self):
+        payload = {'key': self.key, 'created': datetime.now().isoformat(timespec='seconds'),
+                   **self.meta}
+        self._atomic_write(os.path.join(self.directory, 'run.json'),
+                           lambda tmp: _write_json(tmp, payload))
+
+    def _path(self, name):
+        return os.path.join(self.directory, f'{name}.pkl')
+
+    def _atomic_write(self, path, write):
+        tmp = os.path.join(self.directory, f'.{os.path.basename(path)}.{uuid.uuid4().hex}.tmp')
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # ── Generic stages ────────────────────────────────────────────
+    def save(self, name, value):
+        self._atomic_write(self._path(name), lambda tmp: joblib.dump(value, tmp))
+
+    def load(self, name):
+        """Checkpointed value, or None if missing or unreadable."""
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+    # ── Folds ─────────────────────────────────────────────────────
+    def save_fold(self, fold, outputs):
+        self.save(f'fold_{fold}', outputs)
+
+    def load_fold(self, fold):
+        return self.load(f'fold_{fold}')
+
+    def completed_folds(self):
+        return sorted(int(f[len('fold_'):-len('.pkl')]) for f in os.listdir(self.directory)
+                      if f.startswith('fold_') and f.endswith('.pkl'))
+
+    def clear(self):
+        """Delete every checkpoint of this run (the directory is recreated)."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_manifest()
+
+
+def _write_json(path, payload):
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=1, default=str)
@@ -1,10 +1,6 @@
 # src/evaluate.py
 import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 import logging
 
@@ -18,6 +14,7 @@ from sklearn.metrics import (
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from config import RESULTS_DIR
+from src.reporting import pyplot, render_figures
 
 os.makedirs(RESULTS_DIR, exist_ok=True)
 logger = logging.getLogger(__name__)
@@ -87,6 +84,33 @@ def evaluate_cv(cv_results_list):
     return summary
 
 
+def evaluate_repeats(per_repeat, ci_level=0.95):
+    """
+    Aggregate metrics across repeated cross-validation runs.
+
+    Args:
+        per_repeat: DataFrame with one row per (Repeat, Model) and a column per metric
+        ci_level: coverage of the percentile interval (default 0.95)
+
+    Returns:
+        DataFrame with one row per Model: mean, std and percentile interval
+        (_lo / _hi) of each metric over the repeats
+    """
+    alpha = (1 - ci_level) / 2
+    metrics = [c for c in per_repeat.columns if c not in ('Repeat', 'Model')]
+    rows = []
+    for model, df in per_repeat.groupby('Model', sort=False):
+        summary = {'Model': model, 'Repeats': len(df)}
+        for m in metrics:
+            vals = df[m].values
+            summary[f'{m}_mean'] = round(float(np.mean(vals)), 4)
+            summary[f'{m}_std'] = round(float(np.std(vals)), 4)
+            summary[f'{m}_lo'] = round(float(np.percentile(vals, alpha * 100)), 4)
+            summary[f'{m}_hi'] = round(float(np.percentile(vals, (1 - alpha) * 100)), 4)
+        rows.append(summary)
+    return pd.DataFrame(rows)
+
+
 def clinical_metrics(y_true, y_pred):
     """Compute clinically relevant metrics (sensitivity, specificity, etc.)."""
     cm = confusion_matrix(y_true, y_pred)
@@ -109,11 +133,13 @@ def clinical_metrics(y_true, y_pred):
     }
 
 
-def evaluate(y_true, y_pred, y_prob, name="Model", verbose=True):
+def evaluate(y_true, y_pred, y_prob, name="Model", verbose=True, plot=None):
     """Comprehensive model evaluation with clinical metrics.
     
     Args:
         verbose: If False, suppress logging and skip plot generation (for CV folds).
+        plot: Render the confusion-matrix PNG (default: same as verbose). It is
+            only redrawn when the matrix changed (src/reporting.render_figures).
     """
     if verbose:
         logger.info(f"\n{'='*50}")
@@ -150,36 +176,14 @@ def evaluate(y_true, y_pred, y_prob, name="Model", verbose=True):
         logger.info(f"  NPV             : {clinical['npv']:.4f}")
         logger.info(f"\n{classification_report(y_true, y_pred, target_names=['Not Depressed','Depressed'], zero_division=0)}")
 
-    # Confusion Matrix — only generate plots when verbose
+    # Confusion Matrix — plots are drawn only when plot (default: verbose)
     cm = confusion_matrix(y_true, y_pred)
 
-    if verbose:
-        cm_norm = cm.astype('float') / cm.sum(axis=1)[:, np.newaxis]
-
-        fig, axes = plt.subplots(1, 2, figsize=(12, 5))
-
-        # Raw counts
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-                    xticklabels=['Not Dep.', 'Depressed'],
-                    yticklabels=['Not Dep.', 'Depressed'],
-                    ax=axes[0])
-        axes[0].set_title(f'{name} — Confusion Matrix (Counts)')
-        axes[0].set_ylabel('True Label')
-        axes[0].set_xlabel('Predicted Label')
-
-        # Normalized
-        sns.heatmap(cm_norm, annot=True, fmt='.1%', cmap='Blues',
-                    xticklabels=['Not Dep.', 'Depressed'],
-                    yticklabels=['Not Dep.', 'Depressed'],
-                    ax=axes[1])
-        axes[1].set_title(f'{name} — Confusion Matrix (Normalized)')
-        axes[1].set_ylabel('True Label')
-        axes[1].set_xlabel('Predicted Label')
-
-        plt.tight_layout()
+    plot = verbose if plot is None else plot
+    if plot:
         safe_name = name.replace(" ", "_")
-        plt.savefig(os.path.join(RESULTS_DIR, f'{safe_name}_confusion_matrix.png'), dpi=150, bbox_inches='tight')
-        plt.close()
+        render_figures([(f'{safe_name}_confusion_matrix.png', 'confusion_counts_figure',
+                         {'cm': cm, 'name': name})], RESULTS_DIR, workers=1)
 
     return {
         'Model': name,
@@ -204,6 +208,7 @@ def evaluate(y_true, y_pred, y_prob, name="Model", verbose=True):
 
 def plot_roc_curves(roc_data, filename='roc_curves.png'):
     """Plot ROC curves with AUC scores and confidence intervals."""
+    plt, _ = pyplot()
     plt.figure(figsize=(10, 8))
     colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2']
 
@@ -235,6 +240,7 @@ def plot_roc_curves(roc_data, filename='roc_curves.png'):
 
 def plot_precision_recall_curves(pr_data, filename='pr_curves.png'):
     """Plot Precision-Recall curves."""
+    plt, _ = pyplot()
     plt.figure(figsize=(10, 8))
     colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2']
 
@@ -261,6 +267,7 @@ def plot_precision_recall_curves(pr_data, filename='pr_curves.png'):
 
 def plot_model_comparison(results_list, filename='model_comparison.png'):
     """Enhanced model comparison with multiple metrics."""
+    plt, _ = pyplot()
     df = pd.DataFrame(results_list).set_index('Model')
 
     fig, axes = plt.subplots(2, 2, figsize=(14, 12))
@@ -316,6 +323,7 @@ def plot_model_comparison(results_list, filename='model_comparison.png'):
 
 def plot_calibration_curve(y_true, y_prob, name, filename=None):
     """Plot calibration curve for probability reliability."""
+    plt, _ = pyplot()
     from sklearn.calibration import calibration_curve
 
     prob_true, prob_pred = calibration_curve(y_true, y_prob, n_bins=10, strategy='uniform')
@@ -0,0 +1,161 @@
+# src/fit_cache.py
+"""
+On-disk cache of fitted preprocessing prefixes for the CV pipelines.
+
+main.py refits the same VarianceThreshold → SelectKBest(mutual_info) / PCA
+→ StandardScaler prefix on identical fold subsets every time it runs, even
+when only the classifier changed. FitCache stores each fitted prefix,
+together with the transformed training matrix it produced, under a content
+hash of:
+  - the input matrix and labels (joblib.hash),
+  - every step's class and get_params() (including a seeded score_func),
+  - the scikit-learn / imbalanced-learn versions.
+
+Entries are joblib pickles written atomically (temp file + os.replace), so
+several worker processes can share one directory. When the directory grows
+past ``max_bytes`` the least recently used entries are deleted (a hit
+refreshes an entry's mtime).
+
+fit_pipeline_cached() fits an (imblearn) Pipeline through the cache: the
+steps before the first resampler (SMOTE) are the cached prefix, the rest
+is fitted on the cached transformed matrix. Because the prefix output is
+the stored fit_transform result, a cache hit gives bit-identical
+predictions to an uncached pipeline.fit.
+"""
+import os
+import uuid
+import logging
+
+import joblib
+import sklearn
+
+logger = logging.getLogger(__name__)
+
+try:
+    import imblearn
+    _IMBLEARN_VERSION = imblearn.__version__
+except ImportError:
+    _IMBLEARN_VERSION = None
+
+STAT_KEYS = ('hits', 'misses', 'stores', 'evictions')
+
+
+class FitCache:
+    """Content-addressed store of fitted transformer prefixes with LRU size eviction."""
+
+    def __init__(self, directory, max_bytes=512 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = dict.fromkeys(STAT_KEYS, 0)
+        os.makedirs(directory, exist_ok=True)
+
+    # ── Keys and entries ──────────────────────────────────────────
+    @staticmethod
+    def key(steps, X, y):
+        """Hash of the input data and every step's class and parameters."""
+        spec = [(name, type(step).__module__, type(step).__qualname__,
+                 step.get_params(deep=False)) for name, step in steps]
+        return joblib.hash((X, y, spec, sklearn.__version__, _IMBLEARN_VERSION))
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            value = joblib.load(path)
+            os.utime(path)  # most recently used
+        except (OSError, EOFError, ValueError):
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return value
+
+    def put(self, key, value):
+        tmp = os.path.join(self.directory, f'.{key}.{uuid.uuid4().hex}.tmp')
+        joblib.dump(value, tmp)
+        os.replace(tmp, self._path(key))
+        self.stats['stores'] += 1
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pkl'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                self.stats['evictions'] += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size_bytes(self):
+        return sum(os.path.getsize(os.path.join(self.directory, f))
+                   for f in os.listdir(self.directory) if f.endswith('.pkl'))
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                os.remove(os.path.join(self.directory, name))
+
+    # ── Stats ─────────────────────────────────────────────────────
+    def merge_stats(self, other):
+        """Add counters returned from a worker process."""
+        for k in STAT_KEYS:
+            self.stats[k] += other.get(k, 0)
+
+    def reset_stats(self):
+        self.stats = dict.fromkeys(STAT_KEYS, 0)
+
+    def summary(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        rate = self.stats['hits'] / lookups if lookups else 0.0
+        return (f"{self.stats['hits']} hits / {lookups} lookups ({rate:.0%}), "
+                f"{self.stats['evictions']} evicted, {self.size_bytes() / 2**20:.1f} MB on disk")
+
+    # ── Fitting ───────────────────────────────────────────────────
+    def fit_transform(self, steps, X, y):
+        """
+        Fitted copies of ``steps`` and the transformed X, from the cache or
+        by fit_transform-ing each step in turn (as Pipeline.fit does).
+        """
+        key = self.key(steps, X, y)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        Xt, fitted = X, []
+        for name, step in steps:
+            Xt = step.fit_transform(Xt, y)
+            fitted.append((name, step))
+        self.put(key, (fitted, Xt))
+        return fitted, Xt
+
+
+def _prefix_length(steps):
+    """Number of leading steps before the first resampler or the final estimator."""
+    for i, (_, step) in enumerate(steps[:-1]):
+        if hasattr(step, 'fit_resample'):
+            return i
+    return len(steps) - 1
+
+
+def fit_pipeline_cached(pipe, X, y, cache=None):
+    """Fit ``pipe`` in place, taking its preprocessing prefix from ``cache``."""
+    n_prefix = _prefix_length(pipe.steps)
+    if cache is None or n_prefix == 0:
+        return pipe.fit(X, y)
+    fitted, Xt = cache.fit_transform(pipe.steps[:n_prefix], X, y)
+    rest = type(pipe)(pipe.steps[n_prefix:]).fit(Xt, y)
+    pipe.steps = list(fitted) + list(rest.steps)
+    return pipe
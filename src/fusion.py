@@ -7,13 +7,16 @@ from sklearn.svm import SVC
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import StratifiedKFold, cross_val_score
-from sklearn.feature_selection import SelectKBest, f_classif, mutual_info_classif
+from sklearn.feature_selection import SelectKBest, f_classif
 from sklearn.calibration import CalibratedClassifierCV
 from imblearn.over_sampling import SMOTE, ADASYN
 from imblearn.pipeline import Pipeline as ImbPipeline
 import joblib
 import os
 import warnings
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from xgboost import XGBClassifier
@@ -25,7 +28,10 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from config import (MODELS_DIR, SMOTE_K_NEIGHBORS, CV_SPLITS, RANDOM_STATE,
                     C_GRID, THRESHOLD_MIN, THRESHOLD_MAX, THRESHOLD_STEP,
-                    AUGMENT_MIXUP, AUGMENT_NOISE, MIXUP_ALPHA, NOISE_STD, AUGMENT_FACTOR)
+                    AUGMENT_MIXUP, AUGMENT_NOISE, MIXUP_ALPHA, NOISE_STD, AUGMENT_FACTOR,
+                    AUGMENT_LEGACY_RNG)
+from src.feature_scoring import mi_score_func
+from src.thresholds import best_threshold, threshold_curve
 
 warnings.filterwarnings('ignore', category=UserWarning)
 os.makedirs(MODELS_DIR, exist_ok=True)
@@ -33,11 +39,26 @@ os.makedirs(MODELS_DIR, exist_ok=True)
 logger = logging.getLogger(__name__)
 
 
-def mixup_augment(X, y, alpha=0.2, n_augment=None, random_state=42):
+def _with_augmented_rows(X, y, n_augment):
+    """Preallocated (X, y) with ``n_augment`` minority rows after the originals; returns the new X rows."""
+    X_out = np.empty((len(X) + n_augment, X.shape[1]), dtype=np.result_type(X, np.float64))
+    y_out = np.empty(len(y) + n_augment, dtype=np.result_type(y, int))
+    X_out[:len(X)] = X
+    y_out[:len(y)] = y
+    y_out[len(y):] = 1
+    return X_out, y_out, X_out[len(X):]
+
+
+def mixup_augment(X, y, alpha=0.2, n_augment=None, random_state=42,
+                  legacy_rng=AUGMENT_LEGACY_RNG):
     """
     Mixup data augmentation — creates synthetic samples by blending pairs.
     Particularly effective for small tabular datasets.
 
+    Pairs and mixing weights are drawn in one batch. ``legacy_rng=True``
+    draws them one sample at a time instead, reproducing the per-seed
+    output of the original loop (config.AUGMENT_LEGACY_RNG).
+
     Args:
         X: feature matrix
         y: labels
@@ -47,7 +68,6 @@ def mixup_augment(X, y, alpha=0.2, n_augment=None, random_state=42):
     rng = np.random.RandomState(random_state)
     minority_mask = y == 1  # Depression is minority class
     X_min = X[minority_mask]
-    y_min = y[minority_mask]
 
     if len(X_min) < 2:
         return X, y
@@ -55,23 +75,31 @@ def mixup_augment(X, y, alpha=0.2, n_augment=None, random_state=42):
     if n_augment is None:
         n_augment = len(X_min)
 
-    X_aug, y_aug = [], []
-    for _ in range(n_augment):
-        i, j = rng.choice(len(X_min), 2, replace=False)
-        lam = rng.beta(alpha, alpha)
-        x_new = lam * X_min[i] + (1 - lam) * X_min[j]
-        X_aug.append(x_new)
-        y_aug.append(1)
-
-    X_combined = np.vstack([X, np.array(X_aug)])
-    y_combined = np.concatenate([y, np.array(y_aug)])
+    X_combined, y_combined, X_aug = _with_augmented_rows(X, y, n_augment)
+    if legacy_rng:
+        for k in range(n_augment):
+            i, j = rng.choice(len(X_min), 2, replace=False)
+            lam = rng.beta(alpha, alpha)
+            X_aug[k] = lam * X_min[i] + (1 - lam) * X_min[j]
+        return X_combined, y_combined
+
+    # Distinct pairs: j is i shifted by 1 … n-1 (uniform over the other rows)
+    i = rng.randint(len(X_min), size=n_augment)
+    j = (i + rng.randint(1, len(X_min), size=n_augment)) % len(X_min)
+    lam = rng.beta(alpha, alpha, size=n_augment)[:, None]
+    np.take(X_min, j, axis=0, out=X_aug)
+    X_aug += lam * (X_min[i] - X_aug)  # lam * x_i + (1 - lam) * x_j
     return X_combined, y_combined
 
 
-def noise_augment(X, y, noise_std=0.05, n_augment=None, random_state=42):
+def noise_augment(X, y, noise_std=0.05, n_augment=None, random_state=42,
+                  legacy_rng=AUGMENT_LEGACY_RNG):
     """
     Gaussian noise augmentation — adds small random perturbations to minority class.
 
+    Source rows and the noise matrix are drawn in one batch; ``legacy_rng``
+    as in mixup_augment.
+
     Args:
         X: feature matrix
         y: labels
@@ -91,25 +119,28 @@ def noise_augment(X, y, noise_std=0.05, n_augment=None, random_state=42):
     # Scale noise by feature standard deviation
     feature_stds = np.std(X, axis=0) + 1e-10
 
-    X_aug, y_aug = [], []
-    for _ in range(n_augment):
-        idx = rng.choice(len(X_min))
-        noise = rng.normal(0, noise_std, size=X_min.shape[1]) * feature_stds
-        x_new = X_min[idx] + noise
-        X_aug.append(x_new)
-        y_aug.append(1)
-
-    X_combined = np.vstack([X, np.array(X_aug)])
-    y_combined = np.concatenate([y, np.array(y_aug)])
+    X_combined, y_combined, X_aug = _with_augmented_rows(X, y, n_augment)
+    if legacy_rng:
+        for k in range(n_augment):
+            idx = rng.choice(len(X_min))
+            noise = rng.normal(0, noise_std, size=X_min.shape[1]) * feature_stds
+            X_aug[k] = X_min[idx] + noise
+        return X_combined, y_combined
+
+    idx = rng.randint(len(X_min), size=n_augment)
+    np.take(X_min, idx, axis=0, out=X_aug)
+    noise = rng.normal(0, noise_std, size=X_aug.shape)
+    noise *= feature_stds
+    X_aug += noise
     return X_combined, y_combined
 
 
 def select_features(X, y, feature_names=None, k=30):
-    """Select top k features using mutual information."""
+    """Select top k features using mutual information (config.MI_SCORER)."""
     if X.shape[1] <= k:
         return X, slice(None), None
 
-    selector = SelectKBest(score_func=mutual_info_classif, k=min(k, X.shape[1]))
+    selector = SelectKBest(score_func=mi_score_func(), k=min(k, X.shape[1]))
     X_selected = selector.fit_transform(X, y)
 
     if feature_names:
@@ -305,40 +336,92 @@ def transform_with_selector(X, artifacts):
     return X
 
 
-def find_best_threshold(model, artifacts, X_val, y_val, metric='f1'):
+class ModalityScorer:
     """
-    Find optimal threshold using F-beta score (beta=2 favors recall).
+    Selected / scaled features and probabilities of each modality in
+    ``models_scalers``, computed once per input batch and shared by every
+    fusion strategy.
+
+    Results are memoized per modality and input array: by identity first
+    (the array is held, so its id cannot be reused), then by content hash
+    (joblib.hash), so an equal copy of a batch is not rescored either.
+    Inputs are treated as read-only. Modalities not in the cache are scored
+    concurrently on a thread pool; sklearn's heavy kernels release the GIL.
     """
-    from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score, confusion_matrix
 
+    def __init__(self, models_scalers, max_workers=None, max_entries=32):
+        self.models_scalers = models_scalers
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self._keys = OrderedDict()     # (modality, id(X)) → (X, content key)
+        self._results = OrderedDict()  # content key → (X_sc, probs)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _key(self, modality, X):
+        held = self._keys.get((modality, id(X)))
+        if held is not None and held[0] is X:
+            return held[1]
+        key = (modality, joblib.hash(np.asarray(X)))
+        self._keys[(modality, id(X))] = (X, key)
+        while len(self._keys) > self.max_entries:
+            self._keys.popitem(last=False)
+        return key
+
+    def _score(self, modality, X):
+        model, artifacts = self.models_scalers[modality]
+        X_sc = artifacts['scaler'].transform(transform_with_selector(X, artifacts))
+        return X_sc, model.predict_proba(X_sc)[:, 1]
+
+    def score(self, X_dict, modalities=None):
+        """
+        {modality: (transformed features, probabilities)}. By default every
+        modality that has both a model and features in ``X_dict``.
+        """
+        if modalities is None:
+            modalities = [m for m in self.models_scalers if m in X_dict]
+        with self._lock:
+            keys = {m: self._key(m, X_dict[m]) for m in modalities}
+            todo = [m for m in modalities if keys[m] not in self._results]
+            self.stats['hits'] += len(modalities) - len(todo)
+            self.stats['misses'] += len(todo)
+            if len(todo) > 1 and self.max_workers != 1:
+                with ThreadPoolExecutor(self.max_workers or len(todo)) as pool:
+                    scored = list(pool.map(lambda m: self._score(m, X_dict[m]), todo))
+            else:
+                scored = [self._score(m, X_dict[m]) for m in todo]
+            for m, result in zip(todo, scored):
+                self._results[keys[m]] = result
+            results = {m: self._results[keys[m]] for m in modalities}
+            for key in keys.values():
+                self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return results
+
+    def predict_proba(self, X_dict, modalities=None):
+        """{modality: positive-class probabilities}, as score()."""
+        return {m: probs for m, (_, probs) in self.score(X_dict, modalities).items()}
+
+
+def find_best_threshold(model, artifacts, X_val, y_val, metric='f1'):
+    """
+    Find optimal threshold on the config grid using F1, F-beta (beta=2
+    favors recall) or Youden's J (src/thresholds.py).
+    """
     scaler = artifacts['scaler']
     X_selected = transform_with_selector(X_val, artifacts)
     X_sc = scaler.transform(X_selected)
 
     probs = model.predict_proba(X_sc)[:, 1]
 
-    best_t, best_score = 0.5, 0.0
     beta = 2.0  # Favor recall (depression detection is safety-critical)
-
-    for t in np.arange(THRESHOLD_MIN, THRESHOLD_MAX, THRESHOLD_STEP):
-        preds = (probs >= t).astype(int)
-        if metric == 'f1':
-            score = f1_score(y_val, preds, zero_division=0)
-        elif metric == 'fbeta':
-            prec = precision_score(y_val, preds, zero_division=0)
-            rec = recall_score(y_val, preds, zero_division=0)
-            score = (1 + beta**2) * (prec * rec) / ((beta**2 * prec) + rec) if (prec + rec) > 0 else 0
-        elif metric == 'youden':
-            # Youden's J = sensitivity + specificity - 1
-            tpr = recall_score(y_val, preds, zero_division=0)
-            fpr = np.mean((preds == 1) & (y_val == 0))
-            score = tpr - fpr
-        else:
-            score = f1_score(y_val, preds, zero_division=0)
-
-        if score > best_score:
-            best_score = score
-            best_t = t
+    objective = metric if metric in ('f1', 'fbeta', 'youden') else 'f1'
+    best_t, best_score = best_threshold(
+        y_val, probs, objective, grid=np.arange(THRESHOLD_MIN, THRESHOLD_MAX, THRESHOLD_STEP),
+        beta=beta)
+    if best_score <= 0:
+        best_t, best_score = 0.5, 0.0
 
     logger.info(f"    Best threshold: {best_t:.2f} (score={best_score:.3f})")
     return best_t
@@ -353,58 +436,49 @@ def find_cost_sensitive_threshold(model, artifacts, X_val, y_val, fn_cost=5, fp_
         fn_cost: Cost of false negative (default 5x more expensive)
         fp_cost: Cost of false positive (default 1x)
     """
-    from sklearn.metrics import confusion_matrix
-
     scaler = artifacts['scaler']
     X_selected = transform_with_selector(X_val, artifacts)
     X_sc = scaler.transform(X_selected)
     probs = model.predict_proba(X_sc)[:, 1]
 
-    best_t, best_cost = 0.5, float('inf')
-
-    for t in np.arange(0.1, 0.9, 0.01):
-        preds = (probs >= t).astype(int)
-        cm = confusion_matrix(y_val, preds)
-        tn, fp, fn, tp = cm.ravel()
-        cost = fn * fn_cost + fp * fp_cost
-        if cost < best_cost:
-            best_cost = cost
-            best_t = t
+    best_t, score = best_threshold(y_val, probs, 'cost', grid=np.arange(0.1, 0.9, 0.01),
+                                   fn_cost=fn_cost, fp_cost=fp_cost)
+    best_cost = -score
 
     # Calculate metrics at best threshold
-    preds = (probs >= best_t).astype(int)
-    cm = confusion_matrix(y_val, preds)
-    tn, fp, fn, tp = cm.ravel()
+    curve = threshold_curve(y_val, probs, grid=[best_t])
+    tp, fn = curve.tp[0], curve.fn[0]
     sensitivity = tp / (tp + fn) if (tp + fn) > 0 else 0
 
-    logger.info(f"    Cost-sensitive threshold: {best_t:.2f} (cost={best_cost}, sensitivity={sensitivity:.3f})")
+    logger.info(f"    Cost-sensitive threshold: {best_t:.2f} (cost={best_cost:g}, sensitivity={sensitivity:.3f})")
     return best_t
 
 
-def late_fusion_predict(models_scalers, X_dict, weights=None, threshold=0.40, y_val=None):
+def late_fusion_predict(models_scalers, X_dict, weights=None, threshold=0.40, y_val=None,
+                        scorer=None):
     """
     Enhanced late fusion with performance-based weighting.
 
     If y_val is provided, weights are computed from validation AUC.
-    Otherwise, provided weights or equal weighting is used.
+    Otherwise, provided weights or equal weighting is used. Modality
+    probabilities come from ``scorer``; pass one ModalityScorer to share
+    its cache across strategies, otherwise a fresh one is used per call.
     """
     from sklearn.metrics import roc_auc_score
 
     modalities = list(models_scalers.keys())
+    if scorer is None:
+        scorer = ModalityScorer(models_scalers)
 
     if weights is None and y_val is not None:
         # Compute weights from validation performance
         weights = {}
+        val_probs = scorer.predict_proba(X_dict)
         for m in modalities:
             if m not in X_dict:
                 continue
-            model, artifacts = models_scalers[m]
-            scaler = artifacts['scaler']
-            X_selected = transform_with_selector(X_dict[m], artifacts)
-            X_sc = scaler.transform(X_selected)
-            probs = model.predict_proba(X_sc)[:, 1]
             try:
-                auc = roc_auc_score(y_val, probs)
+                auc = roc_auc_score(y_val, val_probs[m])
                 # Weight by AUC above random chance (0.5)
                 weights[m] = max(0.01, auc - 0.5)
             except:
@@ -424,41 +498,30 @@ def late_fusion_predict(models_scalers, X_dict, weights=None, threshold=0.40, y_
     n = len(next(iter(X_dict.values())))
     prob_sum = np.zeros(n)
 
-    for m in modalities:
-        if weights.get(m, 0) <= 0.01:  # Skip very low weight modalities
-            continue
-
-        model, artifacts = models_scalers[m]
-        scaler = artifacts['scaler']
-
-        X_selected = transform_with_selector(X_dict[m], artifacts)
-        X_sc = scaler.transform(X_selected)
-        probs = model.predict_proba(X_sc)[:, 1]
-
-        prob_sum += probs * weights[m]
+    # Skip very low weight modalities; the rest are cached if already scored
+    active = [m for m in modalities if weights.get(m, 0) > 0.01]
+    probs = scorer.predict_proba(X_dict, active)
+    for m in active:
+        prob_sum += probs[m] * weights[m]
 
     predictions = (prob_sum >= threshold).astype(int)
     return predictions, prob_sum
 
 
-def train_meta_learner(models_scalers, X_dict, y, cv_splits=3):
+def train_meta_learner(models_scalers, X_dict, y, cv_splits=3, scorer=None):
     """
-    Train a meta-learner for stacking fusion.
+    Train a meta-learner for stacking fusion. Meta-features come from
+    ``scorer`` (as in late_fusion_predict).
     """
     from sklearn.linear_model import LogisticRegression
 
+    if scorer is None:
+        scorer = ModalityScorer(models_scalers)
+
     # Build meta-features
-    meta_features = []
-    for m in ['text', 'audio', 'visual']:
-        if m in models_scalers:
-            model, artifacts = models_scalers[m]
-            scaler = artifacts['scaler']
-            X_selected = transform_with_selector(X_dict[m], artifacts)
-            X_sc = scaler.transform(X_selected)
-            probs = model.predict_proba(X_sc)[:, 1]
-            meta_features.append(probs)
-
-    meta_X = np.column_stack(meta_features)
+    modalities = [m for m in ['text', 'audio', 'visual'] if m in models_scalers]
+    probs = scorer.predict_proba(X_dict, modalities)
+    meta_X = np.column_stack([probs[m] for m in modalities])
 
     # Train meta-learner with regularization
     meta_model = LogisticRegression(
@@ -492,9 +555,24 @@ class AttentionFusion:
             min_auc_threshold: Modalities with AUC below this get minimum weight.
         """
         self.min_auc_threshold = min_auc_threshold
+        self.scorer = None
         self.auc_scores = {}
         self.weights = {}
 
+    def fit_features(self, X_dict, y_val, scorer):
+        """
+        fit() from raw feature dicts (modality → X), scored through the
+        ModalityScorer ``scorer``, which predict_features() then reuses.
+        """
+        self.scorer = scorer
+        return self.fit(scorer.predict_proba(X_dict), y_val)
+
+    def predict_features(self, X_dict, threshold=0.5):
+        """predict_proba() from raw feature dicts, scored as in fit_features()."""
+        if self.scorer is None:
+            raise ValueError("Must call fit_features() before predict_features()")
+        return self.predict_proba(self.scorer.predict_proba(X_dict), threshold)
+
     def fit(self, probabilities_dict, y_val):
         """
         Learn attention weights from validation data.
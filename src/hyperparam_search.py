@@ -0,0 +1,172 @@
+# src/hyperparam_search.py
+"""
+Successive-halving search over the modality ensemble hyperparameters
+(python main.py --search).
+
+The resource is the number of CV folds a candidate is scored on. Every
+candidate configuration starts on SEARCH_MIN_FOLDS folds; after each rung
+the best 1/SEARCH_ETA (by mean held-out AUC) are promoted, and the folds a
+promoted candidate already has are reused, so only the new folds are fitted.
+Rung fold counts grow by a factor SEARCH_ETA up to SEARCH_MAX_FOLDS (the
+folds of a repeated stratified K-fold), and the winner is the best
+candidate of the last rung.
+
+The whole plan is costed in fits before anything runs. If it exceeds
+SEARCH_MAX_FITS, the starting candidates are subsampled (ParameterSampler)
+until it fits, so total compute is bounded up front. Fits within a rung run
+in parallel (joblib). The preprocessing prefix of a fold does not depend
+on the ensemble parameters, so with a FitCache it is fitted once per fold
+and shared by every candidate.
+
+Outputs (results/):
+  search_trace.csv   one row per candidate per rung: params, folds, mean /
+                     std AUC, promoted
+  search_best.json   best params per modality, plus fits used vs. the
+                     full-grid cost and wall time
+
+main.py --tuned builds the ensembles with search_best.json
+(load_search_best). The search scores candidates on the whole cohort, the
+same rows the nested CV evaluates, so a CV run with tuned parameters is
+optimistically biased: its estimates are not a valid evaluation and the
+tuned models need a fresh held-out evaluation.
+"""
+import os
+import sys
+import json
+import math
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, RepeatedStratifiedKFold
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import (RESULTS_DIR, RANDOM_STATE, SEARCH_SPACE, SEARCH_ETA, SEARCH_MIN_FOLDS,
+                    SEARCH_MAX_FOLDS, SEARCH_MAX_FITS)
+from src.fit_cache import FitCache, fit_pipeline_cached
+
+logger = logging.getLogger(__name__)
+
+TRACE_PATH = os.path.join(RESULTS_DIR, 'search_trace.csv')
+BEST_PATH = os.path.join(RESULTS_DIR, 'search_best.json')
+
+TUNED_WARNING = ('Tuned on the full cohort: CV estimates with these parameters are '
+                 'optimistically biased; evaluate the tuned models on held-out data.')
+
+
+def rung_schedule(n_candidates, eta=SEARCH_ETA, min_folds=SEARCH_MIN_FOLDS,
+                  max_folds=SEARCH_MAX_FOLDS):
+    """[(candidates, folds)] per rung; the last rung always uses max_folds."""
+    rungs, n, folds = [], n_candidates, min(min_folds, max_folds)
+    while True:
+        rungs.append((n, folds))
+        if folds >= max_folds or n == 1:
+            break
+        n = max(1, math.ceil(n / eta))
+        folds = min(folds * eta, max_folds)
+    if rungs[-1][1] < max_folds:
+        rungs.append((1, max_folds))
+    return rungs
+
+
+def plan_fits(rungs):
+    """Fits needed by a schedule (promoted candidates only fit their new folds)."""
+    total, prev = 0, 0
+    for n, folds in rungs:
+        total += n * (folds - prev)
+        prev = folds
+    return total
+
+
+def candidate_params(space, max_fits, eta=SEARCH_ETA, min_folds=SEARCH_MIN_FOLDS,
+                     max_folds=SEARCH_MAX_FOLDS, random_state=RANDOM_STATE):
+    """The full grid, or the largest random subsample of it whose plan fits ``max_fits``."""
+    grid = list(ParameterGrid(space))
+    n = len(grid)
+    while n > 1 and plan_fits(rung_schedule(n, eta, min_folds, max_folds)) > max_fits:
+        n -= 1
+    if n == len(grid):
+        return grid
+    return list(ParameterSampler(space, n, random_state=random_state))
+
+
+def _score_fold(build, params, X, y, fold, train_idx, test_idx, cache):
+    """Held-out AUC of one candidate on one fold, with the fit-cache counters."""
+    local = FitCache(cache.directory, cache.max_bytes) if cache is not None else None
+    pipe = build(fold, int((y[train_idx] == 1).sum()))
+    pipe.set_params(**params)
+    fit_pipeline_cached(pipe, X[train_idx], y[train_idx], local)
+    try:
+        auc = roc_auc_score(y[test_idx], pipe.predict_proba(X[test_idx])[:, 1])
+    except ValueError:
+        auc = 0.5
+    return auc, (local.stats if local else None)
+
+
+def successive_halving(build, X, y, space=SEARCH_SPACE, eta=SEARCH_ETA,
+                       min_folds=SEARCH_MIN_FOLDS, max_folds=SEARCH_MAX_FOLDS,
+                       max_fits=SEARCH_MAX_FITS, jobs=1, cache=None, label=''):
+    """
+    Search ``space`` for the pipeline made by ``build(fold, n_positive)``.
+    Returns (best params, trace DataFrame, budget dict).
+    """
+    start = time.perf_counter()
+    n_splits = 5
+    cv = RepeatedStratifiedKFold(n_splits=n_splits, n_repeats=math.ceil(max_folds / n_splits),
+                                 random_state=RANDOM_STATE)
+    folds = list(cv.split(X, y))[:max_folds]
+    candidates = candidate_params(space, max_fits, eta, min_folds, max_folds)
+    rungs = rung_schedule(len(candidates), eta, min_folds, max_folds)
+    logger.info(f"  {label} search: {len(candidates)} candidates, rungs (candidates × folds) "
+                f"{[(n, f) for n, f in rungs]}, {plan_fits(rungs)} fits planned")
+
+    scores = {i: [] for i in range(len(candidates))}
+    alive = list(range(len(candidates)))
+    trace, fits = [], 0
+    for rung, (n_keep, n_folds) in enumerate(rungs):
+        alive = alive[:n_keep]
+        work = [(i, f) for i in alive for f in range(len(scores[i]), n_folds)]
+        results = Parallel(n_jobs=jobs)(
+            delayed(_score_fold)(build, candidates[i], X, y, f, *folds[f], cache) for i, f in work)
+        for (i, _), (auc, stats) in zip(work, results):
+            scores[i].append(auc)
+            if cache is not None:
+                cache.merge_stats(stats)
+        fits += len(work)
+        alive.sort(key=lambda i: -np.mean(scores[i]))
+        n_next = rungs[rung + 1][0] if rung + 1 < len(rungs) else 1
+        for rank, i in enumerate(alive):
+            trace.append({'modality': label, 'rung': rung, 'candidate': i, 'n_folds': n_folds,
+                          'mean_auc': float(np.mean(scores[i])), 'std_auc': float(np.std(scores[i])),
+                          'promoted': rank < n_next, 'params': json.dumps(candidates[i], sort_keys=True)})
+
+    best = alive[0]
+    budget = {'fits': fits, 'max_fits': max_fits, 'candidates': len(candidates),
+              'full_grid_fits': len(ParameterGrid(space)) * max_folds,
+              'seconds': time.perf_counter() - start}
+    logger.info(f"  {label} best AUC {np.mean(scores[best]):.3f} on {len(scores[best])} folds "
+                f"({fits} fits, {budget['seconds']:.1f}s): {candidates[best]}")
+    return candidates[best], pd.DataFrame(trace), {'mean_auc': float(np.mean(scores[best])), **budget}
+
+
+def write_search_results(best_by_modality, traces, budgets, trace_path=TRACE_PATH,
+                         best_path=BEST_PATH):
+    """Write the search trace CSV and the best-params JSON."""
+    os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+    pd.concat(traces, ignore_index=True).to_csv(trace_path, index=False)
+    total = {k: sum(b[k] for b in budgets.values())
+             for k in ('fits', 'full_grid_fits', 'seconds')}
+    payload = {'best': {m: {'params': best_by_modality[m], **budgets[m]} for m in best_by_modality},
+               'total': total, 'note': TUNED_WARNING}
+    with open(best_path, 'w') as f:
+        json.dump(payload, f, indent=1)
+    return trace_path, best_path
+
+
+def load_search_best(path=BEST_PATH):
+    """{modality: best params} from search_best.json (write_search_results)."""
+    with open(path) as f:
+        return {m: entry['params'] for m, entry in json.load(f)['best'].items()}
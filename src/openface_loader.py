@@ -0,0 +1,92 @@
+# src/openface_loader.py
+"""
+Shared loader for the per-participant OpenFace CSV
+({pid}_OpenFace2.1.0_Pose_gaze_AUs.csv).
+
+The basic, enhanced and browser-compatible visual extractors all need the
+same file. This loader reads only the columns they use (confidence,
+success, AU*_r, AU*_c, pose_*, gaze_*) as float32, drops unsuccessful
+and low-confidence frames once, and keeps a small per-pid LRU cache so a
+combined extraction run (src/visual_pipeline.py) parses each file once.
+
+Confidence thresholds are compared in float32 (np.float32(threshold)).
+Values parsed to float32 keep their order, so a frame passes exactly when
+its float64 value would, except for values within float32 rounding of
+the threshold. OpenFace writes confidence with two decimals, so that case
+does not occur.
+"""
+import os
+import logging
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import OPENFACE_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Loosest confidence threshold any extractor uses; stricter ones are masks
+BASE_MIN_CONFIDENCE = 0.80
+
+_cache = OrderedDict()
+cache_stats = {'hits': 0, 'misses': 0}
+
+
+def openface_path(pid, data_root):
+    return os.path.join(data_root, f"{pid}_P", "features",
+                        f"{pid}_OpenFace2.1.0_Pose_gaze_AUs.csv")
+
+
+def _wanted(col):
+    return (col in ('confidence', 'success')
+            or ('AU' in col and ('_r' in col or '_c' in col))
+            or 'pose_' in col or 'gaze_' in col)
+
+
+def _read(path):
+    df = pd.read_csv(path, usecols=_wanted, dtype=np.float32)
+    keep = np.ones(len(df), dtype=bool)
+    if 'confidence' in df.columns:
+        keep &= (df['confidence'] >= np.float32(BASE_MIN_CONFIDENCE)).to_numpy()
+    if 'success' in df.columns:
+        keep &= (df['success'] == 1).to_numpy()
+    return df[keep].reset_index(drop=True)
+
+
+def load_openface(pid, data_root):
+    """
+    Pruned float32 OpenFace frames with success == 1 and confidence >= 0.80,
+    or None if the file does not exist. The returned frame is shared through
+    the cache, so callers must not modify it in place.
+    """
+    path = openface_path(pid, data_root)
+    key = os.path.abspath(path)
+    if key in _cache:
+        _cache.move_to_end(key)
+        cache_stats['hits'] += 1
+        return _cache[key]
+    if not os.path.exists(path):
+        return None
+
+    cache_stats['misses'] += 1
+    df = _read(path)
+    if OPENFACE_CACHE_SIZE > 0:
+        _cache[key] = df
+        while len(_cache) > OPENFACE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return df
+
+
+def select_confident(df, min_confidence):
+    """Frames at or above ``min_confidence`` (>= BASE_MIN_CONFIDENCE)."""
+    if 'confidence' not in df.columns or min_confidence <= BASE_MIN_CONFIDENCE:
+        return df
+    return df[df['confidence'] >= np.float32(min_confidence)]
+
+
+def clear_openface_cache():
+    _cache.clear()
+    cache_stats['hits'] = cache_stats['misses'] = 0
@@ -0,0 +1,190 @@
+# src/profiling.py
+"""
+Per-estimator wall time, CPU time and peak-RSS growth for the main.py
+pipelines (python main.py --profile).
+
+PipelineProfiler wraps fit / fit_transform / fit_resample / transform /
+predict_proba on the *classes* of a pipeline's steps and of its
+VotingClassifier members, for the duration of a ``with`` block. Patching
+the class rather than the instance is what reaches the ensemble members:
+VotingClassifier fits clones of them. The pipeline and its results are
+unchanged. Each call becomes one record labelled with the current fold /
+inner / modality:
+
+  wall_s, cpu_s        time.perf_counter / time.process_time deltas
+  rss_peak_delta_kb    growth of the process's peak RSS during the call
+                       (resource.getrusage; None where unavailable)
+  leaf                 False for calls that contain other recorded calls
+                       (VotingClassifier.fit contains the member fits)
+
+Calls made by an instance from inside its own recorded call (e.g.
+fit_transform → fit) are not recorded again. The mutual-information
+scoring shows up under SelectKBest.fit_transform, SVC's internal Platt CV
+under SVC.fit.
+
+Optionally one (estimator, method) pair is run under cProfile and its
+stats written as a .pstats file.
+"""
+import os
+import sys
+import json
+import time
+import cProfile
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import RESULTS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Optional: peak RSS (not available on Windows)
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+PROFILED_METHODS = ('fit', 'fit_transform', 'fit_resample', 'transform', 'predict_proba')
+PROFILE_PATH = os.path.join(RESULTS_DIR, 'training_profile.json')
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB, or None."""
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS
+
+
+def pipeline_estimator_types(pipe):
+    """Classes of the pipeline steps and of the final VotingClassifier's members."""
+    types = []
+    for _, step in pipe.steps:
+        types.append(type(step))
+        for _, member in getattr(step, 'estimators', []):
+            if member != 'drop':
+                types.append(type(member))
+    return list(dict.fromkeys(types))
+
+
+class PipelineProfiler:
+    """Collects one record per profiled estimator call; see module docstring."""
+
+    def __init__(self, pstats_target=None):
+        self.records = []
+        self.labels = {}
+        self.pstats_target = pstats_target      # (estimator class name, method) or None
+        self.pstats = cProfile.Profile() if pstats_target else None
+        self._active = []                       # ids of instances inside a recorded call
+
+    @contextmanager
+    def labelled(self, **labels):
+        previous, self.labels = self.labels, labels
+        try:
+            yield self
+        finally:
+            self.labels = previous
+
+    @contextmanager
+    def instrument(self, types):
+        """Wrap PROFILED_METHODS of every class in ``types`` until the block exits."""
+        patched = []
+        try:
+            for cls in types:
+                for name in PROFILED_METHODS:
+                    if not hasattr(cls, name):
+                        continue
+                    own = name in cls.__dict__
+                    original = cls.__dict__[name] if own else getattr(cls, name)
+                    setattr(cls, name, self._wrap(cls, name, original))
+                    patched.append((cls, name, own, original))
+            yield self
+        finally:
+            for cls, name, own, original in reversed(patched):
+                if own:
+                    setattr(cls, name, original)
+                else:
+                    delattr(cls, name)
+
+    def _wrap(self, cls, name, original):
+        profiler = self
+        estimator = cls.__name__
+
+        def wrapped(obj, *args, **kwargs):
+            bound = original.__get__(obj, type(obj))
+            if id(obj) in profiler._active:
+                return bound(*args, **kwargs)
+            dump = profiler.pstats is not None and (estimator, name) == profiler.pstats_target
+            profiler._active.append(id(obj))
+            n_before = len(profiler.records)
+            rss0, cpu0, wall0 = peak_rss_kb(), time.process_time(), time.perf_counter()
+            try:
+                if dump:
+                    profiler.pstats.enable()
+                return bound(*args, **kwargs)
+            finally:
+                if dump:
+                    profiler.pstats.disable()
+                wall, cpu, rss1 = time.perf_counter() - wall0, time.process_time() - cpu0, peak_rss_kb()
+                profiler._active.pop()
+                profiler.records.append({
+                    **profiler.labels, 'estimator': estimator, 'method': name,
+                    'wall_s': wall, 'cpu_s': cpu,
+                    'rss_peak_delta_kb': None if rss0 is None else rss1 - rss0,
+                    'depth': len(profiler._active), 'leaf': len(profiler.records) == n_before})
+
+        wrapped.__name__ = name
+        wrapped.__doc__ = getattr(original, '__doc__', None)
+        return wrapped
+
+    def dump_stats(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.pstats.dump_stats(path)
+        return path
+
+
+# ── Reporting ─────────────────────────────────────────────────────
+def summarize(records):
+    """Totals per (modality, estimator, method), slowest first."""
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+    keys = [k for k in ('modality', 'estimator', 'method') if k in df.columns]
+    summary = df.groupby(keys, sort=False).agg(
+        calls=('wall_s', 'size'), wall_s=('wall_s', 'sum'), cpu_s=('cpu_s', 'sum'),
+        max_rss_delta_kb=('rss_peak_delta_kb', 'max'), leaf=('leaf', 'all'))
+    return summary.sort_values('wall_s', ascending=False).reset_index()
+
+
+def slowest_step(records):
+    """(modality, estimator, method) with the most total wall time among leaf calls."""
+    summary = summarize([r for r in records if r['leaf']])
+    if summary.empty:
+        return None
+    top = summary.iloc[0]
+    return top['modality'], top['estimator'], top['method']
+
+
+def write_profile(records, path=PROFILE_PATH, **meta):
+    """Write records and their summary as JSON; returns the path."""
+    summary = summarize(records)
+    payload = {'created': datetime.now().isoformat(timespec='seconds'),
+               'rss_available': HAS_RESOURCE, **meta,
+               'summary': json.loads(summary.to_json(orient='records')),
+               'records': records}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=1, default=str)
+    return path
+
+
+def format_summary(records, top=15):
+    summary = summarize(records).head(top)
+    if summary.empty:
+        return '(no profiled calls)'
+    with pd.option_context('display.width', 140, 'display.float_format', '{:.3f}'.format):
+        return summary.to_string(index=False)
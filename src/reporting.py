@@ -0,0 +1,378 @@
+# src/reporting.py
+"""
+Report stage: renders the evaluation figures from saved CV outputs.
+
+main.py writes its out-of-fold predictions and summary once
+(save_cv_outputs):
+
+  results/oof_predictions.csv   fold, y_true and the text / audio / visual /
+                                fusion probability of every held-out row
+  results/cv_summary.json       per-fold AUCs, mean fusion weights and the
+                                fusion decision threshold
+  results/final_metrics.csv     the metrics table
+
+render_report() rebuilds every figure from those files, so plots can be
+regenerated (or restyled) without retraining:
+
+  - matplotlib / seaborn are imported only when a figure is drawn, so
+    training-only runs (main.py --no-plots) and imports of this module
+    do not pay for them;
+  - figures are drawn in a process pool (one figure per task);
+  - each figure's inputs and the source of its render function and of the
+    shared helpers (HELPERS) are hashed into results/.figure_hashes.json,
+    and a figure whose hash has not changed and whose file exists is
+    skipped. Code outside this module (matplotlib, seaborn, sklearn) is not
+    hashed: after upgrading those, re-render with --force.
+
+Usage:
+  python src/reporting.py [--results-dir results] [--jobs N] [--force]
+"""
+import os
+import sys
+import json
+import time
+import inspect
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import joblib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import RESULTS_DIR
+
+logger = logging.getLogger(__name__)
+
+OOF_FILE = 'oof_predictions.csv'
+SUMMARY_FILE = 'cv_summary.json'
+METRICS_FILE = 'final_metrics.csv'
+HASH_FILE = '.figure_hashes.json'
+MODELS = ('Text', 'Audio', 'Visual', 'Fusion')
+COLORS = ['#4F8EF7', '#9B6FFF', '#10B981', '#EF4444']
+CLASS_LABELS = ['Non-Depressed', 'Depressed']
+DPI = 150
+
+
+def pyplot():
+    """matplotlib.pyplot (Agg backend) and seaborn, imported on first use."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+
+# ── Saved CV outputs ──────────────────────────────────────────────
+def save_cv_outputs(results_dir, folds, y_true, probs, fold_aucs, fusion_weights,
+                    fusion_threshold):
+    """Write the OOF predictions and CV summary the report stage reads."""
+    os.makedirs(results_dir, exist_ok=True)
+    oof = pd.DataFrame({'fold': folds, 'y_true': y_true,
+                        **{m.lower(): probs[m] for m in MODELS}})
+    oof.to_csv(os.path.join(results_dir, OOF_FILE), index=False)
+    summary = {'fold_aucs': {k: [float(a) for a in v] for k, v in fold_aucs.items()},
+               'fusion_weights': {k: float(v) for k, v in fusion_weights.items()},
+               'fusion_threshold': float(fusion_threshold)}
+    with open(os.path.join(results_dir, SUMMARY_FILE), 'w') as f:
+        json.dump(summary, f, indent=1)
+
+
+def load_cv_outputs(results_dir=RESULTS_DIR):
+    oof = pd.read_csv(os.path.join(results_dir, OOF_FILE))
+    with open(os.path.join(results_dir, SUMMARY_FILE)) as f:
+        summary = json.load(f)
+    metrics = pd.read_csv(os.path.join(results_dir, METRICS_FILE))
+    return oof, summary, metrics
+
+
+# ── Figures ───────────────────────────────────────────────────────
+# Each renderer takes its inputs dict and the output path.
+
+def roc_figure(inp, path):
+    from sklearn.metrics import roc_auc_score, roc_curve
+    plt, _ = pyplot()
+    plt.figure(figsize=(10, 8))
+    for name, color in zip(MODELS, COLORS):
+        fpr, tpr, _ = roc_curve(inp['y_true'], inp[name])
+        auc = roc_auc_score(inp['y_true'], inp[name])
+        plt.plot(fpr, tpr, label=f'{name} (AUC = {auc:.3f})', linewidth=2.5, color=color)
+    plt.plot([0, 1], [0, 1], 'k--', alpha=0.5)
+    plt.xlabel('False Positive Rate', fontsize=13)
+    plt.ylabel('True Positive Rate', fontsize=13)
+    plt.title('ROC Curves — SENTIRA Multimodal', fontsize=15, fontweight='bold')
+    plt.legend(loc='lower right', fontsize=12)
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def pr_figure(inp, path):
+    from sklearn.metrics import average_precision_score, precision_recall_curve
+    plt, _ = pyplot()
+    y_true = inp['y_true']
+    plt.figure(figsize=(10, 8))
+    for name, color in zip(MODELS, COLORS):
+        precision, recall, _ = precision_recall_curve(y_true, inp[name])
+        plt.plot(recall, precision, label=f'{name} (AP = {average_precision_score(y_true, inp[name]):.3f})',
+                 linewidth=2.5, color=color)
+    baseline = sum(y_true) / len(y_true)
+    plt.axhline(y=baseline, color='gray', linestyle='--', alpha=0.5, label=f'Baseline ({baseline:.2f})')
+    plt.xlabel('Recall', fontsize=13)
+    plt.ylabel('Precision', fontsize=13)
+    plt.title('Precision-Recall Curves — SENTIRA', fontsize=15, fontweight='bold')
+    plt.legend(fontsize=12)
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def calibration_figure(inp, path):
+    from sklearn.calibration import calibration_curve
+    plt, _ = pyplot()
+    prob_true, prob_pred = calibration_curve(inp['y_true'], inp['Fusion'], n_bins=10, strategy='quantile')
+    plt.figure(figsize=(8, 8))
+    plt.plot(prob_pred, prob_true, marker='o', linewidth=2, color='#4F8EF7')
+    plt.plot([0, 1], [0, 1], 'k--', alpha=0.6)
+    plt.xlabel('Predicted Probability', fontsize=13)
+    plt.ylabel('Observed Fraction Positive', fontsize=13)
+    plt.title('Calibration Curve — Fusion Model', fontsize=15, fontweight='bold')
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def distribution_figure(inp, path):
+    plt, sns = pyplot()
+    y_true, y_probs = np.asarray(inp['y_true']), np.asarray(inp['Fusion'])
+    plt.figure(figsize=(10, 6))
+    sns.histplot(y_probs[y_true == 0], color='#10B981', label='Non-Depressed', kde=True, stat='density', alpha=0.45, bins=20)
+    sns.histplot(y_probs[y_true == 1], color='#EF4444', label='Depressed', kde=True, stat='density', alpha=0.45, bins=20)
+    plt.xlabel('Fusion Probability', fontsize=13)
+    plt.ylabel('Density', fontsize=13)
+    plt.title('Fusion Probability Distribution by Class', fontsize=15, fontweight='bold')
+    plt.legend(fontsize=12)
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def _fusion_confusion(inp):
+    from sklearn.metrics import confusion_matrix
+    cm = confusion_matrix(inp['y_true'], (np.asarray(inp['Fusion']) >= inp['threshold']).astype(int))
+    return cm, cm.astype('float') / cm.sum(axis=1)[:, np.newaxis]
+
+
+def confusion_pair_figure(inp, path):
+    plt, sns = pyplot()
+    cm, cm_norm = _fusion_confusion(inp)
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=CLASS_LABELS,
+                yticklabels=CLASS_LABELS, annot_kws={"size": 18}, ax=axes[0])
+    axes[0].set_xlabel('Predicted', fontsize=12)
+    axes[0].set_ylabel('Actual', fontsize=12)
+    axes[0].set_title(f"Confusion Matrix — Raw (t={inp['threshold']:.2f})", fontsize=14)
+    sns.heatmap(cm_norm, annot=True, fmt='.2f', cmap='Greens', xticklabels=CLASS_LABELS,
+                yticklabels=CLASS_LABELS, annot_kws={"size": 18}, ax=axes[1])
+    axes[1].set_xlabel('Predicted', fontsize=12)
+    axes[1].set_ylabel('Actual', fontsize=12)
+    axes[1].set_title('Confusion Matrix — Normalized', fontsize=14)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def confusion_normalized_figure(inp, path):
+    plt, sns = pyplot()
+    _, cm_norm = _fusion_confusion(inp)
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(cm_norm, annot=True, fmt='.2f', cmap='Greens', xticklabels=CLASS_LABELS,
+                yticklabels=CLASS_LABELS, annot_kws={"size": 18})
+    plt.xlabel('Predicted', fontsize=12)
+    plt.ylabel('Actual', fontsize=12)
+    plt.title('Confusion Matrix — Normalized', fontsize=14)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def modality_weights_figure(inp, path):
+    plt, _ = pyplot()
+    plt.figure(figsize=(10, 6))
+    names_bar = ['Text', 'Audio', 'Visual']
+    aucs_bar = [np.mean(inp['fold_aucs'][n.lower()]) for n in names_bar]
+    bars = plt.bar(names_bar, aucs_bar, color=COLORS[:3], edgecolor='white', linewidth=2, width=0.5)
+    for bar, val, w_val in zip(bars, aucs_bar, [inp['weights'][n.lower()] for n in names_bar]):
+        plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.008,
+                 f'AUC={val:.3f}\nWeight={w_val:.1%}', ha='center', fontweight='bold', fontsize=11)
+    plt.ylabel('Mean AUC-ROC (5-Fold CV)', fontsize=13)
+    plt.title('Modality Contribution & Fusion Weights', fontsize=15, fontweight='bold')
+    plt.ylim(0.45, 0.85)
+    plt.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def accuracy_matrix_figure(inp, path):
+    plt, sns = pyplot()
+    plt.figure(figsize=(10, 6))
+    sns.heatmap(inp['metrics'].set_index('Model')[['Accuracy', 'Balanced_Accuracy', 'F1', 'Precision', 'Recall']],
+                annot=True, cmap='Blues', fmt='.3f', annot_kws={"size": 14})
+    plt.title('Performance Matrix by Modality', fontsize=16, fontweight='bold')
+    plt.ylabel('')
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def metrics_bar_figure(inp, path):
+    plt, sns = pyplot()
+    plt.figure(figsize=(10, 6))
+    df_melted = inp['metrics'].melt(id_vars='Model', value_vars=['Accuracy', 'F1', 'AUC'],
+                                    var_name='Metric', value_name='Score')
+    sns.barplot(data=df_melted, x='Model', y='Score', hue='Metric', palette='viridis')
+    plt.title('Key Performance Metrics Comparison', fontsize=16, fontweight='bold')
+    plt.ylim(0, 1.0)
+    plt.legend(loc='lower right', fontsize=12)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+
+def confusion_counts_figure(inp, path):
+    """Counts + normalized confusion matrix of one model (src/evaluate.evaluate)."""
+    plt, sns = pyplot()
+    cm = np.asarray(inp['cm'])
+    cm_norm = cm.astype('float') / cm.sum(axis=1)[:, np.newaxis]
+    name = inp['name']
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=['Not Dep.', 'Depressed'],
+                yticklabels=['Not Dep.', 'Depressed'], ax=axes[0])
+    axes[0].set_title(f'{name} — Confusion Matrix (Counts)')
+    axes[0].set_ylabel('True Label')
+    axes[0].set_xlabel('Predicted Label')
+    sns.heatmap(cm_norm, annot=True, fmt='.1%', cmap='Blues', xticklabels=['Not Dep.', 'Depressed'],
+                yticklabels=['Not Dep.', 'Depressed'], ax=axes[1])
+    axes[1].set_title(f'{name} — Confusion Matrix (Normalized)')
+    axes[1].set_ylabel('True Label')
+    axes[1].set_xlabel('Predicted Label')
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+RENDERERS = {f.__name__: f for f in (
+    roc_figure, pr_figure, calibration_figure, distribution_figure, confusion_pair_figure,
+    confusion_normalized_figure, modality_weights_figure, accuracy_matrix_figure,
+    metrics_bar_figure, confusion_counts_figure)}
+
+# Module helpers the renderers call; their source is part of every figure hash
+HELPERS = (pyplot, _fusion_confusion)
+
+
+def report_jobs(oof, summary, metrics):
+    """(filename, renderer name, inputs) for every figure of the CV report."""
+    y = oof['y_true'].to_numpy()
+    probs = {m: oof[m.lower()].to_numpy() for m in MODELS}
+    fusion = {'y_true': y, 'Fusion': probs['Fusion']}
+    cm_inputs = {**fusion, 'threshold': summary['fusion_threshold']}
+    return [
+        ('roc_curves_final.png', 'roc_figure', {'y_true': y, **probs}),
+        ('pr_curves_final.png', 'pr_figure', {'y_true': y, **probs}),
+        ('calibration_curve_fusion.png', 'calibration_figure', fusion),
+        ('fusion_probability_distribution.png', 'distribution_figure', fusion),
+        ('confusion_matrix_raw.png', 'confusion_pair_figure', cm_inputs),
+        ('confusion_matrix_normalized.png', 'confusion_normalized_figure', cm_inputs),
+        ('modality_weights.png', 'modality_weights_figure',
+         {'fold_aucs': summary['fold_aucs'], 'weights': summary['fusion_weights']}),
+        ('accuracy_matrix.png', 'accuracy_matrix_figure', {'metrics': metrics}),
+        ('performance_metrics_barchart.png', 'metrics_bar_figure', {'metrics': metrics}),
+    ]
+
+
+# ── Rendering ─────────────────────────────────────────────────────
+def figure_hash(renderer, inputs):
+    """Hash of a figure's inputs and the source of its renderer and the HELPERS."""
+    sources = [inspect.getsource(f) for f in (RENDERERS[renderer],) + HELPERS]
+    return joblib.hash((renderer, sources, inputs, DPI))
+
+
+def _render(renderer, inputs, path):
+    RENDERERS[renderer](inputs, path)
+    return path
+
+
+def _load_hashes(results_dir):
+    try:
+        with open(os.path.join(results_dir, HASH_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_figures(jobs, results_dir=RESULTS_DIR, workers=None, force=False):
+    """
+    Render (filename, renderer, inputs) jobs into ``results_dir``, skipping
+    unchanged figures. ``workers`` > 1 uses a process pool (default: one per
+    figure, up to the CPU count). Returns {'rendered', 'skipped', 'seconds'}.
+    """
+    start = time.perf_counter()
+    os.makedirs(results_dir, exist_ok=True)
+    hashes = _load_hashes(results_dir)
+    todo, skipped = [], []
+    for filename, renderer, inputs in jobs:
+        h = figure_hash(renderer, inputs)
+        path = os.path.join(results_dir, filename)
+        if not force and hashes.get(filename) == h and os.path.exists(path):
+            skipped.append(filename)
+        else:
+            todo.append((filename, renderer, inputs, path, h))
+
+    workers = min(workers or os.cpu_count() or 1, max(len(todo), 1))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_render, *zip(*[(r, i, p) for _, r, i, p, _ in todo])))
+    else:
+        for _, renderer, inputs, path, _ in todo:
+            _render(renderer, inputs, path)
+
+    # Re-read so concurrent callers writing other figures are not overwritten
+    hashes = _load_hashes(results_dir)
+    hashes.update({filename: h for filename, _, _, _, h in todo})
+    tmp = os.path.join(results_dir, f'{HASH_FILE}.{os.getpid()}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(hashes, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(results_dir, HASH_FILE))
+    return {'rendered': [t[0] for t in todo], 'skipped': skipped,
+            'seconds': time.perf_counter() - start}
+
+
+def render_report(results_dir=RESULTS_DIR, workers=None, force=False):
+    """Render the CV report figures from the saved outputs in ``results_dir``."""
+    jobs = report_jobs(*load_cv_outputs(results_dir))
+    stats = render_figures(jobs, results_dir, workers, force)
+    logger.info(f"Report: {len(stats['rendered'])} figures rendered, "
+                f"{len(stats['skipped'])} unchanged, {stats['seconds']:.1f}s")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render report figures from saved CV outputs.')
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Re-render unchanged figures too')
+    args = parser.parse_args(argv)
+    stats = render_report(args.results_dir, args.jobs, args.force)
+    print(f"Rendered {len(stats['rendered'])}, skipped {len(stats['skipped'])} "
+          f"in {stats['seconds']:.1f}s → {args.results_dir}/")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
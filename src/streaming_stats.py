@@ -0,0 +1,438 @@
+# src/streaming_stats.py
+"""
+Single-pass, mergeable accumulators for frame-level descriptors.
+
+The offline extractors (audio_features, audio_features_enhanced, visual_*)
+summarise a full frames × features matrix at once. The accumulators here
+produce the same summaries one chunk (or one frame) at a time, so long CSVs
+can be streamed and live server sessions can update state per frame.
+Every accumulator supports ``merge()`` so partial states built on separate
+chunks or workers can be combined.
+
+  RunningMoments  — count, mean, variance, skew, kurtosis, min, max
+                    (Welford / Pébay parallel update, per column)
+  QuantileSketch  — mergeable compactor sketch for median / IQR / p75 ...
+  DeltaStats      — statistics of frame-to-frame deltas (np.diff or
+                    np.gradient semantics) that stay exact across chunks
+  StreamingAggregator — bundles the three and returns named summaries
+
+Quantile error bounds (QuantileSketch with buffer size k, N values/column):
+  - N <  k: exact, identical to np.percentile.
+  - N >= k: each compaction at level h moves a rank by at most 2^h, and
+    there are at most N / (k·2^h) of them, so the worst-case rank error is
+    N·(log2(N/k) + 1)/k. Compaction offsets are random, so errors cancel
+    and the typical error is about 1.4·N/k ranks.
+    Example: k=512, N=20,000 frames → ≤1.2% worst case, ~0.3% typical.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _as_2d(X):
+    """Frames × features view; a 1-D input is a single frame."""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    return X
+
+
+# ── Moments ───────────────────────────────────────────────────────
+
+class RunningMoments:
+    """
+    Per-column count, mean, central moments (M2–M4), min and max.
+
+    Chunks are reduced with NumPy and folded in with the pairwise update
+    of Pébay (2008), which is exact up to floating-point rounding and
+    independent of how the stream was split. NaNs are skipped per column,
+    matching ``Series.dropna()`` in the offline extractors.
+    """
+
+    def __init__(self):
+        self.n = None
+        self.mean_ = None
+        self.m2 = None
+        self.m3 = None
+        self.m4 = None
+        self.min_ = None
+        self.max_ = None
+
+    @classmethod
+    def from_chunk(cls, X):
+        X = _as_2d(X)
+        valid = ~np.isnan(X)
+        n = valid.sum(axis=0).astype(np.float64)
+        safe_n = np.maximum(n, 1)
+        mean = np.where(valid, X, 0.0).sum(axis=0) / safe_n
+        dev = np.where(valid, X - mean, 0.0)
+        dev2 = dev * dev
+
+        acc = cls()
+        acc.n = n
+        acc.mean_ = mean
+        acc.m2 = dev2.sum(axis=0)
+        acc.m3 = (dev2 * dev).sum(axis=0)
+        acc.m4 = (dev2 * dev2).sum(axis=0)
+        acc.min_ = np.where(n > 0, np.min(np.where(valid, X, np.inf), axis=0), np.nan)
+        acc.max_ = np.where(n > 0, np.max(np.where(valid, X, -np.inf), axis=0), np.nan)
+        return acc
+
+    def update(self, X):
+        """Fold a chunk of frames (or one frame) into the running state."""
+        return self.merge(RunningMoments.from_chunk(X))
+
+    def merge(self, other):
+        """Combine with another accumulator over the same columns (in place)."""
+        if other.n is None:
+            return self
+        if self.n is None:
+            for attr in ('n', 'mean_', 'm2', 'm3', 'm4', 'min_', 'max_'):
+                setattr(self, attr, getattr(other, attr).copy())
+            return self
+
+        na, nb = self.n, other.n
+        n = na + nb
+        safe_n = np.maximum(n, 1)
+        d = other.mean_ - self.mean_
+        d2 = d * d
+
+        mean = self.mean_ + d * nb / safe_n
+        m2 = self.m2 + other.m2 + d2 * na * nb / safe_n
+        m3 = (self.m3 + other.m3
+              + d * d2 * na * nb * (na - nb) / safe_n ** 2
+              + 3.0 * d * (na * other.m2 - nb * self.m2) / safe_n)
+        m4 = (self.m4 + other.m4
+              + d2 * d2 * na * nb * (na * na - na * nb + nb * nb) / safe_n ** 3
+              + 6.0 * d2 * (na * na * other.m2 + nb * nb * self.m2) / safe_n ** 2
+              + 4.0 * d * (na * other.m3 - nb * self.m3) / safe_n)
+
+        self.n = n
+        self.mean_ = mean
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.min_ = np.fmin(self.min_, other.min_)
+        self.max_ = np.fmax(self.max_, other.max_)
+        return self
+
+    def copy(self):
+        other = RunningMoments()
+        return other.merge(self)
+
+    # ── Derived statistics ──
+    @property
+    def count(self):
+        return self.n
+
+    @property
+    def mean(self):
+        return np.where(self.n > 0, self.mean_, np.nan)
+
+    def var(self, ddof=0):
+        """Variance; ddof=0 matches np.var, ddof=1 matches Series.var."""
+        denom = self.n - ddof
+        return np.where(denom > 0, self.m2 / np.maximum(denom, 1), np.nan)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.var(ddof))
+
+    @property
+    def min(self):
+        return self.min_
+
+    @property
+    def max(self):
+        return self.max_
+
+    @property
+    def range(self):
+        return self.max_ - self.min_
+
+    def skew(self):
+        """Biased sample skewness (scipy.stats.skew default)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m2 = self.m2 / self.n
+            out = (self.m3 / self.n) / m2 ** 1.5
+        return np.where(m2 > 0, out, 0.0)
+
+    def kurtosis(self, fisher=True):
+        """Biased sample kurtosis (scipy.stats.kurtosis default)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m2 = self.m2 / self.n
+            out = (self.m4 / self.n) / (m2 * m2)
+        out = np.where(m2 > 0, out, 3.0)
+        return out - 3.0 if fisher else out
+
+
+# ── Quantiles ─────────────────────────────────────────────────────
+
+class QuantileSketch:
+    """
+    Mergeable per-column quantile sketch (fixed-capacity compactors).
+
+    Level h holds rows of weight 2^h. When a level reaches ``k`` rows they
+    are sorted per column and every other row (random offset) is promoted
+    to level h+1, halving storage. Because all columns share the row
+    layout, sorting and compaction are single NumPy calls on the whole
+    buffer. Memory is O(k · log2(N/k)) rows; see the module docstring for
+    the rank-error bounds.
+    """
+
+    def __init__(self, k=512, seed=0):
+        if k < 2 or k % 2:
+            raise ValueError("k must be an even integer >= 2")
+        self.k = k
+        self.levels = []
+        self._rng = np.random.RandomState(seed)
+
+    def update(self, X):
+        X = _as_2d(X)
+        if not self.levels:
+            self.levels.append(X.copy())
+        else:
+            self.levels[0] = np.vstack([self.levels[0], X])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError("Cannot merge sketches with different k")
+        for h, block in enumerate(other.levels):
+            if h < len(self.levels):
+                self.levels[h] = np.vstack([self.levels[h], block])
+            else:
+                self.levels.append(block.copy())
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            buf = self.levels[h]
+            if len(buf) >= self.k:
+                n_full = (len(buf) // self.k) * self.k
+                full, rest = buf[:n_full], buf[n_full:]
+                promoted = []
+                for start in range(0, n_full, self.k):
+                    block = np.sort(full[start:start + self.k], axis=0)
+                    promoted.append(block[self._rng.randint(2)::2])
+                self.levels[h] = rest
+                promoted = np.vstack(promoted)
+                if h + 1 < len(self.levels):
+                    self.levels[h + 1] = np.vstack([self.levels[h + 1], promoted])
+                else:
+                    self.levels.append(promoted)
+            h += 1
+
+    @property
+    def is_exact(self):
+        return len(self.levels) <= 1
+
+    def quantile(self, q):
+        """
+        Per-column quantile(s), q in [0, 1], with NumPy's linear interpolation.
+        Returns shape (n_features,) for scalar q, else (len(q), n_features).
+        """
+        q_arr = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if not self.levels:
+            raise ValueError("QuantileSketch is empty")
+
+        if self.is_exact:
+            out = np.nanquantile(self.levels[0], q_arr, axis=0)
+            return out[0] if np.ndim(q) == 0 else out
+
+        values = np.vstack(self.levels)
+        weights = np.concatenate([np.full(len(block), 2.0 ** h)
+                                  for h, block in enumerate(self.levels)])
+        order = np.argsort(values, axis=0, kind='stable')
+        values = np.take_along_axis(values, order, axis=0)
+        w = np.where(np.isnan(values), 0.0, weights[order])
+        cum = np.cumsum(w, axis=0)
+        total = cum[-1]
+
+        n_items = len(values)
+        out = np.empty((len(q_arr), values.shape[1]))
+        for i, qi in enumerate(q_arr):
+            rank = qi * (total - 1)
+            lo, hi = np.floor(rank), np.ceil(rank)
+            # Item covering 0-based rank r is the first with cum > r
+            idx_lo = np.minimum((cum <= lo).sum(axis=0), n_items - 1)
+            idx_hi = np.minimum((cum <= hi).sum(axis=0), n_items - 1)
+            v_lo = np.take_along_axis(values, idx_lo[None, :], axis=0)[0]
+            v_hi = np.take_along_axis(values, idx_hi[None, :], axis=0)[0]
+            out[i] = v_lo + (rank - lo) * (v_hi - v_lo)
+        return out[0] if np.ndim(q) == 0 else out
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def iqr(self):
+        p25, p75 = self.quantile([0.25, 0.75])
+        return p75 - p25
+
+
+# ── Deltas ────────────────────────────────────────────────────────
+
+class DeltaStats:
+    """
+    Moments of frame-to-frame deltas, exact across chunk boundaries.
+
+    mode='diff'     — x[t] - x[t-1]            (Series.diff().dropna())
+    mode='gradient' — np.gradient(x) semantics: one-sided at the two
+                      ends, central differences inside.
+
+    The first and last two frames are kept so chunks (or worker results)
+    can be stitched in time order with ``merge``; the one-sided edge
+    deltas of ``gradient`` are only added at ``finalize``. Feed NaN-free
+    streams, as the offline code does after ``dropna``.
+    """
+
+    def __init__(self, mode='diff'):
+        if mode not in ('diff', 'gradient'):
+            raise ValueError(f"Unknown delta mode: {mode}")
+        self.mode = mode
+        self.n = 0
+        self.head = None
+        self.tail = None
+        self.delta = RunningMoments()
+        self.abs_delta = RunningMoments()
+
+    def _push(self, d):
+        if len(d):
+            self.delta.update(d)
+            self.abs_delta.update(np.abs(d))
+
+    @classmethod
+    def from_chunk(cls, X, mode='diff'):
+        X = _as_2d(X)
+        acc = cls(mode)
+        acc.n = len(X)
+        if acc.n == 0:
+            return acc
+        acc.head = X[:2].copy()
+        acc.tail = X[-2:].copy()
+        if mode == 'diff':
+            acc._push(X[1:] - X[:-1])
+        else:
+            acc._push((X[2:] - X[:-2]) / 2.0)
+        return acc
+
+    def update(self, X):
+        return self.merge(DeltaStats.from_chunk(X, self.mode))
+
+    def merge(self, other):
+        """Append ``other``, which must directly follow this stream in time."""
+        if other.mode != self.mode:
+            raise ValueError("Cannot merge DeltaStats with different modes")
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n = other.n
+            self.head, self.tail = other.head.copy(), other.tail.copy()
+            self.delta = other.delta.copy()
+            self.abs_delta = other.abs_delta.copy()
+            return self
+
+        a_last, b_first = self.tail[-1:], other.head[:1]
+        if self.mode == 'diff':
+            self._push(b_first - a_last)
+        else:
+            if self.n >= 2:
+                self._push((b_first - self.tail[-2:-1]) / 2.0)
+            if other.n >= 2:
+                self._push((other.head[1:2] - a_last) / 2.0)
+        self.delta.merge(other.delta)
+        self.abs_delta.merge(other.abs_delta)
+
+        self.head = np.vstack([self.head, other.head])[:2]
+        self.tail = np.vstack([self.tail, other.tail])[-2:]
+        self.n += other.n
+        return self
+
+    def finalize(self):
+        """Return (delta_moments, abs_delta_moments) including edge deltas."""
+        delta, abs_delta = self.delta.copy(), self.abs_delta.copy()
+        if self.mode == 'gradient' and self.n >= 2:
+            edges = np.vstack([self.head[1] - self.head[0],
+                               self.tail[-1] - self.tail[-2]])
+            delta.update(edges)
+            abs_delta.update(np.abs(edges))
+        return delta, abs_delta
+
+
+# ── Convenience bundle ────────────────────────────────────────────
+
+class StreamingAggregator:
+    """
+    Moments + quantiles + deltas for a frames × features stream.
+
+    ``summary()`` returns a dict of per-column arrays named after the
+    offline statistics (mean, std, min, max, range, median, iqr, p25, p75,
+    skew, kurt, delta_mean, delta_std, delta_abs_mean).
+    """
+
+    def __init__(self, quantiles=True, delta_mode='diff', k=512, seed=0):
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(k=k, seed=seed) if quantiles else None
+        self.deltas = DeltaStats(delta_mode) if delta_mode else None
+
+    def update(self, X):
+        X = _as_2d(X)
+        if len(X) == 0:
+            return self
+        self.moments.update(X)
+        if self.sketch is not None:
+            self.sketch.update(X)
+        if self.deltas is not None:
+            self.deltas.update(X)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        if self.deltas is not None and other.deltas is not None:
+            self.deltas.merge(other.deltas)
+        return self
+
+    def summary(self, ddof=0):
+        m = self.moments
+        out = {
+            'count': m.count,
+            'mean': m.mean,
+            'std': m.std(ddof),
+            'min': m.min,
+            'max': m.max,
+            'range': m.range,
+            'skew': m.skew(),
+            'kurt': m.kurtosis(fisher=False),
+        }
+        if self.sketch is not None and self.sketch.levels:
+            p25, median, p75 = self.sketch.quantile([0.25, 0.5, 0.75])
+            out.update({'p25': p25, 'median': median, 'p75': p75, 'iqr': p75 - p25})
+        if self.deltas is not None and self.deltas.n > 1:
+            delta, abs_delta = self.deltas.finalize()
+            out.update({
+                'delta_mean': delta.mean,
+                'delta_std': delta.std(ddof),
+                'delta_abs_mean': abs_delta.mean,
+            })
+        return out
+
+
+def summarize_csv(path, chunksize=5000, columns=None, **aggregator_kwargs):
+    """
+    Stream a frame-level CSV in chunks and return (column_names, summary).
+
+    Extra keyword arguments go to StreamingAggregator. Only numeric columns
+    are aggregated; pass ``columns`` to restrict further.
+    """
+    agg = StreamingAggregator(**aggregator_kwargs)
+    names = None
+    with open(path, 'r') as f:
+        header = f.readline()
+    sep = ';' if header.count(';') > header.count(',') else ','
+    for chunk in pd.read_csv(path, sep=sep, chunksize=chunksize, usecols=columns):
+        chunk = chunk.select_dtypes(include=[np.number])
+        if names is None:
+            names = list(chunk.columns)
+        agg.update(chunk[names].to_numpy(dtype=np.float64))
+    return names or [], agg.summary()
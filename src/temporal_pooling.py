@@ -0,0 +1,121 @@
+# src/temporal_pooling.py
+"""
+Shared temporal subsampling / pooling for frame-level visual features.
+
+OpenFace and CNN CSVs hold one row per 30 fps video frame, so long
+sessions reach hundreds of thousands of mostly redundant rows. The
+basic, enhanced and browser-compatible extractors pass their frames
+through pool_frames / pool_dataframe before aggregating:
+
+  1. stride  — keep every Nth frame (VISUAL_FRAME_STRIDE)
+  2. window  — pool N consecutive kept frames into one row by mean or
+               max (VISUAL_POOL_WINDOW, VISUAL_POOL_MODE); a trailing
+               partial window is pooled over the frames it has
+  3. cap     — evenly subsample the result to at most N rows
+               (VISUAL_MAX_FRAMES), so the whole session stays covered
+
+The defaults keep every frame, which leaves features unchanged. OpenFace
+frames are pooled after the confidence/success filter, so the stride
+counts usable frames. CNN CSVs apply the stride while parsing (those
+files have no per-frame filter), which is where most of the time goes.
+
+pooling_settings() temporarily overrides the configuration, e.g. for
+benchmarks/bench_temporal_pooling.py, which reports feature drift and
+extraction time for each setting.
+"""
+import warnings
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import (VISUAL_FRAME_STRIDE, VISUAL_POOL_WINDOW, VISUAL_POOL_MODE,
+                    VISUAL_MAX_FRAMES)
+
+PoolingSettings = namedtuple('PoolingSettings', ['stride', 'window', 'mode', 'max_frames'])
+
+POOL_MODES = ('mean', 'max')
+
+_settings = PoolingSettings(VISUAL_FRAME_STRIDE, VISUAL_POOL_WINDOW, VISUAL_POOL_MODE,
+                            VISUAL_MAX_FRAMES)
+
+
+def _validate(settings):
+    if settings.stride < 1 or settings.window < 1 or settings.max_frames < 0:
+        raise ValueError(f"Invalid temporal pooling settings: {settings}")
+    if settings.mode not in POOL_MODES:
+        raise ValueError(f"Pool mode must be one of {POOL_MODES}, got {settings.mode!r}")
+    return settings
+
+
+def current_settings():
+    return _settings
+
+
+def is_identity(settings=None):
+    """True if pooling keeps every frame unchanged."""
+    s = settings or _settings
+    return s.stride == 1 and s.window == 1 and s.max_frames == 0
+
+
+@contextmanager
+def pooling_settings(**overrides):
+    """Temporarily override stride / window / mode / max_frames."""
+    global _settings
+    previous = _settings
+    _settings = _validate(previous._replace(**overrides))
+    try:
+        yield _settings
+    finally:
+        _settings = previous
+
+
+def _window_pool(X, window, mode):
+    n_full = len(X) // window
+    head = X[:n_full * window].reshape(n_full, window, X.shape[1])
+    reduce = np.nanmean if mode == 'mean' else np.nanmax
+    pooled = [reduce(head, axis=1)] if n_full else []
+    if len(X) > n_full * window:
+        pooled.append(reduce(X[n_full * window:], axis=0, keepdims=True))
+    return np.concatenate(pooled) if pooled else X[:0]
+
+
+def pool_frames(X, settings=None):
+    """Frames × features matrix after stride, window pooling and frame cap."""
+    s = settings or _settings
+    X = np.asarray(X)
+    if X.ndim != 2 or is_identity(s) or len(X) == 0:
+        return X
+    if s.stride > 1:
+        X = X[::s.stride]
+    if s.window > 1:
+        if not np.issubdtype(X.dtype, np.floating):
+            X = X.astype(np.float64)
+        # All-NaN windows pool to NaN, which later dropna-style statistics skip
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            X = _window_pool(X, s.window, s.mode)
+    if s.max_frames and len(X) > s.max_frames:
+        X = X[np.linspace(0, len(X) - 1, s.max_frames).round().astype(int)]
+    return X
+
+
+def pool_dataframe(df, settings=None):
+    """pool_frames for a numeric DataFrame, keeping its columns."""
+    s = settings or _settings
+    if df is None or is_identity(s) or df.empty:
+        return df
+    return pd.DataFrame(pool_frames(df.to_numpy(), s), columns=df.columns)
+
+
+def stride_skiprows(settings=None):
+    """read_csv ``skiprows`` that keeps the header and every stride-th row."""
+    s = settings or _settings
+    if s.stride == 1:
+        return None
+    return lambda i: i > 0 and (i - 1) % s.stride != 0
+
@@ -0,0 +1,93 @@
+# src/thresholds.py
+"""
+Decision-threshold search from one sort of the probabilities.
+
+The rule is ``prob >= t``. After sorting the probabilities in descending
+order, the true and false positives at every cut are cumulative sums of
+the sorted labels, so the confusion matrix at all cut points costs
+O(n log n) in total instead of one metric call per candidate threshold.
+
+  threshold_curve   TP / FP / FN / TN at every distinct probability
+                    (exact; the first cut, t = inf, predicts no
+                    positives, as roc_curve) or at a given grid of
+                    thresholds (grid-restricted).
+  objective_scores  one objective over all cuts, higher is better:
+                    'f1', 'fbeta', 'youden' (sensitivity + specificity
+                    - 1), 'cost' (negated fn_cost·FN + fp_cost·FP) and
+                    'sensitivity' (specificity subject to sensitivity >=
+                    min_sensitivity, -inf where the constraint fails).
+  best_threshold    the best cut. Ties go to the first cut in scan
+                    order: the lowest grid threshold (as the old
+                    ascending loops), or the highest exact threshold (as
+                    argmax over roc_curve).
+
+fusion.find_best_threshold / find_cost_sensitive_threshold and
+main.find_optimal_threshold are thin wrappers around best_threshold.
+"""
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import MIN_CLINICAL_SENSITIVITY
+
+OBJECTIVES = ('f1', 'fbeta', 'youden', 'cost', 'sensitivity')
+
+ThresholdCurve = namedtuple('ThresholdCurve', ['thresholds', 'tp', 'fp', 'fn', 'tn'])
+
+
+def threshold_curve(y_true, y_prob, grid=None):
+    """Confusion counts of ``y_prob >= t`` for every exact cut, or for each t in ``grid``."""
+    y_true = np.asarray(y_true).ravel() == 1
+    y_prob = np.asarray(y_prob, dtype=np.float64).ravel()
+    order = np.argsort(-y_prob, kind='mergesort')
+    probs = y_prob[order]
+    # Positives / negatives among the top k rows, k = 0 … n
+    tps = np.concatenate([[0], np.cumsum(y_true[order])])
+    fps = np.arange(len(probs) + 1) - tps
+
+    if grid is None:
+        # A cut after the last row of every run of equal probabilities
+        last = np.flatnonzero(np.r_[probs[1:] != probs[:-1], True])
+        thresholds = np.r_[np.inf, probs[last]]
+        n_pred = np.r_[0, last + 1]
+    else:
+        thresholds = np.asarray(grid, dtype=np.float64)
+        n_pred = len(probs) - np.searchsorted(probs[::-1], thresholds, side='left')
+    tp, fp = tps[n_pred], fps[n_pred]
+    return ThresholdCurve(thresholds, tp, fp, tps[-1] - tp, fps[-1] - fp)
+
+
+def _ratio(num, den):
+    """num / den, 0 where den is 0 (sklearn's zero_division=0)."""
+    num = np.asarray(num, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=np.asarray(den) > 0)
+
+
+def objective_scores(curve, objective='f1', beta=2.0, fn_cost=5, fp_cost=1,
+                     min_sensitivity=MIN_CLINICAL_SENSITIVITY):
+    """Score of ``objective`` at every cut of ``curve`` (higher is better)."""
+    tp, fp, fn, tn = curve.tp, curve.fp, curve.fn, curve.tn
+    if objective == 'f1':
+        return _ratio(2 * tp, 2 * tp + fp + fn)
+    if objective == 'fbeta':
+        b2 = beta ** 2
+        return _ratio((1 + b2) * tp, (1 + b2) * tp + b2 * fn + fp)
+    sensitivity, specificity = _ratio(tp, tp + fn), _ratio(tn, tn + fp)
+    if objective == 'youden':
+        return sensitivity - _ratio(fp, fp + tn)
+    if objective == 'cost':
+        return -(fn_cost * fn + fp_cost * fp).astype(np.float64)
+    if objective == 'sensitivity':
+        return np.where(sensitivity >= min_sensitivity, specificity, -np.inf)
+    raise ValueError(f"Unknown threshold objective {objective!r}; expected one of {OBJECTIVES}")
+
+
+def best_threshold(y_true, y_prob, objective='f1', grid=None, **kwargs):
+    """(threshold, score) of the best cut; kwargs go to objective_scores."""
+    curve = threshold_curve(y_true, y_prob, grid)
+    scores = objective_scores(curve, objective, **kwargs)
+    best = int(np.argmax(scores))
+    return curve.thresholds[best], float(scores[best])
@@ -22,6 +22,7 @@ import pandas as pd
 import numpy as np
 import os
 import logging
+import warnings
 import joblib
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
@@ -30,6 +31,9 @@ from sklearn.metrics import roc_auc_score
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from config import DATA_ROOT, FEATURES_DIR, MODELS_DIR, RANDOM_STATE
+from src.streaming_stats import RunningMoments
+from src.openface_loader import load_openface
+from src.temporal_pooling import pool_dataframe
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +107,218 @@ def au_to_expressions(au_dict):
     return expressions
 
 
+# Expression order of the feature table (dict order of au_to_expressions)
+EXPRESSIONS = ['happy', 'sad', 'angry', 'surprised', 'fearful', 'disgusted', 'neutral']
+
+# Feature order produced by expression_features / ExpressionSession.features
+BROWSER_FEATURE_COLUMNS = (
+    [f'expr_{e}_{stat}' for e in EXPRESSIONS for stat in ('mean', 'std', 'max', 'trend')]
+    + ['flat_affect', 'sad_happy_ratio', 'neg_pos_expr_ratio', 'smile_frequency',
+       'expression_transition_rate']
+)
+
+# AUs averaged into each raw expression score (same as au_to_expressions)
+EXPRESSION_AUS = {
+    'happy': ['AU06_r', 'AU12_r'],
+    'sad': ['AU01_r', 'AU04_r', 'AU15_r'],
+    'angry': ['AU04_r', 'AU05_r', 'AU07_r', 'AU23_r'],
+    'surprised': ['AU01_r', 'AU02_r', 'AU05_r', 'AU26_r'],
+    'fearful': ['AU01_r', 'AU02_r', 'AU04_r', 'AU20_r'],
+    'disgusted': ['AU09_r', 'AU15_r', 'AU17_r'],
+}
+
+
+def au_matrix_to_expressions(au_values, au_cols):
+    """
+    Array version of au_to_expressions for a whole (frames, AUs) matrix.
+
+    AUs not in ``au_cols`` count as 0, as in the scalar version. Returns a
+    (frames, 7) float64 matrix with columns in EXPRESSIONS order.
+    """
+    au_values = np.asarray(au_values, dtype=np.float64)
+    n = au_values.shape[0]
+    used = [c for c in au_cols if any(c in aus for aus in EXPRESSION_AUS.values())]
+    X = au_values[:, [list(au_cols).index(c) for c in used]]
+
+    # FACS mapping as a (used AUs, 6) averaging matrix
+    W = np.zeros((len(used), 6))
+    for j, expr_name in enumerate(EXPRESSIONS[:6]):
+        aus = EXPRESSION_AUS[expr_name]
+        for i, au in enumerate(used):
+            if au in aus:
+                W[i, j] = 1.0 / len(aus)
+
+    has_nan = np.isnan(X).any()
+    if has_nan:
+        # 0 * NaN would leak a missing AU into every expression
+        raw = np.stack([np.sum(X[:, W[:, j] > 0], axis=1) for j in range(6)], axis=1)
+        raw /= np.array([len(EXPRESSION_AUS[e]) for e in EXPRESSIONS[:6]])
+    else:
+        raw = X @ W
+
+    expr = np.empty((n, 7))
+    expr[:, :6] = 1.0 / (1.0 + np.exp(-2.0 * (raw - 1.5)))
+
+    if has_nan:
+        # Python's max() keeps a leading NaN and skips later ones
+        nan_rows = np.isnan(expr[:, :6]).any(axis=1)
+        max_expr = np.where(np.isnan(expr[:, 0]), np.nan,
+                            np.max(np.where(np.isnan(expr[:, :6]), -np.inf, expr[:, :6]), axis=1))
+    else:
+        nan_rows = np.zeros(n, dtype=bool)
+        max_expr = expr[:, :6].max(axis=1)
+    expr[:, 6] = 1.0 - max_expr
+
+    total = expr.sum(axis=1, keepdims=True)
+    if has_nan:
+        normalize = ~nan_rows & (total[:, 0] > 0)
+        expr[normalize] /= total[normalize]
+    else:
+        expr /= total  # neutral = 1 - max, so total >= 1
+    return expr
+
+
+def expression_features(expr):
+    """
+    The 33 browser-model features from a (frames, 7) expression matrix
+    (columns in EXPRESSIONS order): mean/std/max/trend per expression plus
+    the depression-specific derived features.
+    """
+    expr = np.asarray(expr, dtype=np.float64)
+    n = len(expr)
+    features = {}
+    col = {e: expr[:, i] for i, e in enumerate(EXPRESSIONS)}
+
+    # ── Per-expression temporal statistics ──
+    means = np.mean(expr, axis=0)
+    stds = np.std(expr, axis=0)
+    maxes = np.max(expr, axis=0)
+    trends = np.zeros(7)
+    if n > 3:
+        # Closed-form least-squares slope against the frame index
+        t = np.arange(n) - (n - 1) / 2.0
+        trends = (t @ (expr - means)) / (t @ t)
+    for i, expr_name in enumerate(EXPRESSIONS):
+        features[f'expr_{expr_name}_mean'] = float(means[i])
+        features[f'expr_{expr_name}_std'] = float(stds[i])
+        features[f'expr_{expr_name}_max'] = float(maxes[i])
+        if n > 3:
+            features[f'expr_{expr_name}_trend'] = float(trends[i])
+
+    # ── Depression-specific derived features ──
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        # Flat affect: low variance across all expressions (monotone face)
+        expr_vars = [np.nanvar(col[e], ddof=1) for e in ['happy', 'sad', 'neutral']]
+        features['flat_affect'] = 1.0 - float(np.mean(expr_vars))
+
+        # Sad-to-happy ratio (elevated in depression)
+        features['sad_happy_ratio'] = np.nanmean(col['sad']) / max(np.nanmean(col['happy']), 0.01)
+
+        # Negative expression dominance
+        neg_mean = np.nanmean(np.nanmean(expr[:, [1, 2, 4, 5]], axis=1))
+        pos_mean = np.nanmean(np.nanmean(expr[:, [0, 3]], axis=1))
+        features['neg_pos_expr_ratio'] = neg_mean / max(pos_mean, 0.01)
+
+    # Smile frequency (how often happy > 0.3)
+    features['smile_frequency'] = float((col['happy'] > 0.3).mean())
+
+    # Expression transition rate (how often dominant expression changes);
+    # the first frame counts as a transition, as with a shifted comparison
+    if n > 1:
+        has_nan = np.isnan(expr).any()
+        dominant = np.argmax(np.where(np.isnan(expr), -np.inf, expr) if has_nan else expr, axis=1)
+        transitions = 1 + np.count_nonzero(dominant[1:] != dominant[:-1])
+        features['expression_transition_rate'] = transitions / n
+
+    return features
+
+
+# ── Streaming session (face-api.js frames at inference) ───────────
+
+class ExpressionSession:
+    """
+    Incremental version of expression_features for frames streamed from the
+    browser in batches.
+
+    Keeps O(1) state per expression (running moments, an online
+    least-squares trend against the frame index and a dominant-expression
+    transition counter), so memory is bounded no matter how long the
+    session runs. Each update costs O(batch).
+    """
+
+    def __init__(self):
+        self.moments = RunningMoments()
+        self.n = 0
+        self._t_mean = 0.0
+        self._t_m2 = 0.0
+        self._tx_cov = np.zeros(7)
+        self._last_dominant = None
+        self.transitions = 0
+        self.smiles = 0
+
+    def update(self, frames):
+        """Add a (batch, 7) matrix of expression probabilities in EXPRESSIONS order."""
+        X = np.asarray(frames, dtype=np.float64).reshape(-1, 7)
+        b = len(X)
+        if b == 0:
+            return self
+
+        # Online LS trend: merge batch (t, x) co-moments into the totals
+        t = np.arange(self.n, self.n + b, dtype=np.float64)
+        t_mean_b = t.mean()
+        x_mean_a = self.moments.mean if self.n else np.zeros(7)
+        x_mean_b = X.mean(axis=0)
+        tc = t - t_mean_b
+        n_total = self.n + b
+        dt, dx = t_mean_b - self._t_mean, x_mean_b - x_mean_a
+        self._tx_cov += tc @ (X - x_mean_b) + dt * dx * self.n * b / n_total
+        self._t_m2 += tc @ tc + dt * dt * self.n * b / n_total
+        self._t_mean += dt * b / n_total
+        self.moments.update(X)
+        self.n = n_total
+
+        dominant = np.argmax(X, axis=1)
+        first_changes = self._last_dominant is None or dominant[0] != self._last_dominant
+        self.transitions += int(first_changes) + np.count_nonzero(dominant[1:] != dominant[:-1])
+        self._last_dominant = dominant[-1]
+        self.smiles += np.count_nonzero(X[:, 0] > 0.3)
+        return self
+
+    def features(self):
+        """Same features as expression_features over every frame seen so far."""
+        n = self.n
+        if n == 0:
+            return {}
+        means, stds, maxes = self.moments.mean, self.moments.std(), self.moments.max
+        trends = self._tx_cov / self._t_m2 if self._t_m2 > 0 else np.zeros(7)
+        features = {}
+        for i, expr_name in enumerate(EXPRESSIONS):
+            features[f'expr_{expr_name}_mean'] = float(means[i])
+            features[f'expr_{expr_name}_std'] = float(stds[i])
+            features[f'expr_{expr_name}_max'] = float(maxes[i])
+            if n > 3:
+                features[f'expr_{expr_name}_trend'] = float(trends[i])
+
+        var1 = self.moments.var(ddof=1) if n > 1 else np.full(7, np.nan)
+        features['flat_affect'] = 1.0 - float(np.mean(var1[[0, 1, 6]]))
+        features['sad_happy_ratio'] = means[1] / max(means[0], 0.01)
+        features['neg_pos_expr_ratio'] = means[[1, 2, 4, 5]].mean() / max(means[[0, 3]].mean(), 0.01)
+        features['smile_frequency'] = self.smiles / n
+        if n > 1:
+            features['expression_transition_rate'] = self.transitions / n
+        return features
+
+
+def fit_feature_width(X, expected):
+    """Pad with zeros / trim columns so X has the width the scaler was fit on."""
+    if X.shape[1] < expected:
+        X = np.pad(X, ((0, 0), (0, expected - X.shape[1])))
+    elif X.shape[1] > expected:
+        X = X[:, :expected]
+    return X
+
+
 def extract_browser_visual_features(pid, data_root):
     """
     Extract expression-based features that match face-api.js output.
@@ -112,20 +328,11 @@ def extract_browser_visual_features(pid, data_root):
     Plus depression-specific derived features = ~6 features
     Total: ~34 features
     """
-    path = os.path.join(data_root, f"{pid}_P", "features",
-                        f"{pid}_OpenFace2.1.0_Pose_gaze_AUs.csv")
-
-    if not os.path.exists(path):
-        return None
-
     try:
-        df = pd.read_csv(path)
-
-        # Quality filter
-        if 'confidence' in df.columns:
-            df = df[df['confidence'] >= 0.80]
-        if 'success' in df.columns:
-            df = df[df['success'] == 1]
+        # Quality filter (confidence >= 0.80, success == 1) is applied by the loader
+        df = pool_dataframe(load_openface(pid, data_root))
+        if df is None:
+            return None
 
         if df.empty or len(df) < 5:
             return None
@@ -135,70 +342,39 @@ def extract_browser_visual_features(pid, data_root):
         if not au_cols:
             return None
 
-        # Convert each frame's AUs to expression probabilities
-        expressions_over_time = []
-        for _, row in df.iterrows():
-            au_dict = {col: row.get(col, 0) for col in au_cols}
-            expr = au_to_expressions(au_dict)
-            expressions_over_time.append(expr)
-
-        expr_df = pd.DataFrame(expressions_over_time)
-        features = {}
-
-        # ── Per-expression temporal statistics ──
-        for expr_name in ['happy', 'sad', 'angry', 'surprised', 'fearful', 'disgusted', 'neutral']:
-            if expr_name not in expr_df.columns:
-                continue
-            vals = expr_df[expr_name].values
+        # Map all frames' AUs to expression probabilities at once
+        expr = au_matrix_to_expressions(df[au_cols].to_numpy(dtype=np.float64), au_cols)
+        features = expression_features(expr)
 
-            features[f'expr_{expr_name}_mean'] = float(np.mean(vals))
-            features[f'expr_{expr_name}_std'] = float(np.std(vals))
-            features[f'expr_{expr_name}_max'] = float(np.max(vals))
+        return features
 
-            # Trend (linear fit slope)
-            if len(vals) > 3:
-                try:
-                    t = np.arange(len(vals))
-                    features[f'expr_{expr_name}_trend'] = float(np.polyfit(t, vals, 1)[0])
-                except (np.linalg.LinAlgError, ValueError):
-                    features[f'expr_{expr_name}_trend'] = 0.0
+    except Exception as e:
+        logger.warning(f"Error extracting browser visual features for {pid}: {e}")
+        return None
 
-        # ── Depression-specific derived features ──
 
-        # Flat affect: low variance across all expressions (monotone face)
-        expr_vars = [expr_df[e].var() for e in ['happy', 'sad', 'neutral']
-                     if e in expr_df.columns]
-        features['flat_affect'] = 1.0 - float(np.mean(expr_vars)) if expr_vars else 0.0
+def finalize_browser_visual_features(records, missing=0):
+    """Drop constant columns and save the browser feature table."""
+    if missing:
+        logger.info(f"  Missing browser visual features: {missing} participants")
 
-        # Sad-to-happy ratio (elevated in depression)
-        if 'sad' in expr_df.columns and 'happy' in expr_df.columns:
-            happy_mean = expr_df['happy'].mean()
-            sad_mean = expr_df['sad'].mean()
-            features['sad_happy_ratio'] = sad_mean / max(happy_mean, 0.01)
+    df = pd.DataFrame(records).fillna(0)
 
-        # Negative expression dominance
-        neg_cols = [c for c in ['sad', 'angry', 'fearful', 'disgusted'] if c in expr_df.columns]
-        pos_cols = [c for c in ['happy', 'surprised'] if c in expr_df.columns]
-        if neg_cols and pos_cols:
-            neg_mean = expr_df[neg_cols].mean(axis=1).mean()
-            pos_mean = expr_df[pos_cols].mean(axis=1).mean()
-            features['neg_pos_expr_ratio'] = neg_mean / max(pos_mean, 0.01)
-
-        # Smile frequency (how often happy > 0.3)
-        if 'happy' in expr_df.columns:
-            features['smile_frequency'] = float((expr_df['happy'] > 0.3).mean())
-
-        # Expression transition rate (how often dominant expression changes)
-        if len(expr_df) > 1:
-            dominant = expr_df.idxmax(axis=1)
-            transitions = (dominant != dominant.shift()).sum()
-            features['expression_transition_rate'] = transitions / len(expr_df)
+    # Remove constant features
+    feat_cols = [c for c in df.columns if c != 'pid']
+    constant = [c for c in feat_cols if df[c].nunique() <= 1]
+    if constant:
+        logger.info(f"  Removing {len(constant)} constant features")
+        df = df.drop(columns=constant)
 
-        return features
+    # Replace infinities
+    df = df.replace([np.inf, -np.inf], 0)
 
-    except Exception as e:
-        logger.warning(f"Error extracting browser visual features for {pid}: {e}")
-        return None
+    os.makedirs(FEATURES_DIR, exist_ok=True)
+    df.to_csv(SAVE_PATH, index=False)
+    logger.info(f"  ✅ Browser visual features saved → {SAVE_PATH}")
+    logger.info(f"  Shape: {df.shape}")
+    return df
 
 
 def build_browser_visual_features(participant_ids):
@@ -220,32 +396,15 @@ def build_browser_visual_features(participant_ids):
         else:
             missing += 1
 
-    if missing:
-        logger.info(f"  Missing browser visual features: {missing} participants")
-
-    df = pd.DataFrame(records).fillna(0)
-
-    # Remove constant features
-    feat_cols = [c for c in df.columns if c != 'pid']
-    constant = [c for c in feat_cols if df[c].nunique() <= 1]
-    if constant:
-        logger.info(f"  Removing {len(constant)} constant features")
-        df = df.drop(columns=constant)
-
-    # Replace infinities
-    df = df.replace([np.inf, -np.inf], 0)
-
-    os.makedirs(FEATURES_DIR, exist_ok=True)
-    df.to_csv(SAVE_PATH, index=False)
-    logger.info(f"  ✅ Browser visual features saved → {SAVE_PATH}")
-    logger.info(f"  Shape: {df.shape}")
-    return df
+    return finalize_browser_visual_features(records, missing)
 
 
-def train_browser_visual_model(X, y, save=True):
+def train_browser_visual_model(X, y, save=True, feature_names=None):
     """
     Train a lightweight visual model on expression features.
     This model can be loaded in app.py and used with face-api.js data.
+    ``feature_names`` (the column order of X) is saved alongside so the app
+    can build vectors from streamed sessions in the same order.
     """
     from imblearn.over_sampling import SMOTE
 
@@ -272,6 +431,8 @@ def train_browser_visual_model(X, y, save=True):
         os.makedirs(MODELS_DIR, exist_ok=True)
         joblib.dump(model, os.path.join(MODELS_DIR, 'visual_browser_model.pkl'))
         joblib.dump(scaler, os.path.join(MODELS_DIR, 'visual_browser_scaler.pkl'))
+        if feature_names is not None:
+            joblib.dump(list(feature_names), os.path.join(MODELS_DIR, 'visual_browser_columns.pkl'))
         logger.info(f"  ✅ Browser visual model saved → {MODELS_DIR}/visual_browser_model.pkl")
 
     return model, scaler
@@ -287,4 +448,4 @@ if __name__ == "__main__":
     merged = df.merge(labels[['pid', 'label']], on='pid')
     X = merged[feat_cols].values
     y = merged['label'].values
-    train_browser_visual_model(X, y)
+    train_browser_visual_model(X, y, feature_names=feat_cols)
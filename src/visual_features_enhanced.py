@@ -7,22 +7,107 @@ import pandas as pd
 import numpy as np
 import os
 import logging
-from sklearn.decomposition import PCA
+from sklearn.decomposition import IncrementalPCA
 from sklearn.preprocessing import StandardScaler
 
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from config import DATA_ROOT, FEATURES_DIR
+from config import (DATA_ROOT, FEATURES_DIR,
+                    CNN_PCA_COMPONENTS, CNN_PCA_CHUNK_FRAMES)
+from src.openface_loader import load_openface, select_confident
+from src.temporal_pooling import (current_settings, pool_dataframe, pool_frames,
+                                  stride_skiprows)
 
 logger = logging.getLogger(__name__)
 
 SAVE_PATH = os.path.join(FEATURES_DIR, "visual_features_enhanced.csv")
 
 
+# Per-dimension statistics, in column order of the aggregated vector
+TEMPORAL_STATS = ('mean', 'std', 'min', 'max', 'median', 'diff_mean', 'diff_std')
+
+# Elements per temporary block when reducing a frames × dims matrix
+_BLOCK_ELEMENTS = 1 << 22
+
+
+def temporal_feature_names(columns, prefix=''):
+    """Shared column index for aggregate_temporal_matrix output."""
+    head = f'{prefix}_' if prefix else ''
+    return [f'{head}{col}_{stat}' for col in columns for stat in TEMPORAL_STATS]
+
+
+def _aggregate_column(vals):
+    """Reference statistics for one column after dropna (NaN columns only)."""
+    out = np.full(len(TEMPORAL_STATS), np.nan)
+    vals = vals[~np.isnan(vals)].astype(np.float64)
+    if len(vals) == 0:
+        return out
+    out[:5] = [vals.mean(), vals.std(ddof=1) if len(vals) > 1 else 0,
+               vals.min(), vals.max(), np.median(vals)]
+    if len(vals) > 1:
+        diffs = np.diff(vals)
+        out[5] = diffs.mean()
+        out[6] = diffs.std(ddof=1) if len(diffs) > 1 else 0
+    return out
+
+
+def aggregate_temporal_matrix(X):
+    """
+    Temporal statistics of every column of a frames × dims matrix at once.
+
+    Returns one contiguous float32 vector laid out as
+    [dim0 mean, std, min, max, median, diff_mean, diff_std, dim1 mean, ...]
+    (see temporal_feature_names). Statistics match Series.dropna() per
+    column. Sums are accumulated in float64 over row blocks, so temporaries
+    stay bounded for wide CNN matrices. Columns with no values are NaN.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n, d = X.shape
+    out = np.full((d, len(TEMPORAL_STATS)), np.nan)
+    if n == 0 or d == 0:
+        return out.astype(np.float32).ravel()
+
+    nan_cols = np.isnan(X).any(axis=0)
+    clean = np.flatnonzero(~nan_cols)
+    if len(clean):
+        Xc = X if len(clean) == d else X[:, clean]
+        block = max(2, _BLOCK_ELEMENTS // max(len(clean), 1))
+
+        mean = Xc.sum(axis=0, dtype=np.float64) / n
+        # Telescoping sum: mean of x[t] - x[t-1] is (x[-1] - x[0]) / (n - 1)
+        diff_mean = (Xc[-1].astype(np.float64) - Xc[0]) / (n - 1) if n > 1 else np.nan
+        ss = np.zeros(len(clean))
+        diff_ss = np.zeros(len(clean))
+        for start in range(0, n, block):
+            chunk = Xc[start:start + block].astype(np.float64)
+            ss += ((chunk - mean) ** 2).sum(axis=0)
+            if n > 1:
+                # Overlap one row so deltas across block edges are included
+                prev = Xc[max(start - 1, 0):start + block].astype(np.float64)
+                diff_ss += ((np.diff(prev, axis=0) - diff_mean) ** 2).sum(axis=0)
+
+        out[clean, 0] = mean
+        out[clean, 1] = np.sqrt(ss / (n - 1)) if n > 1 else 0.0
+        out[clean, 2] = Xc.min(axis=0)
+        out[clean, 3] = Xc.max(axis=0)
+        out[clean, 4] = np.median(Xc, axis=0)
+        if n > 1:
+            out[clean, 5] = diff_mean
+            out[clean, 6] = np.sqrt(diff_ss / (n - 2)) if n > 2 else 0.0
+
+    for j in np.flatnonzero(nan_cols):
+        out[j] = _aggregate_column(X[:, j])
+
+    return out.astype(np.float32).ravel()
+
+
 def aggregate_temporal_features(df, feature_prefix, aggregate_cols=True):
     """
     Aggregate frame-level CNN features using multiple strategies.
     Returns statistical summaries that capture temporal patterns.
+
+    Dict view of aggregate_temporal_matrix, kept for callers that want
+    named features; columns without values are omitted.
     """
     # Get feature columns (exclude name, timeStamp)
     feature_cols = [c for c in df.columns if c not in ['name', 'timeStamp']]
@@ -35,35 +120,13 @@ def aggregate_temporal_features(df, feature_prefix, aggregate_cols=True):
     if features.empty:
         return None
 
-    record = {}
-
-    # For each feature dimension, compute temporal statistics
-    for col in features.columns:
-        vals = features[col].dropna()
-        if len(vals) == 0:
-            continue
-
-        # Basic statistics
-        record[f'{col}_mean'] = vals.mean()
-        record[f'{col}_std'] = vals.std() if len(vals) > 1 else 0
-        record[f'{col}_min'] = vals.min()
-        record[f'{col}_max'] = vals.max()
-        record[f'{col}_median'] = vals.median()
+    vec = aggregate_temporal_matrix(features.to_numpy(dtype=np.float32))
+    names = temporal_feature_names(features.columns)
+    return {k: float(v) for k, v in zip(names, vec) if not np.isnan(v)}
 
-        # Temporal dynamics (rate of change)
-        if len(vals) > 1:
-            diffs = vals.diff().dropna()
-            record[f'{col}_diff_mean'] = diffs.mean()
-            record[f'{col}_diff_std'] = diffs.std() if len(diffs) > 1 else 0
 
-    return record
-
-
-def extract_cnn_features(pid, data_root):
-    """
-    Extract CNN features from multiple architectures.
-    Uses ResNet, VGG16, and DenseNet201 features.
-    """
+def cnn_feature_files(pid, data_root):
+    """Network name → CNN feature CSV path for one participant."""
     feat_dir = os.path.join(data_root, f"{pid}_P", "features")
 
     cnn_files = {
@@ -72,55 +135,275 @@ def extract_cnn_features(pid, data_root):
         'vgg': f"{pid}_CNN_VGG.mat.csv" if os.path.exists(os.path.join(feat_dir, f"{pid}_CNN_VGG.mat.csv")) else f"{pid}_CNN_ResNet.mat.csv",
         'resnet': f"{pid}_CNN_ResNet.mat.csv",
     }
+    return {name: os.path.join(feat_dir, f) for name, f in cnn_files.items()}
+
+
+def _cnn_columns(path):
+    """Numeric feature columns of a CNN CSV, from its first rows."""
+    head = pd.read_csv(path, nrows=5)
+    head = head[[c for c in head.columns if c not in ['name', 'timeStamp']]]
+    return list(head.select_dtypes(include=[np.number]).columns)
 
-    all_features = {}
 
-    for cnn_name, filename in cnn_files.items():
-        path = os.path.join(feat_dir, filename)
-        if not os.path.exists(path):
+def _read_cnn_matrix(path, columns):
+    """
+    Frames × dims float32 matrix of ``columns`` (parsed straight to float32),
+    keeping every VISUAL_FRAME_STRIDE-th frame.
+    """
+    return pd.read_csv(path, usecols=columns, dtype=np.float32,
+                       skiprows=stride_skiprows())[columns].to_numpy()
+
+
+def _pool_strided(X):
+    """Window pooling / frame cap for frames already strided at parse time."""
+    return pool_frames(X, current_settings()._replace(stride=1))
+
+
+def cnn_feature_layout(participant_ids, data_root):
+    """
+    Shared column index for the cohort CNN matrix, computed once from the
+    CSV headers. Returns (blocks, names) where blocks maps network name →
+    (columns, offset) and names are the '{net}_{col}_{stat}' feature names.
+    Columns are the first-seen union across participants, in file order.
+    """
+    net_cols = {}
+    for pid in participant_ids:
+        for cnn_name, path in cnn_feature_files(pid, data_root).items():
+            if not os.path.exists(path):
+                continue
+            try:
+                cols = net_cols.setdefault(cnn_name, {})
+                for c in _cnn_columns(path):
+                    cols.setdefault(c, None)
+            except Exception as e:
+                logger.debug(f"Error reading {cnn_name} header for {pid}: {e}")
+
+    blocks, names = {}, []
+    for cnn_name, cols in net_cols.items():
+        if not cols:
             continue
+        blocks[cnn_name] = (list(cols), len(names))
+        names.extend(temporal_feature_names(cols, cnn_name))
+    return blocks, names
+
+
+def _iter_cnn_chunks(path, columns, chunk_frames):
+    """
+    Float32 frame chunks of ``columns`` (file columns outside the list are
+    dropped, absent ones are 0), at most ``chunk_frames`` rows each, keeping
+    every VISUAL_FRAME_STRIDE-th frame.
+    """
+    wanted = set(columns)
+    reader = pd.read_csv(path, usecols=lambda c: c in wanted, dtype=np.float32,
+                         chunksize=chunk_frames, skiprows=stride_skiprows())
+    for chunk in reader:
+        X = chunk.reindex(columns=columns, fill_value=0).to_numpy(dtype=np.float32)
+        yield np.nan_to_num(X, copy=False)
 
-        try:
-            # Handle both .csv and .mat.csv files
-            if filename.endswith('.mat.csv'):
-                df = pd.read_csv(path)
-            else:
-                df = pd.read_csv(path)
 
-            if df.empty:
+# ── Optional IncrementalPCA front-end ─────────────────────────
+
+def fit_cnn_projection(participant_ids, data_root, n_components=CNN_PCA_COMPONENTS,
+                       chunk_frames=CNN_PCA_CHUNK_FRAMES):
+    """
+    Fit one IncrementalPCA per network by streaming frames of the training
+    participants in chunks of ``chunk_frames``, so memory is bounded by the
+    chunk rather than the cohort. Returns the projection dict
+    {'n_components', 'networks': {net: {'columns', 'ipca'}}}; it is refit
+    with the feature table rather than saved, since nothing scores CNN
+    frames outside this extraction path.
+
+    Each full batch is held back until the next one fills, so a trailing
+    remainder of fewer than k rows (too small for partial_fit on its own)
+    is fitted together with the last batch instead of being dropped.
+    """
+    blocks, _ = cnn_feature_layout(participant_ids, data_root)
+    networks = {}
+    for cnn_name, (cols, _) in blocks.items():
+        k = min(n_components, len(cols))
+        ipca = IncrementalPCA(n_components=k)
+        pending, n_pending, n_frames = [], 0, 0
+        held = None
+        for pid in participant_ids:
+            path = cnn_feature_files(pid, data_root)[cnn_name]
+            if not os.path.exists(path):
                 continue
+            try:
+                for X in _iter_cnn_chunks(path, cols, chunk_frames):
+                    pending.append(X)
+                    n_pending += len(X)
+                    # partial_fit needs at least k rows per batch
+                    if n_pending >= max(chunk_frames, k):
+                        if held is not None:
+                            ipca.partial_fit(held)
+                            n_frames += len(held)
+                        held = np.vstack(pending)
+                        pending, n_pending = [], 0
+            except Exception as e:
+                logger.debug(f"Error streaming {cnn_name} for {pid}: {e}")
+        if held is not None:
+            pending.insert(0, held)
+            n_pending += len(held)
+        if n_pending >= k:
+            ipca.partial_fit(np.vstack(pending))
+            n_frames += n_pending
+        if n_frames == 0:
+            logger.warning(f"  {cnn_name}: fewer than {k} frames, no projection fitted")
+            continue
+        networks[cnn_name] = {'columns': cols, 'ipca': ipca}
+        logger.info(f"  {cnn_name}: {len(cols)} → {k} components from {n_frames} frames "
+                    f"({ipca.explained_variance_ratio_.sum():.1%} variance)")
+
+    return {'n_components': n_components, 'networks': networks}
+
+
+def projected_layout(projection):
+    """(blocks, names) for aggregating projected frames: '{net}_pc{i}_{stat}'."""
+    blocks, names = {}, []
+    for cnn_name, net in projection['networks'].items():
+        cols = [f'pc{i}' for i in range(net['ipca'].n_components_)]
+        blocks[cnn_name] = (cols, len(names))
+        names.extend(temporal_feature_names(cols, cnn_name))
+    return blocks, names
+
 
-            # Aggregate temporal features
-            agg = aggregate_temporal_features(df, cnn_name)
-            if agg:
-                # Prefix with cnn type
-                for k, v in agg.items():
-                    all_features[f'{cnn_name}_{k}'] = v
+def _project_cnn_frames(path, net, chunk_frames):
+    """Frames × k projection of one CNN CSV, transformed chunk by chunk."""
+    parts = [net['ipca'].transform(X).astype(np.float32)
+             for X in _iter_cnn_chunks(path, net['columns'], chunk_frames)]
+    return np.vstack(parts) if parts else np.empty((0, net['ipca'].n_components_), np.float32)
 
+
+def _fill_cnn_row(row, pid, data_root, blocks, projection=None):
+    """Aggregate each network of ``pid`` into its slice of ``row``; True if any."""
+    found = False
+    for cnn_name, path in cnn_feature_files(pid, data_root).items():
+        if cnn_name not in blocks or not os.path.exists(path):
+            continue
+        cols, offset = blocks[cnn_name]
+        try:
+            if projection is not None:
+                file_cols = cols
+                X = _project_cnn_frames(path, projection['networks'][cnn_name],
+                                        CNN_PCA_CHUNK_FRAMES)
+            else:
+                file_cols = _cnn_columns(path)
+                if not file_cols:
+                    continue
+                X = _read_cnn_matrix(path, file_cols)
+            X = _pool_strided(X)
+            if len(X) == 0:
+                continue
+            vec = aggregate_temporal_matrix(X).reshape(len(file_cols), len(TEMPORAL_STATS))
+            if file_cols == cols:
+                row[offset:offset + vec.size] = vec.ravel()
+            else:
+                index = {c: i for i, c in enumerate(cols)}
+                block = row[offset:offset + len(cols) * len(TEMPORAL_STATS)]
+                block = block.reshape(len(cols), len(TEMPORAL_STATS))
+                block[[index[c] for c in file_cols]] = vec
+            found = True
         except Exception as e:
             logger.debug(f"Error loading {cnn_name} for {pid}: {e}")
+    return found
 
-    return all_features
 
+def extract_cnn_matrix(participant_ids, data_root, layout=None, projection=None):
+    """
+    Cohort CNN feature matrix: one contiguous float32 row per participant
+    in a preallocated (n_participants, n_features) array, NaN where a
+    network or statistic is unavailable. Returns (matrix, names, has_cnn).
 
-def extract_openface_enhanced(pid, data_root):
+    With a fit_cnn_projection ``projection``, frames are projected to its
+    components before aggregation.
     """
-    Enhanced OpenFace feature extraction with more sophisticated aggregation.
+    if layout is None:
+        layout = (projected_layout(projection) if projection is not None
+                  else cnn_feature_layout(participant_ids, data_root))
+    blocks, names = layout
+    matrix = np.full((len(participant_ids), len(names)), np.nan, dtype=np.float32)
+    has_cnn = np.zeros(len(participant_ids), dtype=bool)
+    for i, pid in enumerate(participant_ids):
+        has_cnn[i] = _fill_cnn_row(matrix[i], pid, data_root, blocks, projection)
+    return matrix, names, has_cnn
+
+
+def extract_cnn_features(pid, data_root, projection=None):
+    """
+    Extract CNN features from multiple architectures.
+    Uses ResNet, VGG16, and DenseNet201 features.
+
+    Dict view of one extract_cnn_matrix row.
+    """
+    matrix, names, _ = extract_cnn_matrix([pid], data_root, projection=projection)
+    return {k: float(v) for k, v in zip(names, matrix[0]) if not np.isnan(v)}
+
+
+# ── AU dynamics ───────────────────────────────────────────────
+
+# AU intensity (_r, 0-5) above which an AU counts as active
+AU_ACTIVE_THRESHOLD = 0.5
+
+
+def au_activation_matrix(R, threshold=AU_ACTIVE_THRESHOLD):
+    """
+    Boolean frames × AUs activation matrix from AU intensities, plus the
+    mask of non-missing values. Missing intensities count as inactive.
+    """
+    valid = ~np.isnan(R)
+    with np.errstate(invalid='ignore'):
+        active = R > threshold
+    return active, valid
+
+
+def au_dynamics_features(active, au_names):
     """
-    path = os.path.join(data_root, f"{pid}_P", "features",
-                        f"{pid}_OpenFace2.1.0_Pose_gaze_AUs.csv")
+    Episode and co-occurrence features from a frames × AUs activation matrix.
 
-    if not os.path.exists(path):
+    Run lengths come from the edges of the zero-padded matrix: every 0→1
+    step starts an episode and the active frames divide among them, so
+    the mean episode length is active frames / episodes. Pairwise
+    co-occurrence (fraction of frames with both AUs active) is one
+    matrix product. Episodes are counted over consecutive kept frames.
+
+      au_dyn_{AU}_episodes_per_1k  — episode starts per 1,000 frames
+      au_dyn_{AU}_episode_len      — mean episode length in frames (0 if none)
+      au_dyn_{AUi}_{AUj}_cooccur   — P(AUi and AUj active), i < j
+    """
+    n = len(active)
+    if n == 0:
         return {}
+    A = active.astype(np.int8)
+    edges = np.diff(A, axis=0, prepend=np.zeros((1, A.shape[1]), np.int8))
+    episodes = np.count_nonzero(edges == 1, axis=0)
+    active_frames = A.sum(axis=0, dtype=np.int64)
+    episode_len = np.divide(active_frames, episodes, out=np.zeros(len(episodes)),
+                            where=episodes > 0)
+
+    Af = active.astype(np.float32)
+    cooccur = (Af.T @ Af) / n
+    iu, ju = np.triu_indices(len(au_names), k=1)
+
+    features = {}
+    for j, au in enumerate(au_names):
+        features[f'au_dyn_{au}_episodes_per_1k'] = 1000.0 * episodes[j] / n
+        features[f'au_dyn_{au}_episode_len'] = float(episode_len[j])
+    for i, j in zip(iu, ju):
+        features[f'au_dyn_{au_names[i]}_{au_names[j]}_cooccur'] = float(cooccur[i, j])
+    return features
 
+
+def extract_openface_enhanced(pid, data_root):
+    """
+    Enhanced OpenFace feature extraction with more sophisticated aggregation.
+    """
     try:
-        df = pd.read_csv(path)
+        df = load_openface(pid, data_root)
+        if df is None:
+            return {}
 
-        # High confidence filtering
-        if 'confidence' in df.columns:
-            df = df[df['confidence'] >= 0.85]
-        if 'success' in df.columns:
-            df = df[df['success'] == 1]
+        # High confidence filtering (success == 1 is applied by the loader)
+        df = pool_dataframe(select_confident(df, 0.85))
 
         if df.empty:
             return {}
@@ -133,20 +416,24 @@ def extract_openface_enhanced(pid, data_root):
 
         features = {}
 
+        # Boolean frames × AUs activation matrix, shared with the AU dynamics block
+        active, valid = au_activation_matrix(df[au_r_cols].to_numpy(dtype=np.float64))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            active_pct = active.sum(axis=0) / valid.sum(axis=0)
+
         # Action Units - enhanced statistics
-        for col in au_r_cols:
+        for j, col in enumerate(au_r_cols):
             vals = df[col].dropna()
             if len(vals) > 0:
                 features[f'{col}_mean'] = vals.mean()
                 features[f'{col}_std'] = vals.std() if len(vals) > 1 else 0
                 features[f'{col}_max'] = vals.max()
                 # Percentage of time AU is active (> threshold)
-                features[f'{col}_active_pct'] = (vals > 0.5).mean()
+                features[f'{col}_active_pct'] = active_pct[j]
 
         # AU presence (binary)
-        for col in au_c_cols:
-            if col in df.columns:
-                features[f'{col}_presence'] = df[col].mean()
+        if au_c_cols:
+            features.update({f'{col}_presence': v for col, v in df[au_c_cols].mean().items()})
 
         # Pose - head movement patterns
         for col in pose_cols:
@@ -176,6 +463,10 @@ def extract_openface_enhanced(pid, data_root):
             # Head movement variability
             features['head_movement_var'] = np.sqrt(df['pose_Rx']**2 + df['pose_Ry']**2).std()
 
+        # AU dynamics: activation episodes and pairwise co-occurrence
+        if au_r_cols:
+            features.update(au_dynamics_features(active, [c.split('_')[0] for c in au_r_cols]))
+
         return features
 
     except Exception as e:
@@ -183,39 +474,8 @@ def extract_openface_enhanced(pid, data_root):
         return {}
 
 
-def build_visual_features_enhanced(participant_ids):
-    """
-    Build enhanced visual features using CNN + OpenFace features.
-    """
-    logger.info("Extracting ENHANCED visual features...")
-    logger.info("  Using CNN features: DenseNet201, VGG16, ResNet")
-    logger.info("  Using enhanced OpenFace features")
-
-    records = []
-    missing = []
-
-    for pid in participant_ids:
-        record = {'pid': pid}
-
-        # Extract CNN features
-        cnn_feats = extract_cnn_features(pid, DATA_ROOT)
-        if cnn_feats:
-            record.update(cnn_feats)
-        else:
-            missing.append(f"{pid}_cnn")
-
-        # Extract enhanced OpenFace features
-        of_feats = extract_openface_enhanced(pid, DATA_ROOT)
-        if of_feats:
-            record.update(of_feats)
-        else:
-            missing.append(f"{pid}_openface")
-
-        if len(record) > 1:  # More than just pid
-            records.append(record)
-        else:
-            missing.append(pid)
-
+def finalize_visual_features_enhanced(records, missing=()):
+    """Filter constant / highly correlated columns and save the feature table."""
     if missing:
         logger.info(f"Missing visual features for {len(missing)} participants")
 
@@ -242,6 +502,75 @@ def build_visual_features_enhanced(participant_ids):
     return df
 
 
+def build_visual_enhanced_table(participant_ids, data_root, missing, openface=None,
+                                projection=None):
+    """
+    Unfiltered enhanced feature table (pid, CNN block, OpenFace block).
+
+    The CNN block is the preallocated float32 cohort matrix from
+    extract_cnn_matrix; the OpenFace dicts are small and are joined
+    column-wise, so no per-participant wide dict is built. ``openface``
+    optionally holds extract_openface_enhanced results already computed
+    for ``participant_ids`` (same order); ``projection`` is an optional
+    fit_cnn_projection result applied to CNN frames.
+    """
+    cnn, cnn_names, has_cnn = extract_cnn_matrix(participant_ids, data_root,
+                                                 projection=projection)
+
+    of_records = []
+    keep = np.zeros(len(participant_ids), dtype=bool)
+    for i, pid in enumerate(participant_ids):
+        if not has_cnn[i]:
+            missing.append(f"{pid}_cnn")
+        of_feats = (openface[i] if openface is not None
+                    else extract_openface_enhanced(pid, data_root))
+        if not of_feats:
+            missing.append(f"{pid}_openface")
+        if has_cnn[i] or of_feats:
+            keep[i] = True
+            of_records.append(of_feats)
+        else:
+            missing.append(pid)
+
+    pids = pd.Series(np.asarray(participant_ids)[keep], name='pid')
+    cnn_df = pd.DataFrame(cnn[keep], columns=cnn_names, copy=False)
+    of_df = pd.DataFrame(of_records, index=range(len(of_records)))
+    return pd.concat([pids, cnn_df, of_df], axis=1)
+
+
+def cnn_projection_for(participant_ids, data_root, pca_fit_ids=None):
+    """
+    Fitted CNN projection when CNN_PCA_COMPONENTS > 0, else None. It is fit
+    on ``pca_fit_ids`` (the training participants) when given. Without them
+    it falls back to all of ``participant_ids``: that fit is transductive,
+    since the projection has seen the frames of every later test subject,
+    and a warning is logged.
+    """
+    if CNN_PCA_COMPONENTS <= 0:
+        return None
+    if pca_fit_ids is None:
+        logger.warning("  CNN IncrementalPCA is fit on ALL participants (no pca_fit_ids): "
+                       "the projection is transductive and sees future test subjects")
+        pca_fit_ids = participant_ids
+    logger.info(f"  Fitting IncrementalPCA ({CNN_PCA_COMPONENTS} components per CNN)")
+    return fit_cnn_projection(list(pca_fit_ids), data_root)
+
+
+def build_visual_features_enhanced(participant_ids, data_root=DATA_ROOT, pca_fit_ids=None):
+    """
+    Build enhanced visual features using CNN + OpenFace features.
+    """
+    logger.info("Extracting ENHANCED visual features...")
+    logger.info("  Using CNN features: DenseNet201, VGG16, ResNet")
+    logger.info("  Using enhanced OpenFace features")
+
+    projection = cnn_projection_for(participant_ids, data_root, pca_fit_ids)
+    missing = []
+    table = build_visual_enhanced_table(participant_ids, data_root, missing,
+                                        projection=projection)
+    return finalize_visual_features_enhanced(table, missing)
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     labels = pd.read_csv(os.path.join(FEATURES_DIR, 'master_labels.csv'))
@@ -0,0 +1,84 @@
+# src/visual_pipeline.py
+"""
+Combined visual feature extraction run.
+
+Builds the basic (visual_features.csv), enhanced (visual_features_enhanced.csv)
+and browser-compatible (visual_browser_features.csv) tables in one pass over
+participants, so each OpenFace CSV is parsed once and shared through the
+openface_loader cache instead of being read by every builder.
+"""
+import os
+import time
+import logging
+
+import pandas as pd
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import DATA_ROOT, FEATURES_DIR
+from src.openface_loader import cache_stats, clear_openface_cache
+from src.visual_features import extract_openface_basic, finalize_visual_features
+from src.visual_features_enhanced import (extract_openface_enhanced,
+                                          build_visual_enhanced_table,
+                                          cnn_projection_for,
+                                          finalize_visual_features_enhanced)
+from src.visual_browser_model import (extract_browser_visual_features,
+                                      finalize_browser_visual_features)
+
+logger = logging.getLogger(__name__)
+
+
+def build_all_visual_features(participant_ids, data_root=DATA_ROOT, pca_fit_ids=None):
+    """
+    Returns (basic_df, enhanced_df, browser_df), each saved to FEATURES_DIR.
+    ``pca_fit_ids`` limits the optional CNN IncrementalPCA fit to training
+    participants (see CNN_PCA_COMPONENTS); without it the fit is
+    transductive (see cnn_projection_for).
+    """
+    logger.info("Extracting ALL visual feature sets (shared OpenFace loader)...")
+    clear_openface_cache()
+    start = time.perf_counter()
+
+    basic, basic_missing = [], []
+    enhanced_openface, enhanced_missing = [], []
+    browser, browser_missing = [], 0
+
+    for pid in participant_ids:
+        try:
+            record = extract_openface_basic(pid, data_root)
+            if record is None:
+                basic_missing.append(pid)
+            else:
+                basic.append(record)
+        except Exception as e:
+            logger.warning(f"Error on {pid}: {e}")
+
+        enhanced_openface.append(extract_openface_enhanced(pid, data_root))
+
+        feats = extract_browser_visual_features(pid, data_root)
+        if feats is not None:
+            feats['pid'] = pid
+            browser.append(feats)
+        else:
+            browser_missing += 1
+
+    # CNN statistics go straight into the preallocated cohort matrix
+    projection = cnn_projection_for(participant_ids, data_root, pca_fit_ids)
+    enhanced = build_visual_enhanced_table(participant_ids, data_root, enhanced_missing,
+                                           enhanced_openface, projection)
+    extract_sec = time.perf_counter() - start
+    basic_df = finalize_visual_features(basic, basic_missing)
+    enhanced_df = finalize_visual_features_enhanced(enhanced, enhanced_missing)
+    browser_df = finalize_browser_visual_features(browser, browser_missing)
+
+    logger.info(f"  OpenFace reads: {cache_stats['misses']} parsed, "
+                f"{cache_stats['hits']} served from cache")
+    logger.info(f"  Extraction {extract_sec:.1f}s, total {time.perf_counter() - start:.1f}s "
+                f"for {len(participant_ids)} participants")
+    return basic_df, enhanced_df, browser_df
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    labels = pd.read_csv(os.path.join(FEATURES_DIR, 'master_labels.csv'))
+    build_all_visual_features(labels['pid'].tolist())
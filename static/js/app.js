@@ -19,6 +19,11 @@ let expressionHistory = [];
 let faceDetectedCount = 0;
 let totalDetectionAttempts = 0;
 let smoothedExpressions = null; // for smooth interpolation
+// Per-frame expressions streamed to /api/visual-frames for temporal features
+let visualSessionId = newVisualSessionId();
+let pendingVisualFrames = [];
+let visualUploads = Promise.resolve(); // batches are posted one at a time, in order
+const VISUAL_FRAME_BATCH = 10;
 let lastFaceBox = null; // for smooth box animation
 let faceOverlayAnimId = null;
 
@@ -1089,11 +1094,14 @@ function startFaceDetection() {
             if (detection) {
                 faceDetectedCount++;
                 const expr = detection.expressions;
-                expressionHistory.push({
+                const snapshot = {
                     neutral: expr.neutral, happy: expr.happy, sad: expr.sad,
                     angry: expr.angry, fearful: expr.fearful, disgusted: expr.disgusted,
                     surprised: expr.surprised,
-                });
+                };
+                expressionHistory.push(snapshot);
+                pendingVisualFrames.push(snapshot);
+                if (pendingVisualFrames.length >= VISUAL_FRAME_BATCH) flushVisualFrames();
                 // Smooth interpolation — blend new values with previous
                 const alpha = 0.4; // smoothing factor (0=no update, 1=instant)
                 if (!smoothedExpressions) {
@@ -1230,6 +1238,35 @@ function hideMiniWebcam() {
     }
 }
 
+function newVisualSessionId() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
+
+// Queue the pending frames behind earlier uploads, so the server's session
+// sees batches in capture order. Resolves once every queued batch is sent.
+function flushVisualFrames() {
+    if (pendingVisualFrames.length > 0) {
+        const frames = pendingVisualFrames;
+        const sessionId = visualSessionId;
+        pendingVisualFrames = [];
+        visualUploads = visualUploads.then(() => postVisualFrames(sessionId, frames));
+    }
+    return visualUploads;
+}
+
+async function postVisualFrames(sessionId, frames) {
+    try {
+        await fetch('/api/visual-frames', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ sessionId, frames })
+        });
+    } catch (err) {
+        console.warn('Visual frame upload failed:', err);
+    }
+}
+
 function computeVisualAnalysis() {
     if (expressionHistory.length === 0) return null;
     const avg = { neutral: 0, happy: 0, sad: 0, angry: 0, fearful: 0, disgusted: 0, surprised: 0 };
@@ -1243,7 +1280,7 @@ function computeVisualAnalysis() {
     const happyScore = avg.happy;
     let visualProb = (flatAffect * 0.4 + sadScore * 0.4 + (1 - happyScore) * 0.2);
     visualProb = Math.max(0, Math.min(1, visualProb));
-    return { averages: avg, flatAffect, visualProb, samplesCollected: n, faceDetectionRate: totalDetectionAttempts > 0 ? faceDetectedCount / totalDetectionAttempts : 0 };
+    return { averages: avg, flatAffect, visualProb, samplesCollected: n, sessionId: visualSessionId, faceDetectionRate: totalDetectionAttempts > 0 ? faceDetectedCount / totalDetectionAttempts : 0 };
 }
 
 
@@ -1260,6 +1297,7 @@ async function submitForAnalysis() {
     hideMiniWebcam();
 
     const interviewText = interviewResponses.join(' ');
+    await flushVisualFrames();
     const visualData = computeVisualAnalysis();
     const audioData = computeAudioAnalysis();
 
@@ -1472,6 +1510,8 @@ function restart() {
     interviewIndex = 0;
     interviewResponses = [];
     expressionHistory = [];
+    pendingVisualFrames = [];
+    visualSessionId = newVisualSessionId();
     faceDetectedCount = 0;
     totalDetectionAttempts = 0;
     lastRecordingBlob = null;
@@ -220,3 +220,31 @@ class TestAPIEndpoints:
         weights = data['combined']['weights']
         total = sum(weights.values())
         assert abs(total - 1.0) < 0.01, f"Weights sum to {total}, expected 1.0"
+
+    def test_visual_frames_accumulate(self, client):
+        frame = {'happy': 0.1, 'sad': 0.6, 'angry': 0.05, 'surprised': 0.05,
+                 'fearful': 0.05, 'disgusted': 0.05, 'neutral': 0.1}
+        for expected in (3, 6):
+            rv = client.post('/api/visual-frames',
+                             json={'sessionId': 'test-session-1', 'frames': [frame] * 3},
+                             content_type='application/json')
+            assert rv.status_code == 200
+            assert rv.get_json()['framesSeen'] == expected
+
+        rv = client.post('/api/predict',
+                         json={'phqAnswers': [1, 1, 1, 1, 1, 1, 1, 1],
+                               'visualData': {'samplesCollected': 6, 'visualProb': 0.5,
+                                              'sessionId': 'test-session-1'}},
+                         content_type='application/json')
+        assert rv.status_code == 200
+        assert 'visual' in rv.get_json()
+
+    def test_visual_frames_invalid(self, client):
+        rv = client.post('/api/visual-frames',
+                         json={'sessionId': '../etc', 'frames': [{'happy': 1.0}]},
+                         content_type='application/json')
+        assert rv.status_code == 400
+        rv = client.post('/api/visual-frames',
+                         json={'sessionId': 'abc', 'frames': ['not-a-frame']},
+                         content_type='application/json')
+        assert rv.status_code == 400
@@ -0,0 +1,125 @@
+# tests/test_audio_lld.py
+"""Tests for the vectorized LLD engine in src/audio_lld.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+from scipy import stats as sp_stats
+
+
+@pytest.fixture
+def voiced_signal():
+    sr = 16000
+    t = np.arange(2 * sr) / sr
+    phase = 2 * np.pi * 150.0 * t
+    x = sum(np.sin(k * phase) / k for k in range(1, 12))
+    x += 0.01 * np.random.RandomState(0).randn(len(t))
+    return sr, (x / 4).astype(np.float32)
+
+
+class TestComputeLLDs:
+    def test_pitch_of_harmonic_tone(self, voiced_signal):
+        from src.audio_lld import compute_llds
+        sr, x = voiced_signal
+        egemaps, mfcc_llds, extras = compute_llds(x, sr)
+        assert extras['voiced_ratio'] > 0.9
+        assert np.median(extras['voiced_f0_hz']) == pytest.approx(150.0, rel=0.02)
+        assert mfcc_llds['pcm_fftMag_mfcc'].shape[1] == 13
+
+    def test_short_signal_does_not_fail(self):
+        from src.audio_lld import build_feature_vector
+        vec = build_feature_vector(16000, np.zeros(100, dtype=np.float32),
+                                   ['egemaps_Loudness_sma3_mean', 'unknown_col'])
+        assert vec.shape == (2,)
+        assert np.all(np.isfinite(vec))
+
+
+class TestSummaries:
+    def test_summarize_matrix_matches_numpy(self):
+        from src.audio_lld import summarize_matrix
+        X = np.random.RandomState(1).gamma(2.0, size=(500, 4))
+        out = summarize_matrix(X, ('mean', 'std', 'p25', 'iqr', 'skew'))
+        np.testing.assert_allclose(out['mean'], X.mean(axis=0))
+        np.testing.assert_allclose(out['std'], X.std(axis=0))
+        np.testing.assert_allclose(out['p25'], np.percentile(X, 25, axis=0))
+        np.testing.assert_allclose(out['skew'], sp_stats.skew(X), rtol=1e-10)
+
+    def test_vector_covers_model_schema(self, voiced_signal):
+        import joblib
+        from config import MODELS_DIR
+        from src.audio_lld import build_feature_vector
+        path = os.path.join(os.path.dirname(__file__), '..', MODELS_DIR, 'final_audio_model.pkl')
+        if not os.path.exists(path):
+            pytest.skip('final_audio_model.pkl not available')
+        model = joblib.load(path)
+        columns = list(model.feature_names_in_)
+        sr, x = voiced_signal
+        vec = build_feature_vector(sr, x, columns)
+        assert vec.shape == (len(columns),)
+        non_boaw = [i for i, c in enumerate(columns) if not c.startswith('boaw_')]
+        assert np.count_nonzero(vec[non_boaw]) > 0.9 * len(non_boaw)
+        prob = model.predict_proba(vec.reshape(1, -1))[0, 1]
+        assert 0.0 <= prob <= 1.0
+
+
+class TestDSPPlan:
+    def test_plan_is_cached_and_read_only(self):
+        from src.audio_lld import get_dsp_plan
+        plan = get_dsp_plan(44100, 16000)
+        assert get_dsp_plan(44100, 16000) is plan
+        with pytest.raises(ValueError):
+            plan.window[0] = 1.0
+
+    @pytest.mark.parametrize('rate', [44100, 48000, 16000])
+    def test_resample_matches_resample_poly(self, rate):
+        from scipy.signal import resample_poly
+        from src.audio_lld import get_dsp_plan
+        x = np.random.RandomState(2).randn(rate // 2 + 7).astype(np.float32)
+        g = np.gcd(rate, 16000)
+        ref = resample_poly(x, 16000 // g, rate // g) if rate != 16000 else x
+        np.testing.assert_allclose(get_dsp_plan(rate, 16000).resample(x), ref, atol=1e-5)
+
+
+class TestTrainingTier:
+    def _write_wav(self, root, pid, x, sr=16000):
+        from scipy.io import wavfile
+        folder = os.path.join(root, f'{pid}_P')
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'{pid}_AUDIO.wav')
+        wavfile.write(path, sr, (x * 32767).astype(np.int16))
+        return path
+
+    def test_columns_match_server_vector(self, voiced_signal, tmp_path):
+        from src.audio_lld import build_feature_vector, load_wav
+        from src.audio_features_enhanced import extract_wav_lld_features
+        path = self._write_wav(str(tmp_path), 300, voiced_signal[1])
+        feats = extract_wav_lld_features(300, str(tmp_path))
+        columns = list(feats)
+        assert columns and not any(c.startswith('wav_') for c in columns)
+        vec = build_feature_vector(*load_wav(path), columns)
+        np.testing.assert_allclose(vec, np.nan_to_num([feats[c] for c in columns]),
+                                   rtol=1e-10, atol=1e-12)
+
+    def test_tier_needs_every_wav(self, voiced_signal, tmp_path, monkeypatch, caplog):
+        import src.audio_features_enhanced as afe
+        monkeypatch.setattr(afe, 'DATA_ROOT', str(tmp_path))
+        monkeypatch.setattr(afe, 'FEATURES_DIR', str(tmp_path / 'features'))
+        monkeypatch.setattr(afe, 'SAVE_PATH', str(tmp_path / 'features' / 'audio.csv'))
+        sr, x = voiced_signal
+        self._write_wav(str(tmp_path), 300, x)
+        # 301 has OpenSMILE MFCC CSV features but no WAV
+        feat_dir = tmp_path / '301_P' / 'features'
+        feat_dir.mkdir(parents=True)
+        mfcc = np.random.RandomState(3).randn(50, 13)
+        np.savetxt(feat_dir / '301_OpenSMILE2.3.0_mfcc.csv', mfcc, delimiter=';',
+                   header=';'.join(f'c{i}' for i in range(13)), comments='')
+
+        with caplog.at_level('WARNING', logger=afe.logger.name):
+            partial = afe.build_audio_features_enhanced([300, 301])
+        assert 'Tier 4 skipped' in caplog.text
+        assert not any(c.startswith(('egemaps_', 'mfcc_pcm')) for c in partial.columns)
+
+        self._write_wav(str(tmp_path), 301, 0.5 * x[::-1].copy())
+        full = afe.build_audio_features_enhanced([300, 301])
+        assert any(c.startswith(('egemaps_', 'mfcc_pcm')) for c in full.columns)
@@ -0,0 +1,83 @@
+# tests/test_augmentation.py
+"""Tests for the batched minority augmentation in src/fusion.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    X = rng.randn(90, 6)
+    y = np.array([0, 0, 1] * 30)
+    return X, y
+
+
+def _mixup_loop(X, y, alpha, n_augment, random_state):
+    """The original per-sample mixup loop."""
+    rng = np.random.RandomState(random_state)
+    X_min = X[y == 1]
+    X_aug = []
+    for _ in range(n_augment):
+        i, j = rng.choice(len(X_min), 2, replace=False)
+        lam = rng.beta(alpha, alpha)
+        X_aug.append(lam * X_min[i] + (1 - lam) * X_min[j])
+    return np.vstack([X, np.array(X_aug)])
+
+
+def _noise_loop(X, y, noise_std, n_augment, random_state):
+    """The original per-sample noise loop."""
+    rng = np.random.RandomState(random_state)
+    X_min = X[y == 1]
+    stds = np.std(X, axis=0) + 1e-10
+    X_aug = [X_min[rng.choice(len(X_min))] + rng.normal(0, noise_std, size=X.shape[1]) * stds
+             for _ in range(n_augment)]
+    return np.vstack([X, np.array(X_aug)])
+
+
+class TestAugmentation:
+    def test_legacy_rng_reproduces_loop(self, data):
+        from src.fusion import mixup_augment, noise_augment
+        X, y = data
+        X_mix, y_mix = mixup_augment(X, y, 0.2, 40, random_state=7, legacy_rng=True)
+        np.testing.assert_array_equal(X_mix, _mixup_loop(X, y, 0.2, 40, 7))
+        X_noise, _ = noise_augment(X, y, 0.05, 40, random_state=7, legacy_rng=True)
+        np.testing.assert_array_equal(X_noise, _noise_loop(X, y, 0.05, 40, 7))
+        assert list(y_mix[len(y):]) == [1] * 40
+
+    def test_batched_mixup_blends_distinct_minority_pairs(self, data):
+        from src.fusion import mixup_augment
+        X, y = data
+        X_out, y_out = mixup_augment(X, y, 0.2, 500, random_state=1)
+        assert X_out.shape == (590, 6) and list(y_out[90:]) == [1] * 500
+        np.testing.assert_array_equal(X_out[:90], X)
+        # One batch each of first rows, offsets to a distinct second row, and weights
+        X_min = X[y == 1]
+        rng = np.random.RandomState(1)
+        i = rng.randint(len(X_min), size=500)
+        j = (i + rng.randint(1, len(X_min), size=500)) % len(X_min)
+        lam = rng.beta(0.2, 0.2, size=500)[:, None]
+        assert (i != j).all()
+        np.testing.assert_allclose(X_out[90:], lam * X_min[i] + (1 - lam) * X_min[j], atol=1e-12)
+        np.testing.assert_array_equal(X_out, mixup_augment(X, y, 0.2, 500, random_state=1)[0])
+
+    def test_batched_noise_scale(self, data):
+        from src.fusion import noise_augment
+        X, y = data
+        X_out, y_out = noise_augment(X, y, 0.05, 5000, random_state=2)
+        assert X_out.shape == (5090, 6) and y_out[90:].sum() == 5000
+        X_min = X[y == 1]
+        # Distance to the nearest minority row is the added noise
+        nearest = np.abs(X_out[90:, None, :] - X_min[None, :, :]).sum(axis=2).argmin(axis=1)
+        noise = X_out[90:] - X_min[nearest]
+        np.testing.assert_allclose(noise.std(axis=0) / X.std(axis=0), 0.05, rtol=0.1)
+
+    def test_too_few_minority_rows(self, data):
+        from src.fusion import mixup_augment
+        X, y = data
+        y = np.zeros_like(y)
+        y[0] = 1
+        X_out, y_out = mixup_augment(X, y)
+        assert X_out is X and y_out is y
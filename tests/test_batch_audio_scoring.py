@@ -0,0 +1,73 @@
+# tests/test_batch_audio_scoring.py
+"""Tests for the offline WAV scoring CLI in src/batch_audio_scoring.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.io import wavfile
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'final_audio_model.pkl')
+
+
+def _write_wavs(folder, n, sr=22050):
+    t = np.arange(sr) / sr
+    for i in range(n):
+        x = 0.3 * np.sin(2 * np.pi * (120 + 20 * i) * t)
+        wavfile.write(str(folder / f'rec_{i}.wav'), sr, (x * 32767).astype(np.int16))
+
+
+@pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason='audio model not available')
+class TestScoreDirectory:
+    def test_scores_and_resumes(self, tmp_path):
+        from src.batch_audio_scoring import load_audio_model, score_directory
+        model, columns = load_audio_model(os.path.dirname(MODEL_PATH))
+        wav_dir = tmp_path / 'wavs'
+        wav_dir.mkdir()
+        _write_wavs(wav_dir, 3)
+        (wav_dir / 'broken.wav').write_bytes(b'not a wav')
+        out = str(tmp_path / 'scores.csv')
+
+        stats = score_directory(str(wav_dir), out, workers=1, chunk_size=2,
+                                model=model, columns=columns)
+        assert stats['scored'] == 3 and stats['failed'] == 1
+        df = pd.read_csv(out).set_index('file')
+        assert sorted(df.index) == ['broken.wav', 'rec_0.wav', 'rec_1.wav', 'rec_2.wav']
+        assert df['audio_prob'].drop('broken.wav').between(0, 1).all()
+        assert np.isnan(df.loc['broken.wav', 'audio_prob'])
+
+        _write_wavs(wav_dir, 4)
+        stats = score_directory(str(wav_dir), out, workers=1, chunk_size=2,
+                                model=model, columns=columns)
+        assert stats['scored'] == 1 and stats['skipped'] == 4
+        assert len(pd.read_csv(out)) == 5
+
+
+class TestDecodeFailures:
+    @pytest.fixture
+    def model(self):
+        from sklearn.dummy import DummyClassifier
+        columns = ['F0semitoneFrom27.5Hz_sma3nz_amean', 'loudness_sma3_amean']
+        X = pd.DataFrame(np.zeros((4, 2)), columns=columns)
+        return DummyClassifier(strategy='prior').fit(X, [0, 1, 1, 0]), columns
+
+    def test_failed_files_are_recorded_and_not_retried(self, tmp_path, model):
+        from src.batch_audio_scoring import score_directory
+        model, columns = model
+        wav_dir = tmp_path / 'wavs'
+        wav_dir.mkdir()
+        _write_wavs(wav_dir, 2)
+        (wav_dir / 'broken.wav').write_bytes(b'not a wav')
+        out = str(tmp_path / 'scores.csv')
+
+        stats = score_directory(str(wav_dir), out, workers=1, model=model, columns=columns)
+        assert stats['scored'] == 2 and stats['failed'] == 1
+        df = pd.read_csv(out).set_index('file')
+        assert np.isnan(df.loc['broken.wav', 'audio_prob'])
+        assert isinstance(df.loc['broken.wav', 'error'], str)
+        assert df['error'].drop('broken.wav').isna().all()
+
+        stats = score_directory(str(wav_dir), out, workers=1, model=model, columns=columns)
+        assert stats == {'scored': 0, 'failed': 0, 'skipped': 3,
+                         'audio_sec': 0.0, 'elapsed_sec': 0.0}
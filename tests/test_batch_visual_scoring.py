@@ -0,0 +1,97 @@
+# tests/test_batch_visual_scoring.py
+"""Tests for bulk face-api.js session scoring in src/batch_visual_scoring.py."""
+import sys, os, json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _frames(rng, n):
+    from src.visual_browser_model import EXPRESSIONS
+    p = rng.dirichlet(np.ones(7), size=n)
+    return [dict(zip(EXPRESSIONS, row)) for row in p]
+
+
+@pytest.fixture
+def small_model():
+    from src.visual_browser_model import BROWSER_FEATURE_COLUMNS, train_browser_visual_model
+    rng = np.random.RandomState(0)
+    X = rng.rand(40, len(BROWSER_FEATURE_COLUMNS))
+    y = np.array([0, 1] * 20)
+    model, scaler = train_browser_visual_model(X, y, save=False)
+    return model, scaler, list(BROWSER_FEATURE_COLUMNS)
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    rng = np.random.RandomState(1)
+    d = tmp_path / 'logs'
+    d.mkdir()
+    (d / 'a.json').write_text(json.dumps({'sessionId': 'a', 'frames': _frames(rng, 40)}))
+    (d / 'b.jsonl').write_text('\n'.join(json.dumps(f) for f in _frames(rng, 25)))
+    pd.DataFrame(_frames(rng, 30)).to_csv(d / 'c.csv', index=False)
+    (d / 'short.json').write_text(json.dumps(_frames(rng, 3)))
+    (d / 'broken.json').write_text('{not json')
+    (d / 'notes.txt').write_text('ignored')
+    return d
+
+
+class TestBatchVisualScoring:
+    def test_load_formats_agree(self, tmp_path):
+        from src.batch_visual_scoring import load_session_log
+        frames = _frames(np.random.RandomState(2), 10)
+        (tmp_path / 'x.json').write_text(json.dumps(frames))
+        (tmp_path / 'x.jsonl').write_text('\n'.join(json.dumps(f) for f in frames))
+        pd.DataFrame(frames).to_csv(tmp_path / 'x.csv', index=False)
+        ref = load_session_log(str(tmp_path / 'x.json'))
+        assert ref.shape == (10, 7)
+        np.testing.assert_allclose(load_session_log(str(tmp_path / 'x.jsonl')), ref)
+        np.testing.assert_allclose(load_session_log(str(tmp_path / 'x.csv')), ref)
+
+    def test_batch_matches_single_session_scoring(self, log_dir, small_model, tmp_path):
+        from src.batch_visual_scoring import load_session_log, score_sessions
+        from src.visual_browser_model import expression_features
+        model, scaler, columns = small_model
+        out = str(tmp_path / 'scores.parquet')
+        results = score_sessions(str(log_dir), out, model=model, scaler=scaler, columns=columns)
+
+        assert results['session'].tolist() == ['a.json', 'b.jsonl', 'broken.json', 'c.csv',
+                                               'short.json']
+        assert results.attrs['stats']['scored'] == 3
+        assert results.set_index('session')['visual_prob'][['broken.json', 'short.json']].isna().all()
+
+        # One-at-a-time scoring, as /api/predict does it
+        feats = expression_features(load_session_log(str(log_dir / 'b.jsonl')))
+        x = np.array([[feats[c] for c in columns]])
+        single = model.predict_proba(scaler.transform(x))[0, 1]
+        assert results.set_index('session')['visual_prob']['b.jsonl'] == pytest.approx(single)
+
+        written = results.attrs['output']
+        saved = pd.read_parquet(written) if written.endswith('.parquet') else pd.read_csv(written)
+        assert len(saved) == 5
+
+    def test_column_width_must_match_scaler(self, log_dir, small_model, tmp_path):
+        import joblib
+        from src.batch_visual_scoring import load_browser_visual_model, score_sessions
+        model, scaler, columns = small_model
+        with pytest.raises(ValueError):
+            score_sessions(str(log_dir), model=model, scaler=scaler, columns=columns[:-1])
+        models_dir = tmp_path / 'models'
+        models_dir.mkdir()
+        joblib.dump(model, models_dir / 'visual_browser_model.pkl')
+        joblib.dump(scaler, models_dir / 'visual_browser_scaler.pkl')
+        with pytest.raises(FileNotFoundError):
+            load_browser_visual_model(str(models_dir))
+        joblib.dump(columns, models_dir / 'visual_browser_columns.pkl')
+        assert load_browser_visual_model(str(models_dir))[2] == columns
+
+    def test_columns_are_required_and_matched_by_name(self, log_dir, small_model):
+        from src.batch_visual_scoring import score_sessions
+        model, scaler, columns = small_model
+        with pytest.raises(ValueError, match='columns'):
+            score_sessions(str(log_dir), model=model, scaler=scaler)
+        renamed = columns[:-1] + ['expr_unknown_mean']
+        with pytest.raises(ValueError, match='expr_unknown_mean'):
+            score_sessions(str(log_dir), model=model, scaler=scaler, columns=renamed)
@@ -0,0 +1,59 @@
+# tests/test_cascade.py
+"""Tests for early-exit cascade inference over the voting ensembles (main.py)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    import main as pipeline
+    rng = np.random.RandomState(0)
+    y = np.array([0, 0, 1] * 30)
+    X = rng.randn(90, 12)
+    X[:, 0] += 1.5 * y
+    pipe = pipeline.build_modality_pipeline('visual', X.shape[1], 3).fit(X, y)
+    return pipe, rng.randn(200, 12) * 1.5
+
+
+class TestCascade:
+    @pytest.mark.parametrize('threshold', [0.2, 0.38, 0.5, 0.7])
+    def test_decisions_match_full_ensemble(self, fitted, threshold):
+        import main as pipeline
+        pipe, X = fitted
+        cascade = pipeline.CascadeVotingPredictor(pipe, threshold).fit_order(X)
+        expected = (pipe.predict_proba(X)[:, 1] >= threshold).astype(int)
+        np.testing.assert_array_equal(cascade.predict(X), expected)
+        assert cascade.stats.sum() == len(X)
+
+    def test_equal_weights_exit_bounds(self, fitted):
+        import main as pipeline
+        pipe, X = fitted
+        cascade = pipeline.CascadeVotingPredictor(pipe)
+        decision = cascade.predict(X)
+        # One member moves the mean by at most 0.25 < 0.38
+        assert cascade.stats[1] == 0
+        # Two members leave 0.5 of weight, so only positives can exit there
+        cascade.reset_stats()
+        cascade.predict(X[decision == 0])
+        assert cascade.stats[2] == 0 and cascade.stats[3] > 0
+
+    def test_weighted_vote_exits_after_first_member(self, fitted):
+        import copy
+        import main as pipeline
+        pipe, X = fitted
+        pipe = copy.deepcopy(pipe)
+        pipe.steps[-1][1].weights = [5, 1, 1, 1]
+        cascade = pipeline.CascadeVotingPredictor(pipe, order=[0, 1, 2, 3])
+        np.testing.assert_array_equal(cascade.predict(X),
+                                      (pipe.predict_proba(X)[:, 1] >= 0.38).astype(int))
+        assert cascade.stats[1] > 0
+
+    def test_report(self, fitted):
+        import main as pipeline
+        pipe, X = fitted
+        rep = pipeline.cascade_report(pipe, X[:20])
+        assert rep['agree'] and rep['rows'] == 20
+        assert sorted(rep['order']) == sorted(type(e).__name__ for e in pipe.steps[-1][1].estimators_)
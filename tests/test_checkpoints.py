@@ -0,0 +1,72 @@
+# tests/test_checkpoints.py
+"""Tests for resumable per-fold training checkpoints (src/checkpoints.py)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import numpy as np
+
+
+class TestRunCheckpoint:
+    def test_save_load_and_completed_folds(self, tmp_path):
+        from src.checkpoints import RunCheckpoint, run_key
+        ckpt = RunCheckpoint(str(tmp_path), run_key('data', 1), meta={'n_samples': 3})
+        assert ckpt.load_fold(0) is None
+        ckpt.save_fold(2, {'probs': np.arange(3.0)})
+        ckpt.save_fold(0, {'probs': np.ones(3)})
+        assert ckpt.completed_folds() == [0, 2]
+        np.testing.assert_array_equal(ckpt.load_fold(2)['probs'], np.arange(3.0))
+        assert not [f for f in os.listdir(ckpt.directory) if f.endswith('.tmp')]
+        with open(os.path.join(ckpt.directory, 'run.json')) as f:
+            assert json.load(f)['n_samples'] == 3
+
+    def test_same_key_resumes_other_key_is_fresh(self, tmp_path):
+        from src.checkpoints import RunCheckpoint, run_key
+        X = np.arange(6.0).reshape(3, 2)
+        RunCheckpoint(str(tmp_path), run_key(X, 'cfg')).save_fold(0, 'done')
+        assert RunCheckpoint(str(tmp_path), run_key(X.copy(), 'cfg')).load_fold(0) == 'done'
+        X[0, 0] = -1
+        assert RunCheckpoint(str(tmp_path), run_key(X, 'cfg')).load_fold(0) is None
+
+    def test_unreadable_checkpoint_is_ignored(self, tmp_path):
+        from src.checkpoints import RunCheckpoint
+        ckpt = RunCheckpoint(str(tmp_path), 'k' * 32)
+        with open(ckpt._path('fold_1'), 'wb') as f:
+            f.write(b'not a pickle')
+        assert ckpt.load_fold(1) is None
+
+    def test_clear(self, tmp_path):
+        from src.checkpoints import RunCheckpoint
+        ckpt = RunCheckpoint(str(tmp_path), 'k' * 32)
+        ckpt.save_fold(0, 1)
+        ckpt.save('final_text', 2)
+        ckpt.clear()
+        assert ckpt.completed_folds() == [] and ckpt.load('final_text') is None
+        assert os.path.exists(os.path.join(ckpt.directory, 'run.json'))
+
+
+class TestFoldOutputs:
+    def test_checkpointed_fold_round_trip(self, tmp_path):
+        import main as pipeline
+        from sklearn.model_selection import StratifiedKFold
+        from src.checkpoints import RunCheckpoint
+        rng = np.random.RandomState(0)
+        y = np.array([0, 0, 1] * 20)
+        X = {'text': rng.randn(60, 8), 'audio': rng.randn(60, 70), 'visual': rng.randn(60, 12)}
+        splits = list(StratifiedKFold(5, shuffle=True, random_state=42).split(y, y))
+        tasks = [t for t in pipeline.expand_cv_tasks(y, splits) if t.fold == 0]
+        pipelines = {}
+        probs = pipeline.run_cv_tasks(X, y, tasks, pipelines=pipelines)
+        result = pipeline.fold_outputs(0, splits[0][1], y, tasks, probs)
+
+        assert sorted(pipelines) == [(0, m) for m in sorted(pipeline.MODALITIES)]
+        assert abs(sum(result['weights'].values()) - 1) < 1e-12
+        fused = sum(result['weights'][m] * result['probs'][m] for m in pipeline.MODALITIES)
+        np.testing.assert_allclose(result['probs']['fusion'], fused)
+
+        key = pipeline.training_run_key(X, y, ['t'], ['a'], ['v'])
+        RunCheckpoint(str(tmp_path), key).save_fold(0, result)
+        restored = RunCheckpoint(str(tmp_path), key).load_fold(0)
+        for m in result['probs']:
+            np.testing.assert_array_equal(restored['probs'][m], result['probs'][m])
+        assert restored['aucs'] == result['aucs']
@@ -0,0 +1,132 @@
+# tests/test_cv_scheduler.py
+"""Tests for the fold × modality task scheduler in main.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+from sklearn.model_selection import StratifiedKFold
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    y = np.array([0, 0, 1] * 20)
+    X = {'text': rng.randn(60, 8), 'audio': rng.randn(60, 70), 'visual': rng.randn(60, 12)}
+    return X, y
+
+
+class TestCVScheduler:
+    def test_task_grid_order(self, data):
+        import main as pipeline
+        _, y = data
+        splits = list(StratifiedKFold(5, shuffle=True, random_state=42).split(y, y))
+        tasks = pipeline.expand_cv_tasks(y, splits)
+        assert len(tasks) == 5 * (1 + 3) * 3
+        assert [(t.fold, t.inner, t.modality) for t in tasks[:6]] == [
+            (0, None, 'text'), (0, None, 'audio'), (0, None, 'visual'),
+            (0, 0, 'text'), (0, 0, 'audio'), (0, 0, 'visual')]
+        # Inner folds partition the outer training fold
+        inner = [t for t in tasks if t.fold == 0 and t.inner is not None and t.modality == 'text']
+        assert sorted(np.concatenate([t.eval_idx for t in inner])) == sorted(splits[0][0])
+
+    def test_task_seeds_are_distinct_and_stable(self):
+        import main as pipeline
+        seeds = {pipeline.task_seed(f, i, m) for f in range(5) for i in (None, 0, 1, 2)
+                 for m in pipeline.MODALITIES}
+        assert len(seeds) == 60
+        assert pipeline.task_seed(2, None, 'audio') == pipeline.task_seed(2, None, 'audio')
+
+    def test_parallel_matches_serial(self, data):
+        import main as pipeline
+        X, y = data
+        splits = list(StratifiedKFold(5, shuffle=True, random_state=42).split(y, y))
+        tasks = [t for t in pipeline.expand_cv_tasks(y, splits) if t.fold == 0 and t.inner in (None, 0)]
+        serial = pipeline.run_cv_tasks(X, y, tasks, jobs=1)
+        parallel = pipeline.run_cv_tasks(X, y, tasks, jobs=2)
+        assert list(serial) == list(parallel)
+        for key in serial:
+            np.testing.assert_array_equal(serial[key], parallel[key])
+
+
+class TestOOFFusion:
+    @pytest.fixture
+    def fitted(self, data):
+        import main as pipeline
+        X, y = data
+        splits = list(StratifiedKFold(5, shuffle=True, random_state=42).split(y, y))
+        tasks = pipeline.expand_cv_tasks(y, splits)
+        return y, splits, tasks, pipeline.run_cv_tasks(X, y, tasks)
+
+    def test_oof_fusion_matches_inner_layout(self, fitted):
+        import main as pipeline
+        y, splits, tasks, probs = fitted
+        plain = pipeline.fold_outputs(0, splits[0][1], y, tasks, probs)
+        assert 'stacking' not in plain['probs'] and 'threshold' not in plain
+        inner = [pipeline.fold_outputs(f, splits[f][1], y, tasks, probs, 'compare')
+                 for f in range(5)]
+        oof = [pipeline.fold_outputs(f, splits[f][1], y, tasks, probs, 'oof') for f in range(5)]
+
+        for r_inner, r_oof in zip(inner, oof):
+            assert r_oof.keys() == r_inner.keys()
+            assert abs(sum(r_oof['weights'].values()) - 1) < 1e-12
+            for m in pipeline.MODALITIES:
+                np.testing.assert_array_equal(r_oof['probs'][m], r_inner['probs'][m])
+                assert len(r_oof['inner_aucs'][m]) == 1  # pooled over the inner folds
+            assert 0 <= r_oof['probs']['stacking'].min() <= r_oof['probs']['stacking'].max() <= 1
+
+        table = pipeline.fusion_comparison({'inner': (inner, len(tasks)), 'oof': (oof, len(tasks))})
+        assert list(table['Method']) == ['inner', 'inner', 'oof', 'oof']
+        assert list(table['Fits']) == [60] * 4
+        assert table['AUC'].between(0, 1).all()
+
+    def test_oof_fusion_ignores_test_labels(self, fitted):
+        import main as pipeline
+        y, splits, tasks, probs = fitted
+        test_idx = splits[0][1]
+        flipped = y.copy()
+        flipped[test_idx] = 1 - flipped[test_idx]
+        a = pipeline.fold_outputs(0, test_idx, y, tasks, probs, 'oof')
+        b = pipeline.fold_outputs(0, test_idx, flipped, tasks, probs, 'oof')
+        assert a['weights'] == b['weights'] and a['threshold'] == b['threshold']
+        np.testing.assert_array_equal(a['probs']['stacking'], b['probs']['stacking'])
+
+
+class TestRepeatedCV:
+    def test_repeat_zero_is_the_single_split(self, data):
+        import main as pipeline
+        _, y = data
+        single = list(StratifiedKFold(5, shuffle=True, random_state=42).split(y, y))
+        splits = pipeline.outer_cv_splits(y, 3)
+        assert len(splits) == 15
+        for (a_tr, a_te), (b_tr, b_te) in zip(splits[:5], single):
+            np.testing.assert_array_equal(a_te, b_te)
+        for r in range(3):
+            rows = np.concatenate([te for _, te in splits[5 * r:5 * r + 5]])
+            assert sorted(rows) == list(range(len(y)))
+        assert not np.array_equal(splits[0][1], splits[5][1])
+
+    def test_fold_batches(self):
+        import main as pipeline
+        assert pipeline.fold_batches([0, 1, 2], 1, 12) == [[0], [1], [2]]
+        assert pipeline.fold_batches(list(range(5)), 24, 12) == [[0, 1], [2, 3], [4]]
+
+    def test_repeat_metrics_summary(self, data):
+        import main as pipeline
+        from src.evaluate import evaluate_repeats
+        X, y = data
+        splits = pipeline.outer_cv_splits(y, 2)
+        tasks = [t for t in pipeline.expand_cv_tasks(y, splits) if t.inner is None]
+        probs = pipeline.run_cv_tasks(X, y, tasks)
+        results = [pipeline.fuse_fold(f, te, y, {m: probs[(f, None, m)] for m in pipeline.MODALITIES},
+                                      {m: [0.6] for m in pipeline.MODALITIES})
+                   for f, (_, te) in enumerate(splits)]
+        per_repeat = pipeline.repeat_metrics(results)
+        assert len(per_repeat) == 2 * 4
+        summary = evaluate_repeats(per_repeat, 0.9)
+        assert list(summary['Model']) == ['Text', 'Audio', 'Visual', 'Fusion']
+        fusion = per_repeat[per_repeat['Model'] == 'Fusion']['AUC']
+        row = summary.iloc[3]
+        assert row['Repeats'] == 2
+        assert row['AUC_mean'] == round(fusion.mean(), 4)
+        assert row['AUC_lo'] <= row['AUC_mean'] <= row['AUC_hi']
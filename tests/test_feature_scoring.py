@@ -0,0 +1,69 @@
+# tests/test_feature_scoring.py
+"""Tests for the vectorized mutual-information scorers (src/feature_scoring.py)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    y = (rng.rand(150) < 0.3).astype(int)
+    X = rng.randn(150, 40)
+    X[:, :5] += y[:, None] * np.array([0.5, 1.0, 1.5, 2.0, 3.0])
+    X[:, 10] = np.round(X[:, 10])          # heavily tied column
+    return X, y
+
+
+class TestBinnedMI:
+    def test_matches_histogram_formula(self, data):
+        from sklearn.metrics import mutual_info_score
+        from src.feature_scoring import binned_mutual_info, quantile_bins
+        X, y = data
+        codes = quantile_bins(X, 6)
+        expected = [mutual_info_score(codes[:, j], y) for j in range(X.shape[1])]
+        np.testing.assert_allclose(binned_mutual_info(X, y, n_bins=6), expected, atol=1e-12)
+
+    def test_ranks_informative_columns_first(self, data):
+        from src.feature_scoring import binned_mutual_info
+        X, y = data
+        scores = binned_mutual_info(X, y)
+        assert set(np.argsort(-scores)[:3]) == {2, 3, 4}
+        assert np.all(scores >= 0)
+
+
+class TestKnnMI:
+    @pytest.mark.parametrize('n_neighbors', [1, 3, 5])
+    def test_matches_sklearn_same_seed(self, data, n_neighbors):
+        from sklearn.feature_selection import mutual_info_classif
+        from src.feature_scoring import knn_mutual_info
+        X, y = data
+        expected = mutual_info_classif(X, y, n_neighbors=n_neighbors, random_state=7)
+        np.testing.assert_allclose(knn_mutual_info(X, y, n_neighbors, random_state=7),
+                                   expected, atol=1e-10)
+
+    def test_singleton_class_is_dropped(self, data):
+        from sklearn.feature_selection import mutual_info_classif
+        from src.feature_scoring import knn_mutual_info
+        X, y = data
+        y = y.copy()
+        y[0] = 2
+        np.testing.assert_allclose(knn_mutual_info(X, y, random_state=0),
+                                   mutual_info_classif(X, y, random_state=0), atol=1e-10)
+
+
+class TestScoreFunc:
+    def test_select_k_best(self, data):
+        from sklearn.feature_selection import SelectKBest
+        from src.feature_scoring import mi_score_func
+        X, y = data
+        for scorer in ('sklearn', 'binned', 'knn'):
+            sel = SelectKBest(mi_score_func(0, scorer), k=5).fit(X, y)
+            assert sel.get_support().sum() == 5
+
+    def test_unknown_scorer(self):
+        from src.feature_scoring import mi_score_func
+        with pytest.raises(ValueError):
+            mi_score_func(0, 'entropy')
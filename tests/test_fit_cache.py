@@ -0,0 +1,81 @@
+# tests/test_fit_cache.py
+"""Tests for the on-disk preprocessing fit cache (src/fit_cache.py)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    y = np.array([0, 0, 1] * 20)
+    X = rng.randn(60, 30)
+    X[:, 3] = 1.0  # constant column for VarianceThreshold
+    return X, y
+
+
+class TestFitCache:
+    def test_hit_gives_identical_predictions(self, data, tmp_path):
+        import main as pipeline
+        from src.fit_cache import FitCache, fit_pipeline_cached
+        X, y = data
+        reference = pipeline.build_modality_pipeline('audio', X.shape[1], 3).fit(X, y)
+        cache = FitCache(str(tmp_path))
+        for _ in range(2):
+            pipe = pipeline.build_modality_pipeline('audio', X.shape[1], 3)
+            fit_pipeline_cached(pipe, X, y, cache)
+            np.testing.assert_array_equal(pipe.predict_proba(X), reference.predict_proba(X))
+        assert cache.stats['misses'] == 1 and cache.stats['hits'] == 1
+
+    def test_key_tracks_data_and_params(self, data):
+        import main as pipeline
+        from src.fit_cache import FitCache, _prefix_length
+        X, y = data
+
+        def prefix(seed):
+            steps = pipeline.build_modality_pipeline('audio', X.shape[1], 3, seed).steps
+            return steps[:_prefix_length(steps)]
+
+        base = FitCache.key(prefix(1), X, y)
+        assert base == FitCache.key(prefix(1), X.copy(), y)
+        assert base != FitCache.key(prefix(2), X, y)
+        assert base != FitCache.key(prefix(1), X[:-1], y[:-1])
+
+    def test_prefix_stops_at_resampler(self):
+        import main as pipeline
+        from src.fit_cache import _prefix_length
+        steps = pipeline.build_modality_pipeline('visual', 12, 3).steps
+        assert not hasattr(steps[_prefix_length(steps)][1], 'transform')
+
+    def test_lru_eviction(self, tmp_path):
+        from src.fit_cache import FitCache
+        cache = FitCache(str(tmp_path), max_bytes=10**9)
+        for i in range(3):
+            cache.put(f'k{i}', np.zeros(10_000))
+            os.utime(cache._path(f'k{i}'), (i, i))
+        cache.get('k0')  # refresh: k1 is now the oldest
+        cache.max_bytes = cache.size_bytes() - 1
+        cache.evict()
+        assert cache.get('k1') is None
+        assert cache.get('k0') is not None and cache.get('k2') is not None
+        assert cache.stats['evictions'] == 1
+
+    def test_cv_tasks_warm_run_all_hits(self, tmp_path):
+        import main as pipeline
+        from sklearn.model_selection import StratifiedKFold
+        from src.fit_cache import FitCache
+        rng = np.random.RandomState(0)
+        y = np.array([0, 0, 1] * 20)
+        X = {'text': rng.randn(60, 8), 'audio': rng.randn(60, 70), 'visual': rng.randn(60, 12)}
+        splits = list(StratifiedKFold(5, shuffle=True, random_state=42).split(y, y))
+        tasks = [t for t in pipeline.expand_cv_tasks(y, splits) if t.fold == 0 and t.inner is None]
+
+        cache = FitCache(str(tmp_path))
+        cold = pipeline.run_cv_tasks(X, y, tasks, cache=cache)
+        cache.reset_stats()
+        warm = pipeline.run_cv_tasks(X, y, tasks, cache=cache)
+        assert cache.stats['hits'] == len(tasks) and cache.stats['misses'] == 0
+        for key in cold:
+            np.testing.assert_array_equal(cold[key], warm[key])
@@ -0,0 +1,98 @@
+# tests/test_hyperparam_search.py
+"""Tests for the successive-halving ensemble search (src/hyperparam_search.py)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import numpy as np
+import pytest
+from functools import partial
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    y = np.array([0, 0, 1] * 20)
+    X = rng.randn(60, 8)
+    X[:, 0] += y
+    return X, y
+
+
+class TestSchedule:
+    def test_rungs_and_cost(self):
+        from src.hyperparam_search import rung_schedule, plan_fits
+        rungs = rung_schedule(64, eta=3, min_folds=1, max_folds=9)
+        assert rungs == [(64, 1), (22, 3), (8, 9)]
+        assert plan_fits(rungs) == 64 * 1 + 22 * 2 + 8 * 6
+        assert rung_schedule(1, 3, 1, 9) == [(1, 1), (1, 9)]
+        assert rung_schedule(4, 3, 1, 4)[-1] == (1, 4)
+
+    def test_budget_subsamples_candidates(self):
+        from src.hyperparam_search import candidate_params, plan_fits, rung_schedule
+        space = {'a': [1, 2, 3, 4], 'b': [1, 2, 3, 4]}
+        assert len(candidate_params(space, 10**6, 3, 1, 9)) == 16
+        few = candidate_params(space, 30, 3, 1, 9)
+        assert 1 <= len(few) < 16
+        assert plan_fits(rung_schedule(len(few), 3, 1, 9)) <= 30
+
+
+class TestSuccessiveHalving:
+    def test_search_trace_and_budget(self, data, tmp_path):
+        import main as pipeline
+        from src.fit_cache import FitCache
+        from src.hyperparam_search import successive_halving, write_search_results
+        X, y = data
+        space = {'clf__lr__C': [0.01, 1.0], 'clf__svc__C': [0.1, 1.0]}
+        build = partial(pipeline.search_pipeline, 'text', X.shape[1])
+        cache = FitCache(str(tmp_path / 'cache'))
+        best, trace, budget = successive_halving(build, X, y, space, eta=2, min_folds=1,
+                                                 max_folds=4, max_fits=100, cache=cache, label='text')
+        assert best in [json.loads(p) for p in trace['params']]
+        assert budget['fits'] == 4 * 1 + 2 * 1 + 1 * 2 <= budget['max_fits']
+        last = trace[trace['rung'] == trace['rung'].max()]
+        assert last['n_folds'].iloc[0] == 4 and last['promoted'].sum() == 1
+        # Candidates share each fold's preprocessing prefix
+        assert cache.stats['misses'] == 4 and cache.stats['hits'] == budget['fits'] - 4
+
+        trace_path, best_path = write_search_results(
+            {'text': best}, [trace], {'text': budget},
+            str(tmp_path / 'trace.csv'), str(tmp_path / 'best.json'))
+        with open(best_path) as f:
+            assert json.load(f)['best']['text']['params'] == best
+
+    def test_best_params_build_the_pipeline(self, data, tmp_path):
+        import main as pipeline
+        import pandas as pd
+        from src.hyperparam_search import load_search_best, write_search_results
+        X, y = data
+        best = {'clf__lr__C': 0.01, 'clf__rf__max_depth': 4}
+        budget = {'fits': 1, 'full_grid_fits': 2, 'seconds': 0.0}
+        _, best_path = write_search_results(
+            {'text': best}, [pd.DataFrame([{'rung': 0}])], {'text': budget},
+            str(tmp_path / 'trace.csv'), str(tmp_path / 'best.json'))
+        params = load_search_best(best_path)
+        assert params == {'text': best}
+
+        pipe = pipeline.build_modality_pipeline('text', X.shape[1], 3, params=params['text'])
+        ensemble = dict(pipe.named_steps['clf'].estimators)
+        assert ensemble['lr'].C == 0.01 and ensemble['rf'].max_depth == 4
+
+        tasks = [t for t in pipeline.expand_cv_tasks(y, [(np.arange(40), np.arange(40, 60))])
+                 if t.inner is None and t.modality == 'text']
+        tuned = pipeline.run_cv_tasks({'text': X}, y, tasks, params=params)
+        plain = pipeline.run_cv_tasks({'text': X}, y, tasks)
+        fitted = pipe.fit(X[:40], y[:40]).predict_proba(X[40:])[:, 1]
+        np.testing.assert_allclose(tuned[(0, None, 'text')], fitted)
+        assert not np.allclose(plain[(0, None, 'text')], fitted)
+
+    def test_parallel_matches_serial(self, data):
+        import main as pipeline
+        from src.hyperparam_search import successive_halving
+        X, y = data
+        space = {'clf__lr__C': [0.01, 1.0]}
+        build = partial(pipeline.search_pipeline, 'text', X.shape[1])
+        kw = dict(space=space, eta=2, min_folds=1, max_folds=2, max_fits=10)
+        serial = successive_halving(build, X, y, jobs=1, **kw)
+        parallel = successive_halving(build, X, y, jobs=2, **kw)
+        assert serial[0] == parallel[0]
+        np.testing.assert_array_equal(serial[1]['mean_auc'], parallel[1]['mean_auc'])
@@ -0,0 +1,120 @@
+# tests/test_modality_scorer.py
+"""Tests for the shared modality probability cache (src/fusion.py ModalityScorer)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+
+class CountingModel:
+    """LogisticRegression that counts predict_proba calls."""
+
+    def __init__(self, X, y):
+        self.model = LogisticRegression().fit(X, y)
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+
+@pytest.fixture
+def fitted():
+    rng = np.random.RandomState(0)
+    y = np.array([0, 0, 1] * 30)
+    X_dict, models_scalers = {}, {}
+    for m, d in [('text', 6), ('audio', 10), ('visual', 4)]:
+        X = rng.randn(90, d)
+        X[:, 0] += y
+        mask = np.arange(d) < d - 1
+        scaler = StandardScaler().fit(X[:, mask])
+        model = CountingModel(scaler.transform(X[:, mask]), y)
+        X_dict[m] = X
+        models_scalers[m] = (model, {'scaler': scaler, 'feature_mask': mask})
+    return models_scalers, X_dict, y
+
+
+def _calls(models_scalers):
+    return {m: model.calls for m, (model, _) in models_scalers.items()}
+
+
+class TestModalityScorer:
+    def test_scores_match_direct_prediction(self, fitted):
+        from src.fusion import ModalityScorer, transform_with_selector
+        models_scalers, X_dict, _ = fitted
+        probs = ModalityScorer(models_scalers).predict_proba(X_dict)
+        for m, (model, artifacts) in models_scalers.items():
+            X_sc = artifacts['scaler'].transform(transform_with_selector(X_dict[m], artifacts))
+            np.testing.assert_array_equal(probs[m], model.model.predict_proba(X_sc)[:, 1])
+
+    def test_memoized_by_identity_and_content(self, fitted):
+        from src.fusion import ModalityScorer
+        models_scalers, X_dict, _ = fitted
+        scorer = ModalityScorer(models_scalers)
+        scorer.score(X_dict)
+        scorer.score(X_dict)
+        scorer.score({m: X.copy() for m, X in X_dict.items()})
+        assert _calls(models_scalers) == {'text': 1, 'audio': 1, 'visual': 1}
+        assert scorer.stats == {'hits': 6, 'misses': 3}
+        scorer.score({'text': X_dict['text'][:10]})
+        assert _calls(models_scalers)['text'] == 2
+
+    def test_threaded_matches_serial(self, fitted):
+        from src.fusion import ModalityScorer
+        models_scalers, X_dict, _ = fitted
+        serial = ModalityScorer(models_scalers, max_workers=1).predict_proba(X_dict)
+        threaded = ModalityScorer(models_scalers, max_workers=3).predict_proba(X_dict)
+        for m in serial:
+            np.testing.assert_array_equal(serial[m], threaded[m])
+
+
+class TestFusionStrategies:
+    def test_late_fusion_scores_each_modality_once(self, fitted):
+        from src.fusion import ModalityScorer, late_fusion_predict, train_meta_learner
+        models_scalers, X_dict, y = fitted
+        scorer = ModalityScorer(models_scalers)
+        preds, fused = late_fusion_predict(models_scalers, X_dict, y_val=y, scorer=scorer)
+        meta = train_meta_learner(models_scalers, X_dict, y, scorer=scorer)
+        assert _calls(models_scalers) == {'text': 1, 'audio': 1, 'visual': 1}
+        assert meta.coef_.shape == (1, 3)
+        assert fused.shape == (90,) and set(np.unique(preds)) <= {0, 1}
+
+    def test_default_scorer_sees_a_retrained_model(self, fitted):
+        from src.fusion import late_fusion_predict
+        models_scalers, X_dict, y = fitted
+        late_fusion_predict(models_scalers, X_dict, y_val=y)
+        model, artifacts = models_scalers['text']
+        X_sc = artifacts['scaler'].transform(X_dict['text'][:, artifacts['feature_mask']])
+        retrained = CountingModel(X_sc, 1 - y)
+        models_scalers['text'] = (retrained, artifacts)  # retrained under the same dict
+        late_fusion_predict(models_scalers, X_dict, y_val=y)
+        assert model.calls == 1 and retrained.calls == 1
+
+    def test_late_fusion_weights_unchanged(self, fitted):
+        from src.fusion import late_fusion_predict
+        from sklearn.metrics import roc_auc_score
+        models_scalers, X_dict, y = fitted
+        _, fused = late_fusion_predict(models_scalers, X_dict, y_val=y)
+        probs = {m: model.model.predict_proba(
+            a['scaler'].transform(X_dict[m][:, a['feature_mask']]))[:, 1]
+            for m, (model, a) in models_scalers.items()}
+        w = {m: max(0.01, roc_auc_score(y, p) - 0.5) for m, p in probs.items()}
+        total = sum(w.values())
+        expected = sum(probs[m] * w[m] / total for m in probs if w[m] / total > 0.01)
+        np.testing.assert_allclose(fused, expected)
+
+    def test_attention_fusion_through_scorer(self, fitted):
+        from src.fusion import AttentionFusion, ModalityScorer
+        models_scalers, X_dict, y = fitted
+        scorer = ModalityScorer(models_scalers)
+        direct = AttentionFusion().fit(scorer.predict_proba(X_dict), y)
+        via = AttentionFusion().fit_features(X_dict, y, scorer)
+        assert via.get_weights() == direct.get_weights()
+        np.testing.assert_array_equal(via.predict_features(X_dict)[0],
+                                      direct.predict_proba(scorer.predict_proba(X_dict))[0])
+        assert _calls(models_scalers) == {'text': 1, 'audio': 1, 'visual': 1}
+        with pytest.raises(ValueError):
+            AttentionFusion().fit(scorer.predict_proba(X_dict), y).predict_features(X_dict)
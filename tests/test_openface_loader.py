@@ -0,0 +1,57 @@
+# tests/test_openface_loader.py
+"""Tests for the shared OpenFace loader in src/openface_loader.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def openface_root(tmp_path):
+    rng = np.random.RandomState(0)
+    n = 200
+    df = pd.DataFrame({
+        'frame': np.arange(n), 'timestamp': np.arange(n) / 30.0,
+        'confidence': np.round(rng.uniform(0.7, 1.0, n), 2),
+        'success': (rng.rand(n) > 0.1).astype(int),
+        'gaze_angle_x': rng.randn(n), 'pose_Rx': rng.randn(n),
+        'AU01_r': rng.uniform(0, 5, n), 'AU12_r': rng.uniform(0, 5, n),
+        'AU12_c': (rng.rand(n) > 0.5).astype(int),
+        'x_0': rng.randn(n),  # landmark-style column the extractors never use
+    })
+    feat_dir = tmp_path / '300_P' / 'features'
+    feat_dir.mkdir(parents=True)
+    df.to_csv(feat_dir / '300_OpenFace2.1.0_Pose_gaze_AUs.csv', index=False)
+    return str(tmp_path), df
+
+
+class TestOpenFaceLoader:
+    def test_pruned_float32_and_filtered(self, openface_root):
+        from src.openface_loader import clear_openface_cache, load_openface
+        clear_openface_cache()
+        root, raw = openface_root
+        df = load_openface(300, root)
+        assert set(df.columns) == {'confidence', 'success', 'gaze_angle_x', 'pose_Rx',
+                                   'AU01_r', 'AU12_r', 'AU12_c'}
+        assert all(dt == np.float32 for dt in df.dtypes)
+        expected = raw[(raw['confidence'] >= 0.80) & (raw['success'] == 1)]
+        assert len(df) == len(expected)
+        np.testing.assert_allclose(df['AU01_r'], expected['AU01_r'], rtol=1e-6)
+
+    def test_stricter_threshold_matches_float64(self, openface_root):
+        from src.openface_loader import load_openface, select_confident
+        root, raw = openface_root
+        strict = select_confident(load_openface(300, root), 0.85)
+        expected = raw[(raw['confidence'] >= 0.85) & (raw['success'] == 1)]
+        assert len(strict) == len(expected)
+
+    def test_cache_hit_and_missing_file(self, openface_root):
+        from src.openface_loader import cache_stats, clear_openface_cache, load_openface
+        clear_openface_cache()
+        root, _ = openface_root
+        first = load_openface(300, root)
+        assert load_openface(300, root) is first
+        assert cache_stats == {'hits': 1, 'misses': 1}
+        assert load_openface(999, root) is None
@@ -0,0 +1,74 @@
+# tests/test_profiling.py
+"""Tests for the per-estimator pipeline profiler (src/profiling.py)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    y = np.array([0, 0, 1] * 20)
+    X = {'text': rng.randn(60, 8), 'audio': rng.randn(60, 70), 'visual': rng.randn(60, 12)}
+    return X, y
+
+
+class TestPipelineProfiler:
+    def test_results_unchanged_and_classes_restored(self, data):
+        import main as pipeline
+        from sklearn.svm import SVC
+        from src.profiling import PipelineProfiler, pipeline_estimator_types
+        X, y = data
+        svc_fit = SVC.fit
+        expected = pipeline.build_modality_pipeline('audio', 70, 3).fit(X['audio'], y).predict_proba(X['audio'])
+        pipe = pipeline.build_modality_pipeline('audio', 70, 3)
+        profiler = PipelineProfiler()
+        with profiler.instrument(pipeline_estimator_types(pipe)):
+            pipe.fit(X['audio'], y)
+            probs = pipe.predict_proba(X['audio'])
+        np.testing.assert_array_equal(probs, expected)
+        assert SVC.fit is svc_fit and 'fit' not in SVC.__dict__
+
+    def test_records_members_and_nesting(self, data):
+        import main as pipeline
+        from src.profiling import PipelineProfiler, pipeline_estimator_types
+        X, y = data
+        pipe = pipeline.build_modality_pipeline('visual', 12, 3)
+        profiler = PipelineProfiler()
+        with profiler.instrument(pipeline_estimator_types(pipe)), profiler.labelled(modality='visual'):
+            pipe.fit(X['visual'], y)
+        fits = {(r['estimator'], r['method']): r for r in profiler.records}
+        for name in ('SVC', 'RandomForestClassifier', 'GradientBoostingClassifier', 'LogisticRegression'):
+            assert fits[(name, 'fit')]['leaf'] and fits[(name, 'fit')]['depth'] == 1
+        assert not fits[('VotingClassifier', 'fit')]['leaf']
+        assert ('PCA', 'fit_transform') in fits and ('PCA', 'fit') not in fits
+        assert all(r['modality'] == 'visual' and r['wall_s'] >= 0 for r in profiler.records)
+
+    def test_cv_tasks_profile_and_report(self, data, tmp_path):
+        import pstats
+        import main as pipeline
+        from sklearn.model_selection import StratifiedKFold
+        from src.profiling import slowest_step, write_profile
+        X, y = data
+        splits = list(StratifiedKFold(5, shuffle=True, random_state=42).split(y, y))
+        tasks = [t for t in pipeline.expand_cv_tasks(y, splits) if t.fold == 0 and t.inner is None]
+        records = []
+        plain = pipeline.run_cv_tasks(X, y, tasks)
+        profiled = pipeline.run_cv_tasks(X, y, tasks, profile_records=records)
+        for key in plain:
+            np.testing.assert_array_equal(plain[key], profiled[key])
+        assert {r['modality'] for r in records} == set(pipeline.MODALITIES)
+
+        path = write_profile(records, str(tmp_path / 'profile.json'), jobs=1)
+        with open(path) as f:
+            payload = json.load(f)
+        assert len(payload['records']) == len(records) and payload['summary']
+
+        modality, estimator, method = slowest_step(records)
+        profiler = pipeline.run_cv_task(X[modality], y, tasks[0]._replace(modality=modality),
+                                        profile=True, pstats_target=(estimator, method)).profile
+        stats = pstats.Stats(profiler.dump_stats(str(tmp_path / 'slow.pstats')))
+        assert stats.total_calls > 0
@@ -0,0 +1,90 @@
+# tests/test_reporting.py
+"""Tests for the decoupled, cached report stage (src/reporting.py)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import subprocess
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def cv_outputs(tmp_path):
+    from src.reporting import save_cv_outputs
+    rng = np.random.RandomState(0)
+    y = np.array([0, 0, 1] * 20)
+    probs = {m: np.clip(0.3 * y + rng.rand(60) * 0.7, 0, 1) for m in ('Text', 'Audio', 'Visual', 'Fusion')}
+    fold_aucs = {k: [0.6, 0.7] for k in ('text', 'audio', 'visual', 'fusion')}
+    weights = {'text': 0.5, 'audio': 0.2, 'visual': 0.3}
+    save_cv_outputs(str(tmp_path), np.repeat([0, 1], 30), y, probs, fold_aucs, weights, 0.42)
+    pd.DataFrame([{'Model': m, 'AUC': 0.7, 'Accuracy': 0.6, 'Balanced_Accuracy': 0.6, 'F1': 0.5,
+                   'Precision': 0.5, 'Recall': 0.5} for m in probs]).to_csv(
+        tmp_path / 'final_metrics.csv', index=False)
+    return tmp_path
+
+
+class TestReporting:
+    def test_import_does_not_load_matplotlib(self):
+        code = "import sys; import src.reporting, src.evaluate; print('matplotlib' in sys.modules)"
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                             cwd=os.path.join(os.path.dirname(__file__), '..'))
+        assert out.stdout.strip() == 'False', out.stderr
+
+    def test_outputs_round_trip(self, cv_outputs):
+        from src.reporting import load_cv_outputs
+        oof, summary, metrics = load_cv_outputs(str(cv_outputs))
+        assert list(oof.columns) == ['fold', 'y_true', 'text', 'audio', 'visual', 'fusion']
+        assert summary['fusion_threshold'] == 0.42 and len(metrics) == 4
+
+    def test_render_then_skip_unchanged(self, cv_outputs):
+        from src.reporting import render_report
+        first = render_report(str(cv_outputs), workers=1)
+        assert len(first['rendered']) == 9 and not first['skipped']
+        assert all((cv_outputs / f).exists() for f in first['rendered'])
+        again = render_report(str(cv_outputs), workers=1)
+        assert not again['rendered'] and len(again['skipped']) == 9
+
+    def test_only_changed_figures_rerender(self, cv_outputs):
+        import json
+        from src.reporting import render_report, SUMMARY_FILE
+        render_report(str(cv_outputs), workers=1)
+        path = cv_outputs / SUMMARY_FILE
+        summary = json.loads(path.read_text())
+        summary['fusion_threshold'] = 0.5
+        path.write_text(json.dumps(summary))
+        stats = render_report(str(cv_outputs), workers=1)
+        assert sorted(stats['rendered']) == ['confusion_matrix_normalized.png', 'confusion_matrix_raw.png']
+        (cv_outputs / 'roc_curves_final.png').unlink()
+        assert render_report(str(cv_outputs), workers=1)['rendered'] == ['roc_curves_final.png']
+        assert len(render_report(str(cv_outputs), workers=1, force=True)['rendered']) == 9
+
+    def test_helper_source_is_hashed(self, monkeypatch):
+        import src.reporting as rep
+        inputs = {'y_true': [0, 1], 'Fusion': [0.2, 0.9], 'threshold': 0.5}
+        before = rep.figure_hash('confusion_pair_figure', inputs)
+
+        def _fusion_confusion(inp):  # same name, different source
+            return None, None
+        monkeypatch.setattr(rep, 'HELPERS', (rep.pyplot, _fusion_confusion))
+        assert rep.figure_hash('confusion_pair_figure', inputs) != before
+
+    def test_process_pool(self, cv_outputs):
+        from src.reporting import render_report
+        stats = render_report(str(cv_outputs), workers=2)
+        assert len(stats['rendered']) == 9
+
+
+class TestEvaluatePlots:
+    def test_plot_flag_and_cache(self, tmp_path, monkeypatch):
+        import src.evaluate as ev
+        monkeypatch.setattr(ev, 'RESULTS_DIR', str(tmp_path))
+        y = np.array([0, 1, 0, 1, 1, 0])
+        p = np.array([0.1, 0.9, 0.4, 0.6, 0.3, 0.2])
+        ev.evaluate(y, (p > 0.5).astype(int), p, name='LR Text', plot=False)
+        assert not (tmp_path / 'LR_Text_confusion_matrix.png').exists()
+        ev.evaluate(y, (p > 0.5).astype(int), p, name='LR Text')
+        png = tmp_path / 'LR_Text_confusion_matrix.png'
+        mtime = png.stat().st_mtime_ns
+        ev.evaluate(y, (p > 0.5).astype(int), p, name='LR Text')
+        assert png.stat().st_mtime_ns == mtime
@@ -0,0 +1,91 @@
+# tests/test_streaming_stats.py
+"""Tests for the single-pass accumulators in src/streaming_stats.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+from scipy import stats as sp_stats
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.RandomState(0)
+    return rng.gamma(2.0, size=(3001, 5))
+
+
+def _chunks(X, sizes=(1, 7, 500, 1, 1200)):
+    start = 0
+    for size in sizes:
+        yield X[start:start + size]
+        start += size
+    if start < len(X):
+        yield X[start:]
+
+
+class TestRunningMoments:
+    def test_matches_numpy_across_chunks(self, frames):
+        from src.streaming_stats import RunningMoments
+        acc = RunningMoments()
+        for chunk in _chunks(frames):
+            acc.update(chunk)
+        np.testing.assert_allclose(acc.mean, frames.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(acc.std(ddof=1), frames.std(axis=0, ddof=1), rtol=1e-10)
+        np.testing.assert_allclose(acc.skew(), sp_stats.skew(frames), rtol=1e-9)
+        np.testing.assert_allclose(acc.kurtosis(fisher=False),
+                                   sp_stats.kurtosis(frames, fisher=False), rtol=1e-9)
+        np.testing.assert_array_equal(acc.min, frames.min(axis=0))
+        np.testing.assert_array_equal(acc.max, frames.max(axis=0))
+
+    def test_merge_equals_single_pass(self, frames):
+        from src.streaming_stats import RunningMoments
+        left = RunningMoments().update(frames[:1000])
+        right = RunningMoments().update(frames[1000:])
+        whole = RunningMoments().update(frames)
+        left.merge(right)
+        np.testing.assert_allclose(left.var(), whole.var(), rtol=1e-12)
+
+    def test_nan_skipped_per_column(self):
+        from src.streaming_stats import RunningMoments
+        X = np.array([[1.0, np.nan], [3.0, 2.0], [5.0, 4.0]])
+        acc = RunningMoments().update(X[:1]).update(X[1:])
+        np.testing.assert_allclose(acc.mean, [3.0, 3.0])
+        np.testing.assert_allclose(acc.count, [3, 2])
+
+
+class TestQuantileSketch:
+    def test_exact_below_capacity(self, frames):
+        from src.streaming_stats import QuantileSketch
+        sk = QuantileSketch(k=4096)
+        for chunk in _chunks(frames):
+            sk.update(chunk)
+        assert sk.is_exact
+        np.testing.assert_allclose(sk.quantile([0.25, 0.5, 0.75]),
+                                   np.percentile(frames, [25, 50, 75], axis=0))
+
+    def test_rank_error_within_bound(self, frames):
+        from src.streaming_stats import QuantileSketch
+        k = 64
+        left = QuantileSketch(k=k).update(frames[:1500])
+        right = QuantileSketch(k=k, seed=1).update(frames[1500:])
+        left.merge(right)
+        n = len(frames)
+        bound = (np.log2(n / k) + 1) / k
+        est = left.median()
+        ranks = (frames <= est).mean(axis=0)
+        assert np.all(np.abs(ranks - 0.5) <= bound)
+
+
+class TestDeltaStats:
+    @pytest.mark.parametrize('mode', ['diff', 'gradient'])
+    def test_chunked_deltas_are_exact(self, frames, mode):
+        from src.streaming_stats import DeltaStats
+        acc = DeltaStats(mode)
+        for chunk in _chunks(frames):
+            acc.update(chunk)
+        delta, abs_delta = acc.finalize()
+        ref = np.diff(frames, axis=0) if mode == 'diff' else np.gradient(frames, axis=0)
+        np.testing.assert_allclose(delta.mean, ref.mean(axis=0), rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(delta.std(), ref.std(axis=0), rtol=1e-9)
+        np.testing.assert_allclose(abs_delta.mean, np.abs(ref).mean(axis=0), rtol=1e-9)
+        assert delta.count[0] == len(ref)
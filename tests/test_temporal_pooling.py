@@ -0,0 +1,87 @@
+# tests/test_temporal_pooling.py
+"""Tests for the shared visual frame pooling in src/temporal_pooling.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+class TestPoolFrames:
+    def test_default_is_identity(self):
+        from src.temporal_pooling import is_identity, pool_frames
+        X = np.arange(20.0).reshape(10, 2)
+        assert is_identity()
+        assert pool_frames(X) is X
+
+    def test_stride_window_and_cap(self):
+        from src.temporal_pooling import PoolingSettings, pool_frames
+        X = np.arange(10.0).reshape(10, 1)
+        assert pool_frames(X, PoolingSettings(3, 1, 'mean', 0)).ravel().tolist() == [0, 3, 6, 9]
+        # Trailing partial window is pooled over the frames it has
+        assert pool_frames(X, PoolingSettings(1, 4, 'mean', 0)).ravel().tolist() == [1.5, 5.5, 8.5]
+        assert pool_frames(X, PoolingSettings(1, 4, 'max', 0)).ravel().tolist() == [3, 7, 9]
+        # Cap keeps first and last frame, evenly spaced
+        assert pool_frames(X, PoolingSettings(1, 1, 'mean', 4)).ravel().tolist() == [0, 3, 6, 9]
+        assert pool_frames(X, PoolingSettings(2, 2, 'mean', 2)).ravel().tolist() == [1, 8]
+
+    def test_nan_windows(self):
+        from src.temporal_pooling import PoolingSettings, pool_frames
+        X = np.array([[np.nan], [2.0], [np.nan], [np.nan]])
+        out = pool_frames(X, PoolingSettings(1, 2, 'mean', 0))
+        assert out[0, 0] == 2.0 and np.isnan(out[1, 0])
+
+    def test_settings_override_restores(self):
+        from src.temporal_pooling import current_settings, pooling_settings
+        before = current_settings()
+        with pooling_settings(stride=5, mode='max') as s:
+            assert current_settings() == s and s.stride == 5
+        assert current_settings() == before
+        with pytest.raises(ValueError):
+            with pooling_settings(mode='median'):
+                pass
+
+    def test_pool_dataframe_keeps_columns(self):
+        from src.temporal_pooling import PoolingSettings, pool_dataframe
+        df = pd.DataFrame({'AU12_r': np.arange(6.0), 'AU12_c': [0, 1, 1, 1, 0, 0]})
+        out = pool_dataframe(df, PoolingSettings(1, 3, 'mean', 0))
+        assert list(out.columns) == ['AU12_r', 'AU12_c']
+        assert out['AU12_c'].tolist() == pytest.approx([2 / 3, 1 / 3])
+
+
+class TestExtractorPooling:
+    def test_cnn_stride_applied_while_parsing(self, tmp_path):
+        from src.temporal_pooling import pooling_settings
+        from src.visual_features_enhanced import aggregate_temporal_matrix, extract_cnn_matrix
+        rng = np.random.RandomState(0)
+        X = rng.randn(50, 3).astype(np.float32)
+        df = pd.DataFrame(X, columns=['a', 'b', 'c'])
+        df.insert(0, 'name', [f'f{i}' for i in range(50)])
+        feat_dir = tmp_path / '300_P' / 'features'
+        feat_dir.mkdir(parents=True)
+        df.to_csv(feat_dir / '300_densenet201.csv', index=False)
+
+        with pooling_settings(stride=4, window=2, mode='max'):
+            matrix, _, _ = extract_cnn_matrix([300], str(tmp_path))
+        pooled = np.maximum.reduceat(X[::4], np.arange(0, 13, 2), axis=0)
+        np.testing.assert_allclose(matrix[0], aggregate_temporal_matrix(pooled), rtol=1e-5)
+
+    def test_openface_extractors_see_pooled_frames(self, tmp_path):
+        from src.openface_loader import clear_openface_cache
+        from src.temporal_pooling import pooling_settings
+        from src.visual_features import extract_openface_basic
+        n = 60
+        df = pd.DataFrame({'confidence': np.ones(n), 'success': np.ones(n),
+                           'AU12_r': np.arange(n, dtype=float)})
+        feat_dir = tmp_path / '300_P' / 'features'
+        feat_dir.mkdir(parents=True)
+        df.to_csv(feat_dir / '300_OpenFace2.1.0_Pose_gaze_AUs.csv', index=False)
+        clear_openface_cache()
+        with pooling_settings(max_frames=3):
+            record = extract_openface_basic(300, str(tmp_path))
+        assert record['AU12_r_max'] == n - 1 and record['AU12_r_mean'] == pytest.approx((0 + 30 + 59) / 3)
+        # The cached frames themselves are left untouched
+        assert extract_openface_basic(300, str(tmp_path))['AU12_r_std'] == pytest.approx(
+            df['AU12_r'].std(), rel=1e-6)
+        clear_openface_cache()
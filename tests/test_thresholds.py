@@ -0,0 +1,105 @@
+# tests/test_thresholds.py
+"""Tests for the sort-based threshold engine (src/thresholds.py)."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+from sklearn.metrics import confusion_matrix, f1_score, fbeta_score, roc_curve
+
+
+@pytest.fixture
+def data():
+    rng = np.random.RandomState(0)
+    y = (rng.rand(120) < 0.3).astype(int)
+    probs = np.round(np.clip(0.3 * y + rng.rand(120) * 0.7, 0, 1), 2)   # many ties
+    return y, probs
+
+
+class TestThresholdCurve:
+    def test_grid_counts_match_confusion_matrix(self, data):
+        from src.thresholds import threshold_curve
+        y, probs = data
+        grid = np.arange(0.1, 0.9, 0.01)
+        curve = threshold_curve(y, probs, grid)
+        for k, t in enumerate(grid):
+            tn, fp, fn, tp = confusion_matrix(y, probs >= t, labels=[0, 1]).ravel()
+            assert (curve.tp[k], curve.fp[k], curve.fn[k], curve.tn[k]) == (tp, fp, fn, tn)
+
+    def test_exact_cuts_match_roc_curve(self, data):
+        from src.thresholds import threshold_curve
+        y, probs = data
+        curve = threshold_curve(y, probs)
+        fpr, tpr, thresholds = roc_curve(y, probs, drop_intermediate=False)
+        np.testing.assert_array_equal(curve.thresholds[1:], thresholds[1:])
+        assert curve.thresholds[0] == np.inf and curve.tp[0] == curve.fp[0] == 0
+        np.testing.assert_array_equal(curve.tp / y.sum(), tpr)
+        np.testing.assert_array_equal(curve.fp / (1 - y).sum(), fpr)
+
+
+class TestObjectives:
+    def test_f_scores_match_sklearn(self, data):
+        from src.thresholds import threshold_curve, objective_scores
+        y, probs = data
+        grid = np.arange(0.25, 0.65, 0.01)
+        curve = threshold_curve(y, probs, grid)
+        f1 = objective_scores(curve, 'f1')
+        f2 = objective_scores(curve, 'fbeta', beta=2.0)
+        for k, t in enumerate(grid):
+            assert f1[k] == pytest.approx(f1_score(y, probs >= t, zero_division=0))
+            assert f2[k] == pytest.approx(fbeta_score(y, probs >= t, beta=2.0, zero_division=0))
+
+    def test_best_threshold_tie_breaking(self):
+        from src.thresholds import best_threshold
+        y = np.array([0, 0, 1, 1])
+        probs = np.array([0.1, 0.2, 0.6, 0.8])
+        # Every grid cut in (0.2, 0.6] separates the classes: the lowest wins
+        assert best_threshold(y, probs, 'f1', grid=[0.1, 0.3, 0.5, 0.7]) == (0.3, 1.0)
+        # Exact cuts: the highest perfect cut, as argmax over roc_curve
+        assert best_threshold(y, probs, 'youden') == (0.6, 1.0)
+
+    def test_cost_and_sensitivity_constraint(self, data):
+        from src.thresholds import threshold_curve, objective_scores, best_threshold
+        y, probs = data
+        curve = threshold_curve(y, probs)
+        cost = -objective_scores(curve, 'cost', fn_cost=5, fp_cost=1)
+        np.testing.assert_array_equal(cost, 5 * curve.fn + curve.fp)
+        t, spec = best_threshold(y, probs, 'sensitivity', min_sensitivity=0.9)
+        tn, fp, fn, tp = confusion_matrix(y, probs >= t).ravel()
+        assert tp / (tp + fn) >= 0.9 and spec == pytest.approx(tn / (tn + fp))
+        # No cut with higher specificity meets the constraint
+        sens = curve.tp / (curve.tp + curve.fn)
+        spec_all = curve.tn / (curve.tn + curve.fp)
+        assert spec == spec_all[sens >= 0.9].max()
+        with pytest.raises(ValueError):
+            objective_scores(curve, 'accuracy')
+
+
+class TestWrappers:
+    def test_find_optimal_threshold_matches_roc_argmax(self, data):
+        import main as pipeline
+        y, probs = data
+        fpr, tpr, thresholds = roc_curve(y, probs)
+        assert pipeline.find_optimal_threshold(y, probs) == thresholds[np.argmax(tpr - fpr)]
+
+    def test_fusion_thresholds_use_engine_grid(self, data):
+        from src.fusion import find_best_threshold, find_cost_sensitive_threshold
+
+        class Model:
+            def predict_proba(self, X):
+                return np.column_stack([1 - X[:, 0], X[:, 0]])
+
+        class Identity:
+            def transform(self, X):
+                return X
+
+        y, probs = data
+        X = probs[:, None]
+        artifacts = {'scaler': Identity()}
+        grid = np.arange(0.25, 0.65, 0.01)
+        f1 = [f1_score(y, probs >= t, zero_division=0) for t in grid]
+        assert find_best_threshold(Model(), artifacts, X, y) == grid[int(np.argmax(f1))]
+        costs = [5 * ((probs < t) & (y == 1)).sum() + ((probs >= t) & (y == 0)).sum()
+                 for t in np.arange(0.1, 0.9, 0.01)]
+        assert find_cost_sensitive_threshold(Model(), artifacts, X, y) == \
+            np.arange(0.1, 0.9, 0.01)[int(np.argmin(costs))]
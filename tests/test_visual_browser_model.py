@@ -0,0 +1,95 @@
+# tests/test_visual_browser_model.py
+"""Tests for the vectorized AU → expression features in src/visual_browser_model.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _legacy_features(df, au_cols):
+    """Per-frame reference implementation the vectorized path replaced."""
+    from src.visual_browser_model import au_to_expressions
+    rows = [au_to_expressions({c: r.get(c, 0) for c in au_cols}) for _, r in df.iterrows()]
+    expr_df = pd.DataFrame(rows)
+    features = {}
+    for name in expr_df.columns:
+        vals = expr_df[name].values
+        features[f'expr_{name}_mean'] = float(np.mean(vals))
+        features[f'expr_{name}_std'] = float(np.std(vals))
+        features[f'expr_{name}_max'] = float(np.max(vals))
+        if len(vals) > 3:
+            features[f'expr_{name}_trend'] = float(np.polyfit(np.arange(len(vals)), vals, 1)[0])
+    expr_vars = [expr_df[e].var() for e in ['happy', 'sad', 'neutral']]
+    features['flat_affect'] = 1.0 - float(np.mean(expr_vars))
+    features['sad_happy_ratio'] = expr_df['sad'].mean() / max(expr_df['happy'].mean(), 0.01)
+    neg = expr_df[['sad', 'angry', 'fearful', 'disgusted']].mean(axis=1).mean()
+    pos = expr_df[['happy', 'surprised']].mean(axis=1).mean()
+    features['neg_pos_expr_ratio'] = neg / max(pos, 0.01)
+    features['smile_frequency'] = float((expr_df['happy'] > 0.3).mean())
+    dominant = expr_df.idxmax(axis=1)
+    features['expression_transition_rate'] = (dominant != dominant.shift()).sum() / len(expr_df)
+    return features
+
+
+@pytest.fixture
+def au_frame():
+    rng = np.random.RandomState(0)
+    # AU10/14/25/45 are unused by the mapping; AU20 is absent (counts as 0)
+    cols = ['AU01_r', 'AU02_r', 'AU04_r', 'AU05_r', 'AU06_r', 'AU07_r', 'AU09_r',
+            'AU10_r', 'AU12_r', 'AU14_r', 'AU15_r', 'AU17_r', 'AU23_r', 'AU25_r',
+            'AU26_r', 'AU45_r']
+    data = np.clip(rng.gamma(0.8, 1.2, size=(600, len(cols))), 0, 5)
+    data[::37, 4] += 2.5  # smile bursts for dominant-expression changes
+    return pd.DataFrame(data, columns=cols), cols
+
+
+class TestExpressionMapping:
+    def test_matrix_matches_scalar_mapping(self, au_frame):
+        from src.visual_browser_model import (EXPRESSIONS, au_matrix_to_expressions,
+                                              au_to_expressions)
+        df, cols = au_frame
+        expr = au_matrix_to_expressions(df[cols].values, cols)
+        for i in (0, 37, 599):
+            ref = au_to_expressions(dict(zip(cols, df[cols].values[i])))
+            np.testing.assert_allclose(expr[i], [ref[e] for e in EXPRESSIONS],
+                                       rtol=0, atol=1e-12)
+
+    def test_features_match_per_frame_implementation(self, au_frame):
+        from src.visual_browser_model import au_matrix_to_expressions, expression_features
+        df, cols = au_frame
+        ref = _legacy_features(df, cols)
+        got = expression_features(au_matrix_to_expressions(df[cols].values, cols))
+        assert set(got) == set(ref) and len(got) == 33
+        for key in ref:
+            assert got[key] == pytest.approx(ref[key], rel=0, abs=1e-12), key
+
+    def test_extract_from_openface_csv(self, tmp_path, au_frame):
+        from src.visual_browser_model import extract_browser_visual_features
+        df, cols = au_frame
+        df = df.assign(confidence=0.95, success=1)
+        df.loc[::10, 'confidence'] = 0.5
+        feat_dir = tmp_path / '300_P' / 'features'
+        feat_dir.mkdir(parents=True)
+        df.to_csv(feat_dir / '300_OpenFace2.1.0_Pose_gaze_AUs.csv', index=False)
+
+        got = extract_browser_visual_features(300, str(tmp_path))
+        kept = df[df["confidence"] >= 0.80].astype(np.float32)
+        ref = _legacy_features(kept, cols)
+        for key in ref:
+            assert got[key] == pytest.approx(ref[key], rel=0, abs=1e-12), key
+
+
+class TestExpressionSession:
+    def test_streamed_batches_match_batch_features(self):
+        from src.visual_browser_model import ExpressionSession, expression_features
+        X = np.random.RandomState(3).dirichlet(np.full(7, 0.5), size=1000)
+        session = ExpressionSession()
+        for chunk in np.array_split(X, [1, 3, 100, 101, 600]):
+            session.update(chunk)
+        ref = expression_features(X)
+        got = session.features()
+        assert set(got) == set(ref)
+        for key in ref:
+            assert got[key] == pytest.approx(ref[key], rel=1e-9, abs=1e-12), key
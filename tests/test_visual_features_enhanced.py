@@ -0,0 +1,194 @@
+# tests/test_visual_features_enhanced.py
+"""Tests for the matrix CNN aggregation in src/visual_features_enhanced.py."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _pandas_reference(df):
+    """The per-column Series aggregation the matrix path replaced."""
+    record = {}
+    for col in df.columns:
+        vals = df[col].dropna()
+        if len(vals) == 0:
+            continue
+        record[f'{col}_mean'] = vals.mean()
+        record[f'{col}_std'] = vals.std() if len(vals) > 1 else 0
+        record[f'{col}_min'] = vals.min()
+        record[f'{col}_max'] = vals.max()
+        record[f'{col}_median'] = vals.median()
+        if len(vals) > 1:
+            diffs = vals.diff().dropna()
+            record[f'{col}_diff_mean'] = diffs.mean()
+            record[f'{col}_diff_std'] = diffs.std() if len(diffs) > 1 else 0
+    return record
+
+
+def _write_cnn(root, pid, name, n_frames, cols, seed):
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame(rng.randn(n_frames, len(cols)).astype(np.float32), columns=cols)
+    df.insert(0, 'name', [f'frame{i}' for i in range(n_frames)])
+    df.insert(1, 'timeStamp', np.arange(n_frames) / 30.0)
+    feat_dir = os.path.join(root, f"{pid}_P", "features")
+    os.makedirs(feat_dir, exist_ok=True)
+    df.to_csv(os.path.join(feat_dir, f"{pid}_{name}"), index=False)
+
+
+@pytest.fixture
+def cnn_root(tmp_path):
+    root = str(tmp_path)
+    cols = [f'f{i}' for i in range(6)]
+    _write_cnn(root, 300, 'densenet201.csv', 40, cols, 0)
+    _write_cnn(root, 300, 'CNN_ResNet.mat.csv', 25, cols[:4], 1)
+    _write_cnn(root, 301, 'densenet201.csv', 1, cols, 2)  # single frame
+    return root
+
+
+class TestTemporalMatrix:
+    def test_matches_pandas_reference(self, monkeypatch):
+        import src.visual_features_enhanced as vfe
+        monkeypatch.setattr(vfe, '_BLOCK_ELEMENTS', 16)  # force several row blocks
+        rng = np.random.RandomState(0)
+        X = rng.randn(101, 5).astype(np.float32)
+        X[[3, 50], 1] = np.nan
+        X[:, 3] = np.nan
+        vec = vfe.aggregate_temporal_matrix(X)
+        assert vec.dtype == np.float32 and vec.shape == (5 * len(vfe.TEMPORAL_STATS),)
+
+        ref = _pandas_reference(pd.DataFrame(X, columns=[f'c{i}' for i in range(5)]))
+        got = dict(zip(vfe.temporal_feature_names([f'c{i}' for i in range(5)]), vec))
+        for key, value in ref.items():
+            assert got[key] == pytest.approx(value, rel=1e-5, abs=1e-6), key
+        assert all(np.isnan(got[f'c3_{s}']) for s in vfe.TEMPORAL_STATS)
+
+    def test_short_series(self):
+        from src.visual_features_enhanced import aggregate_temporal_matrix
+        one = aggregate_temporal_matrix(np.array([[2.0]]))
+        assert one[:5].tolist() == [2.0, 0.0, 2.0, 2.0, 2.0]
+        assert np.isnan(one[5:]).all()
+        two = aggregate_temporal_matrix(np.array([[1.0], [4.0]]))
+        assert two[5] == pytest.approx(3.0) and two[6] == 0.0
+
+    def test_dict_wrapper_keys(self):
+        from src.visual_features_enhanced import aggregate_temporal_features
+        df = pd.DataFrame({'name': ['a', 'b', 'c'], 'timeStamp': [0, 1, 2],
+                           'x': [1.0, 2.0, 4.0]})
+        agg = aggregate_temporal_features(df, 'densenet')
+        assert agg['x_diff_mean'] == pytest.approx(1.5)
+        assert 'name_mean' not in agg and 'timeStamp_mean' not in agg
+
+
+class TestCohortMatrix:
+    def test_layout_and_rows(self, cnn_root):
+        from src.visual_features_enhanced import (TEMPORAL_STATS, cnn_feature_layout,
+                                                  extract_cnn_matrix)
+        blocks, names = cnn_feature_layout([300, 301, 302], cnn_root)
+        # ResNet.mat.csv also feeds 'vgg' when no CNN_VGG.mat.csv exists
+        assert set(blocks) == {'densenet', 'vgg', 'resnet'}
+        assert len(names) == (6 + 4 + 4) * len(TEMPORAL_STATS)
+
+        matrix, _, has_cnn = extract_cnn_matrix([300, 301, 302], cnn_root)
+        assert matrix.dtype == np.float32 and matrix.shape == (3, len(names))
+        assert has_cnn.tolist() == [True, True, False]
+        assert np.isnan(matrix[2]).all()
+        # Participant 301 has only a single densenet frame
+        row = dict(zip(names, matrix[1]))
+        assert row['densenet_f0_std'] == 0.0 and np.isnan(row['densenet_f0_diff_mean'])
+        assert np.isnan(row['resnet_f0_mean'])
+
+    def test_matches_per_participant_dicts(self, cnn_root):
+        from src.visual_features_enhanced import extract_cnn_matrix
+        matrix, names, _ = extract_cnn_matrix([300], cnn_root)
+        path = os.path.join(cnn_root, '300_P', 'features', '300_densenet201.csv')
+        ref = _pandas_reference(pd.read_csv(path).drop(columns=['name', 'timeStamp']))
+        got = dict(zip(names, matrix[0]))
+        for key, value in ref.items():
+            assert got[f'densenet_{key}'] == pytest.approx(value, rel=1e-5, abs=1e-6)
+
+    def test_enhanced_table(self, cnn_root):
+        from src.visual_features_enhanced import build_visual_enhanced_table
+        missing = []
+        table = build_visual_enhanced_table([300, 301, 302], cnn_root, missing)
+        assert table['pid'].tolist() == [300, 301]
+        assert 302 in missing and '300_openface' in missing
+
+
+class TestCNNProjection:
+    def test_fit_and_project(self, cnn_root, monkeypatch):
+        import src.visual_features_enhanced as vfe
+        monkeypatch.setattr(vfe, 'CNN_PCA_CHUNK_FRAMES', 7)
+
+        projection = vfe.fit_cnn_projection([300, 301], cnn_root, n_components=3, chunk_frames=7)
+        assert set(projection['networks']) == {'densenet', 'vgg', 'resnet'}
+        assert projection['n_components'] == 3
+
+        matrix, names, has_cnn = vfe.extract_cnn_matrix([300, 301], cnn_root,
+                                                        projection=projection)
+        assert len(names) == 3 * 3 * len(vfe.TEMPORAL_STATS)
+        assert names[0] == 'densenet_pc0_mean' and has_cnn.all()
+
+        # Chunked transform + aggregation equals transforming all frames at once
+        net = projection['networks']['densenet']
+        path = os.path.join(cnn_root, '300_P', 'features', '300_densenet201.csv')
+        frames = pd.read_csv(path)[net['columns']].to_numpy(dtype=np.float32)
+        expected = vfe.aggregate_temporal_matrix(net['ipca'].transform(frames))
+        np.testing.assert_allclose(matrix[0, :expected.size], expected, rtol=1e-5, atol=1e-5)
+
+    def test_trailing_frames_are_fitted(self, cnn_root):
+        import src.visual_features_enhanced as vfe
+        # 40 + 1 densenet frames in batches of 8: the single trailing frame
+        # (< k rows) joins the last full batch instead of being dropped
+        projection = vfe.fit_cnn_projection([300, 301], cnn_root, n_components=3,
+                                            chunk_frames=8)
+        assert projection['networks']['densenet']['ipca'].n_samples_seen_ == 41
+
+    def test_fit_on_all_participants_warns(self, cnn_root, monkeypatch, caplog):
+        import src.visual_features_enhanced as vfe
+        monkeypatch.setattr(vfe, 'CNN_PCA_COMPONENTS', 2)
+        fitted = []
+        monkeypatch.setattr(vfe, 'fit_cnn_projection',
+                            lambda ids, root: fitted.append(ids) or {'networks': {}})
+        with caplog.at_level('WARNING', logger=vfe.logger.name):
+            vfe.cnn_projection_for([300, 301], cnn_root)
+        assert fitted == [[300, 301]] and 'transductive' in caplog.text
+
+        caplog.clear()
+        vfe.cnn_projection_for([300, 301], cnn_root, pca_fit_ids=[300])
+        assert fitted[-1] == [300] and 'transductive' not in caplog.text
+
+    def test_disabled_by_default(self, cnn_root):
+        from src.visual_features_enhanced import cnn_projection_for
+        assert cnn_projection_for([300], cnn_root) is None
+
+
+class TestAUDynamics:
+    def test_episodes_match_run_length_loop(self):
+        from src.visual_features_enhanced import au_dynamics_features
+        rng = np.random.RandomState(0)
+        active = rng.rand(500, 4) > 0.6
+        active[:, 3] = False
+        feats = au_dynamics_features(active, ['AU01', 'AU04', 'AU12', 'AU45'])
+        for j, au in enumerate(['AU01', 'AU04', 'AU12', 'AU45']):
+            runs, current = [], 0
+            for frame_active in active[:, j]:
+                if frame_active:
+                    current += 1
+                elif current:
+                    runs.append(current)
+                    current = 0
+            if current:
+                runs.append(current)
+            assert feats[f'au_dyn_{au}_episodes_per_1k'] == pytest.approx(1000 * len(runs) / 500)
+            assert feats[f'au_dyn_{au}_episode_len'] == pytest.approx(np.mean(runs) if runs else 0)
+        assert feats['au_dyn_AU04_AU12_cooccur'] == pytest.approx(
+            np.mean(active[:, 1] & active[:, 2]))
+        assert len([k for k in feats if k.endswith('_cooccur')]) == 6
+
+    def test_missing_intensities_are_inactive(self):
+        from src.visual_features_enhanced import au_activation_matrix
+        active, valid = au_activation_matrix(np.array([[0.9, np.nan], [0.2, 1.0]]))
+        assert active.tolist() == [[True, False], [False, True]]
+        assert valid.tolist() == [[True, False], [True, True]]